@@ -1,32 +1,42 @@
 import pandas as pd
 import os
 
-from utils.data_utils import clean_string_list, rename_columns_from_mapping, save_column_mapping
-from utils.llm_utils import translate_headers_via_llm
-from utils.file_utils import ensure_directory
+from utils.data_utils import clean_string_list, save_column_mapping
+from utils.header_registry import map_headers, register_headers
 
 def clean_translate_rename_headers_pipe(
     df: pd.DataFrame,
     column_mapping_path: str,
     output_path: str,
     batch_size: int = 5,
-    model: str = "gpt-4",
-    use_existing_mapping: bool = True
+    model: str | None = None,
+    use_existing_mapping: bool = True,
+    registry_db_path: str | None = None,
+    max_workers: int = 4
 ) -> pd.DataFrame:
     """
     Cleans, translates, and renames column headers of a DataFrame. 
     Saves the column mapping and the cleaned DataFrame to disk.
 
+    Headers are mapped through the header registry (utils/header_registry.py):
+    known and slightly reworded headers are looked up locally, only new
+    headers are translated by the LLM.
+
     Args:
         df (pd.DataFrame): Raw input DataFrame
         column_mapping_path (str): Path to save or load column mapping CSV
         output_path (str): Path to save the final cleaned DataFrame
         batch_size (int): Batch size for LLM translation
-        model (str): Model to use for LLM
-        use_existing_mapping (bool): If True, skips LLM call and loads mapping from file
+        model (str or None): Model to use for LLM (default: routed by header length)
+        use_existing_mapping (bool): If True, seed the registry with an existing mapping file
+        registry_db_path (str or None): Header registry file (default: HEADER_REGISTRY_DB)
+        max_workers (int): Concurrent LLM requests for new headers
 
     Returns:
         pd.DataFrame: Updated DataFrame with cleaned and renamed headers
+
+    Raises:
+        OSError: If the column mapping cannot be saved.
     """
     print("🔹 Cleaning headers...")
     cleaned_headers = clean_string_list(df.columns.tolist())
@@ -34,19 +44,26 @@ def clean_translate_rename_headers_pipe(
 
     if use_existing_mapping and os.path.exists(column_mapping_path):
         print(f"✅ Using existing mapping from: {column_mapping_path}")
-        mapping_df = pd.read_csv(column_mapping_path)
-    else:
-        print("🔹 Translating headers via LLM...")
-        header_map = translate_headers_via_llm(cleaned_headers, batch_size=batch_size, model=model)
-        mapping_df = pd.DataFrame(header_map)
-        save_column_mapping(mapping_df, column_mapping_path)
-        print(f"✅ Column mapping saved to: {column_mapping_path}")
+        register_headers(pd.read_csv(column_mapping_path).to_dict("records"), source="mapping", db_path=registry_db_path)
+
+    print("🔹 Mapping headers via registry...")
+    header_map = map_headers(
+        cleaned_headers,
+        db_path=registry_db_path,
+        batch_size=batch_size,
+        model=model,
+        max_workers=max_workers
+    )
+    mapping_df = pd.DataFrame(header_map).drop(columns="match", errors="ignore")
+    if not save_column_mapping(mapping_df, column_mapping_path):
+        raise OSError(f"Could not save the column mapping to {column_mapping_path}")
 
+    # Rename from the mapping just built, not the file (which could be stale)
     print("🔹 Renaming columns using mapping...")
-    df = rename_columns_from_mapping(df, mapping_df)
+    df = df.rename(columns={m["original_name"]: m["short_name"] for m in header_map})
 
     print("🔹 Saving cleaned DataFrame...")
-    ensure_directory(output_path)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
     df.to_csv(output_path, index=False)
     print(f"✅ Cleaned DataFrame saved to: {output_path}")
 
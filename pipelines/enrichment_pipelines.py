@@ -5,8 +5,25 @@ from utils.clean_utils import (
     infer_and_convert_column_types,
     enforce_metadata_string_dtypes
 )
-from utils.feature_utils import process_translation_and_sentiment
+from utils.feature_utils import process_translation_and_sentiment, build_enrichment_lookup
+from utils.enrichment_lookup import (
+    enrichment_db_path,
+    write_enrichment_lookup,
+    load_enrichment_lookup,
+    create_enriched_view
+)
+from utils.enrichment_checkpoint import EnrichmentCheckpoint, checkpoint_key
+from utils.freetext_enrichment import process_free_text_columns
+from utils.metadata_store import MetadataStore
 from utils.data_utils import save_data_to_csv_by_col_seq, save_metadata_to_csv_by_col_seq
+from utils.llm_metrics import (
+    llm_call_context,
+    new_run_id,
+    flush_llm_metrics,
+    get_llm_call_records,
+    summarize_llm_calls
+)
+from utils.sentiment_classifier import SentimentClassifier, flush_sentiment_labels
 
 def run_translate_and_sentiment_enrichment_pipeline(
     data_csv_path: str,
@@ -14,6 +31,14 @@ def run_translate_and_sentiment_enrichment_pipeline(
     save_data_folder: str,
     save_metadata_folder: str,
     base_filename: str = "enriched_dataset",
+    run_id: str | None = None,
+    metrics_db_path: str | None = None,
+    sentiment_model_path: str | None = None,
+    classifier_threshold: float = 0.8,
+    labels_db_path: str | None = None,
+    freetext_db_path: str | None = None,
+    resume: bool = False,
+    checkpoint_db_path: str | None = None,
     verbose: bool = True
 ):
     """
@@ -25,8 +50,17 @@ def run_translate_and_sentiment_enrichment_pipeline(
     - Inferring column types.
     - Translating categorical columns (Hindi -> English).
     - Inferring sentiment where specified.
+    - Enriching free-text columns (is_free_text) row by row via DuckDB side tables.
     - Updating metadata with translated categories and sentiment columns.
     - Saving enriched dataset and metadata to CSV files.
+    - Writing per-call LLM metrics (tagged with run_id, column and model route) to DuckDB.
+    - Storing LLM sentiment labels for the local sentiment classifier.
+
+    Each enriched column is checkpointed (utils/enrichment_checkpoint.py) as it
+    completes, keyed by the input files. If a run fails, rerun it with resume=True:
+    finished columns are restored from the checkpoint instead of sent to the LLM
+    again (free-text columns resume from their side tables). Checkpoints are
+    deleted once the outputs are saved.
 
     Args:
         data_csv_path (str): Path to pre-enrichment data CSV.
@@ -34,13 +68,28 @@ def run_translate_and_sentiment_enrichment_pipeline(
         save_data_folder (str): Directory where enriched data will be saved.
         save_metadata_folder (str): Directory where enriched metadata will be saved.
         base_filename (str): Base filename to use for output CSVs.
+        run_id (str or None): Tag for this run's LLM call records (default: generated).
+        metrics_db_path (str or None): DuckDB file for LLM call records (default: LLM_METRICS_DB).
+        sentiment_model_path (str or None): Trained SentimentClassifier; confident values skip the LLM.
+        classifier_threshold (float): Minimum classifier confidence to accept a local sentiment.
+        labels_db_path (str or None): DuckDB file for sentiment labels (default: SENTIMENT_LABELS_DB).
+        freetext_db_path (str or None): DuckDB file for free-text side tables (default: FREETEXT_ENRICHMENT_DB).
+        resume (bool): Reuse the checkpoints of an earlier, unfinished run on the same input files
+            (otherwise they are discarded and every column is enriched).
+        checkpoint_db_path (str or None): DuckDB file for checkpoints (default: ENRICHMENT_CHECKPOINT_DB).
         verbose (bool): Whether to print progress messages.
 
     Returns:
         tuple[str, str]: Paths to saved enriched data CSV and metadata CSV.
     """
+    run_id = run_id or new_run_id()
     if verbose:
-        print("[🚀] Starting enrichment pipeline...")
+        print(f"[🚀] Starting enrichment pipeline (run {run_id})...")
+
+    # Per-column checkpoints of this input
+    checkpoint = EnrichmentCheckpoint(checkpoint_key(data_csv_path, metadata_csv_path), checkpoint_db_path)
+    if not resume:
+        checkpoint.clear()
 
     # Load data
     data_df = pd.read_csv(data_csv_path)
@@ -64,12 +113,40 @@ def run_translate_and_sentiment_enrichment_pipeline(
     if verbose:
         print("[✅] Enforced string dtypes in metadata.")
 
-    # Enrichment step
-    data_df, metadata_df = process_translation_and_sentiment(
-        data_df,
-        metadata_df,
-        verbose=verbose
-    )
+    # Local sentiment model distilled from earlier LLM labels
+    sentiment_classifier = None
+    if sentiment_model_path and os.path.exists(sentiment_model_path):
+        sentiment_classifier = SentimentClassifier.load(sentiment_model_path)
+        if verbose:
+            print(f"[✅] Loaded sentiment classifier from {sentiment_model_path}.")
+
+    # Enrichment step (metadata indexed by column for both passes)
+    store = MetadataStore.from_frame(metadata_df)
+    try:
+        with llm_call_context(run_id=run_id):
+            data_df, store = process_translation_and_sentiment(
+                data_df,
+                store,
+                sentiment_classifier=sentiment_classifier,
+                classifier_threshold=classifier_threshold,
+                checkpoint=checkpoint,
+                verbose=verbose
+            )
+            data_df, store = process_free_text_columns(
+                data_df,
+                store,
+                db_path=freetext_db_path,
+                verbose=verbose
+            )
+    finally:
+        if verbose:
+            route_summary = summarize_llm_calls(get_llm_call_records(), by="route")
+            if not route_summary.empty:
+                print("[📊] LLM calls per model route:")
+                print(route_summary.to_string(index=False))
+        flush_llm_metrics(metrics_db_path, verbose=verbose)
+        flush_sentiment_labels(labels_db_path, verbose=verbose)
+    metadata_df = store.to_frame()
 
     if verbose:
         print("[✅] Enrichment (translation and sentiment) complete.")
@@ -91,4 +168,149 @@ def run_translate_and_sentiment_enrichment_pipeline(
     if verbose:
         print("[✅] Saved enriched data and metadata.")
 
-    return data_path, metadata_path
\ No newline at end of file
+    # Run complete: its checkpoints are no longer needed
+    checkpoint.clear()
+
+    return data_path, metadata_path
+
+
+def run_enrichment_lookup_pipeline(
+    data_csv_path: str,
+    metadata_csv_path: str,
+    save_metadata_folder: str,
+    db_path: str | None = None,
+    data_table: str = "ss_data",
+    view_name: str | None = None,
+    columns: list | None = None,
+    reload_data: bool = True,
+    delta: bool = False,
+    base_filename: str = "enriched_dataset",
+    run_id: str | None = None,
+    metrics_db_path: str | None = None,
+    sentiment_model_path: str | None = None,
+    classifier_threshold: float = 0.8,
+    labels_db_path: str | None = None,
+    verbose: bool = True
+):
+    """
+    Pipeline: Translation and sentiment enrichment as DuckDB lookups (no rewritten dataset).
+
+    This pipeline performs:
+    - Loading, cleaning and type inference as run_translate_and_sentiment_enrichment_pipeline.
+    - Writing the cleaned data once to the `data_table` DuckDB table.
+    - Enriching the distinct values of each column into the enrichment_lookup table
+      (utils/enrichment_lookup.py) instead of rewriting the data.
+    - Creating the `<data_table>_enriched` view, which applies the lookups on query.
+    - Saving the enriched metadata to CSV.
+
+    Re-enriching a few columns (e.g. after fixing a translation) only upserts their
+    lookup rows: pass `columns` and reload_data=False. Free-text columns are not
+    handled here (see process_free_text_columns).
+
+    With delta=True (e.g. the CSV now includes a new month of visits), values that
+    already have lookup rows are reused and only unseen values are sent to the LLM;
+    their rows are added to the lookup and merged into metadata.
+
+    Args:
+        data_csv_path (str): Path to pre-enrichment data CSV.
+        metadata_csv_path (str): Path to pre-enrichment metadata CSV.
+        save_metadata_folder (str): Directory where enriched metadata will be saved.
+        db_path (str or None): DuckDB file (default: ENRICHMENT_DB or data/interim/enrichment.duckdb).
+        data_table (str): Table holding the cleaned, not enriched data.
+        view_name (str or None): Enriched view (default: '<data_table>_enriched').
+        columns (list or None): Columns to enrich (default: all in metadata); lookup rows
+            of other columns are kept.
+        reload_data (bool): Rewrite `data_table` from the CSV (always done if it does not exist).
+        delta (bool): Only enrich values missing from the existing lookup rows.
+        base_filename (str): Base filename to use for the metadata CSV.
+        run_id (str or None): Tag for this run's LLM call records (default: generated).
+        metrics_db_path (str or None): DuckDB file for LLM call records (default: LLM_METRICS_DB).
+        sentiment_model_path (str or None): Trained SentimentClassifier; confident values skip the LLM.
+        classifier_threshold (float): Minimum classifier confidence to accept a local sentiment.
+        labels_db_path (str or None): DuckDB file for sentiment labels (default: SENTIMENT_LABELS_DB).
+        verbose (bool): Whether to print progress messages.
+
+    Returns:
+        tuple[str, str]: DuckDB file holding the data, lookup and view, and the path of the saved metadata CSV.
+    """
+    import duckdb
+
+    run_id = run_id or new_run_id()
+    if verbose:
+        print(f"[🚀] Starting lookup enrichment pipeline (run {run_id})...")
+
+    # Load, clean and type the data
+    data_df = pd.read_csv(data_csv_path)
+    metadata_df = pd.read_csv(metadata_csv_path, na_values=["nan", "NaN", ""])
+    data_df = clean_dataframe_cells(data_df)
+    data_df, _ = infer_and_convert_column_types(data_df, verbose=False)
+    metadata_df = enforce_metadata_string_dtypes(metadata_df, verbose=False)
+    if verbose:
+        print(f"[✅] Loaded and cleaned data ({data_df.shape}) and metadata ({metadata_df.shape}).")
+
+    sentiment_classifier = None
+    if sentiment_model_path and os.path.exists(sentiment_model_path):
+        sentiment_classifier = SentimentClassifier.load(sentiment_model_path)
+        if verbose:
+            print(f"[✅] Loaded sentiment classifier from {sentiment_model_path}.")
+
+    db_path = enrichment_db_path(db_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    # Lookup rows of earlier runs (delta mode)
+    known_lookup = None
+    if delta:
+        con = duckdb.connect(db_path)
+        try:
+            known_lookup = load_enrichment_lookup(con, columns)
+        finally:
+            con.close()
+        if verbose:
+            print(f"[✅] Loaded {len(known_lookup)} existing lookup rows.")
+
+    # Enrich distinct values into lookup rows
+    store = MetadataStore.from_frame(metadata_df)
+    try:
+        with llm_call_context(run_id=run_id):
+            lookup_df, store = build_enrichment_lookup(
+                data_df,
+                store,
+                columns=columns,
+                sentiment_classifier=sentiment_classifier,
+                classifier_threshold=classifier_threshold,
+                known_lookup=known_lookup,
+                verbose=verbose
+            )
+    finally:
+        flush_llm_metrics(metrics_db_path, verbose=verbose)
+        flush_sentiment_labels(labels_db_path, verbose=verbose)
+    metadata_df = store.to_frame()
+
+    # Data table, lookup rows and view
+    con = duckdb.connect(db_path)
+    try:
+        table_exists = con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = ?", [data_table]
+        ).fetchone()[0]
+        if reload_data or not table_exists:
+            con.register("data_df", data_df)
+            con.execute(f'CREATE OR REPLACE TABLE "{data_table}" AS SELECT * FROM data_df')
+            con.unregister("data_df")
+            if verbose:
+                print(f"[✅] Wrote {len(data_df)} rows to table '{data_table}'.")
+        n_rows = write_enrichment_lookup(con, lookup_df)
+        if verbose:
+            print(f"[✅] Upserted {n_rows} lookup rows.")
+        create_enriched_view(con, data_table=data_table, view_name=view_name, verbose=verbose)
+    finally:
+        con.close()
+
+    metadata_path = save_metadata_to_csv_by_col_seq(
+        metadata_df,
+        folder_path=save_metadata_folder,
+        filename=f"{base_filename}_metadata"
+    )
+    if verbose:
+        print("[✅] Saved enriched metadata.")
+
+    return db_path, metadata_path
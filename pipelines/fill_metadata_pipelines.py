@@ -1,10 +1,16 @@
 import pandas as pd
+from utils.metadata_store import MetadataStore
+from utils.profiling_utils import profile_columns
 from utils.metadata_utils import (
     fill_data_type_metadata,
     fill_count_metadata,
     fill_original_col_seq_metadata,
     fill_is_identifier_metadata,
+    fill_is_multi_select_metadata,
     fill_is_categorical_metadata,
+    fill_is_free_text_metadata,
+    fill_polarity_metadata,
+    fill_is_proper_noun_metadata,
     fill_category_values_metadata,
     fill_analysis_category_metadata,
     fill_pre_enrichment_col_seq_metadata,
@@ -16,6 +22,7 @@ def run_zero_stage_metadata_pipeline(
     data_df: pd.DataFrame,
     metadata_df: pd.DataFrame,
     columns: list[str] | None = None,
+    max_workers: int = 1,
     verbose: bool = True
 ) -> pd.DataFrame:
     """
@@ -25,27 +32,37 @@ def run_zero_stage_metadata_pipeline(
         data_df (pd.DataFrame): Cleaned data DataFrame with correct dtypes.
         metadata_df (pd.DataFrame): Metadata DataFrame to be enriched.
         columns (list[str] or None): Specific columns to process. If None, all columns are processed.
+        max_workers (int): Processes used to profile the columns (None: every CPU).
         verbose (bool): Whether to print progress logs.
 
     Returns:
         pd.DataFrame: Updated metadata DataFrame.
     """
+    # Index metadata by column once for all fill steps
+    store = MetadataStore.from_frame(metadata_df)
+    # Scan each column once for all fill steps
+    profile = profile_columns(data_df, columns, max_workers=max_workers)
+
     if verbose:
         print("=== Filling Zero-Stage Mandatory Metadata ===")
-    metadata_df = fill_data_type_metadata(data_df, metadata_df, columns)
+    store = fill_data_type_metadata(data_df, store, columns, profile=profile)
 
     if verbose:
         print("\n=== Filling Zero-Stage Optional Metadata ===")
-    metadata_df = fill_original_col_seq_metadata(data_df, metadata_df, columns)
-    metadata_df = fill_count_metadata(data_df, metadata_df, columns)
-    metadata_df = fill_desc_en_metadata(metadata_df, columns)
-    metadata_df = fill_original_column_name_metadata(metadata_df, columns)
-    metadata_df, unique_values_dict = fill_is_categorical_metadata(data_df, metadata_df, columns)
-
-    metadata_df = fill_is_identifier_metadata(data_df, metadata_df, columns)
-    metadata_df = fill_category_values_metadata(metadata_df, unique_values_dict, columns)
-    metadata_df = fill_analysis_category_metadata(metadata_df, columns)
-    metadata_df = fill_pre_enrichment_col_seq_metadata(metadata_df, columns)
+    store = fill_original_col_seq_metadata(data_df, store)
+    store = fill_count_metadata(data_df, store, columns, profile=profile)
+    store = fill_desc_en_metadata(store, columns)
+    store = fill_original_column_name_metadata(store, columns)
+    store = fill_is_multi_select_metadata(data_df, store, columns, profile=profile)
+    store, unique_values_dict = fill_is_categorical_metadata(data_df, store, columns, profile=profile)
+    store = fill_is_proper_noun_metadata(data_df, store, columns)
+    store = fill_is_identifier_metadata(data_df, store, columns, profile=profile)
+    store = fill_is_free_text_metadata(data_df, store, columns, profile=profile)  # After is_proper_noun/is_identifier
+    store = fill_polarity_metadata(data_df, store, columns, profile=profile)
+    store = fill_category_values_metadata(data_df, store, unique_values_dict, columns)
+    store = fill_analysis_category_metadata(data_df, store, columns)
+    store = fill_pre_enrichment_col_seq_metadata(data_df, store, columns)
+    metadata_df = store.to_frame()
     
 
     if verbose:
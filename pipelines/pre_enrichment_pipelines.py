@@ -3,6 +3,8 @@ from utils.clean_utils import (
     infer_and_convert_column_types,
     enforce_metadata_string_dtypes
 )
+from utils.metadata_store import MetadataStore
+from utils.profiling_utils import profile_columns
 from utils.metadata_utils import (
     fill_original_column_name_metadata,
     fill_desc_en_metadata,
@@ -10,7 +12,11 @@ from utils.metadata_utils import (
     fill_count_metadata,
     fill_original_col_seq_metadata,
     fill_is_identifier_metadata,
+    fill_is_multi_select_metadata,
     fill_is_categorical_metadata,
+    fill_is_free_text_metadata,
+    fill_polarity_metadata,
+    fill_is_proper_noun_metadata,
     fill_category_values_metadata,
     fill_analysis_category_metadata,
     fill_pre_enrichment_col_seq_metadata
@@ -23,6 +29,7 @@ def run_pre_enrichment_pipeline(
     save_data_folder: str,
     save_metadata_folder: str,
     base_filename: str,
+    max_workers: int = 1,
     verbose: bool = True
 ):
     """
@@ -35,6 +42,7 @@ def run_pre_enrichment_pipeline(
         save_data_folder (str): Directory to save processed data.
         save_metadata_folder (str): Directory to save processed metadata.
         base_filename (str): Base name for saved files.
+        max_workers (int): Processes used to profile the columns (None: every CPU).
         verbose (bool): Whether to print progress messages.
     Returns:
         tuple: (Cleaned data_df, metadata_df)
@@ -67,16 +75,23 @@ def run_pre_enrichment_pipeline(
     if verbose:
         print("[3️⃣] Filling metadata fields...")
 
-    metadata_df = fill_original_column_name_metadata(metadata_df) # Fills original_column_name 
-    metadata_df = fill_desc_en_metadata(metadata_df) # Fills desc_en  
-    metadata_df = fill_data_type_metadata(data_df, metadata_df) # Fills data_type
-    metadata_df = fill_count_metadata(data_df, metadata_df) # Fills count
-    metadata_df = fill_original_col_seq_metadata(data_df, metadata_df) # Fills original_col_seq
-    metadata_df = fill_is_identifier_metadata(data_df, metadata_df) # Fills is_identifier
-    metadata_df, unique_values_dict = fill_is_categorical_metadata(data_df, metadata_df) # Fills is_categorical
-    metadata_df = fill_category_values_metadata(data_df, metadata_df, unique_values_dict) # Fills category_values
-    metadata_df = fill_analysis_category_metadata(data_df, metadata_df) # Fills analysis_category
-    metadata_df = fill_pre_enrichment_col_seq_metadata(data_df, metadata_df) # Fills pre_enrichment_col_seq
+    store = MetadataStore.from_frame(metadata_df) # Index metadata by column once for all fill steps
+    profile = profile_columns(data_df, max_workers=max_workers) # Scan each column once for all fill steps
+    store = fill_original_column_name_metadata(store) # Fills original_column_name 
+    store = fill_desc_en_metadata(store) # Fills desc_en  
+    store = fill_data_type_metadata(data_df, store, profile=profile) # Fills data_type
+    store = fill_count_metadata(data_df, store, profile=profile) # Fills count
+    store = fill_original_col_seq_metadata(data_df, store) # Fills original_col_seq
+    store = fill_is_identifier_metadata(data_df, store, profile=profile) # Fills is_identifier
+    store = fill_is_multi_select_metadata(data_df, store, profile=profile) # Fills is_multi_select
+    store, unique_values_dict = fill_is_categorical_metadata(data_df, store, profile=profile) # Fills is_categorical
+    store = fill_is_proper_noun_metadata(data_df, store) # Fills is_proper_noun
+    store = fill_is_free_text_metadata(data_df, store, profile=profile) # Fills is_free_text (not for names/IDs)
+    store = fill_polarity_metadata(data_df, store, profile=profile) # Fills polarity
+    store = fill_category_values_metadata(data_df, store, unique_values_dict) # Fills category_values
+    store = fill_analysis_category_metadata(data_df, store) # Fills analysis_category
+    store = fill_pre_enrichment_col_seq_metadata(data_df, store) # Fills pre_enrichment_col_seq
+    metadata_df = store.to_frame()
 
     if verbose:
         print("[✅] Metadata filling complete.")
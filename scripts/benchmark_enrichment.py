@@ -0,0 +1,327 @@
+"""
+Enrichment Benchmark
+-------------------
+Runs `process_translation_and_sentiment` on a synthetic ss_data-like dataset
+against the local LLM stub server (utils/llm_stub_server.py) and reports
+throughput, LLM calls, tokens and p50/p95 call latency, and how many pandas
+PerformanceWarnings (fragmented frame) the run raised.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_enrichment --rows 20000 --latency-ms 150 --ms-per-output-token 2
+    python -m scripts.benchmark_enrichment --wide   # 150 question columns
+"""
+
+import argparse
+import os
+import random
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+HINDI_WORDS = [
+    "विद्यालय", "शिक्षक", "छात्र", "कक्षा", "पुस्तक", "उपस्थित", "अनुपस्थित", "अच्छा",
+    "खराब", "समय", "पर", "नहीं", "पूर्ण", "अधूरा", "सामग्री", "उपलब्ध", "गतिविधि",
+    "पढ़ाई", "सुधार", "आवश्यक", "संतोषजनक", "कमजोर", "नियमित", "अभ्यास",
+]
+BLOCKS = ["बबीना", "बड़ागांव", "बंगरा", "चिरगांव", "गुरसराय", "मऊरानीपुर", "मोठ", "झाँसी नगर"]
+ENGLISH_ANSWERS = [
+    "Fully completed", "Partially completed", "Not started", "Needs support",
+    "Good progress", "Poor progress", "Satisfactory", "Not applicable",
+]
+
+
+# Build a pool of synthetic Hindi phrases
+def _hindi_phrases(rng: random.Random, n: int) -> list:
+    phrases = set()
+    while len(phrases) < n:
+        phrases.add(" ".join(rng.sample(HINDI_WORDS, rng.randint(2, 5))))
+    return sorted(phrases)
+
+
+# Near-duplicate spelling of a phrase (punctuation, matra typo or word order)
+def _typo_variant(phrase: str, rng: random.Random) -> str:
+    kind = rng.randrange(3)
+    if kind == 0:
+        return phrase + "।"
+    if kind == 1:
+        return phrase.replace("ी", "ि").replace("ं", "") if ("ी" in phrase or "ं" in phrase) else phrase + " "
+    words = phrase.split()
+    return " ".join(reversed(words))
+
+
+# Generate a synthetic ss_data-like dataset with matching metadata
+def make_synthetic_dataset(
+    n_rows: int = 10000,
+    n_yes_no: int = 20,
+    n_hindi_categorical: int = 20,
+    n_english_categorical: int = 10,
+    n_multi_select: int = 4,
+    n_categories: int = 12,
+    typo_rate: float = 0.02,
+    seed: int = 42
+):
+    """
+    Generate a synthetic mentor-visit dataset and its enrichment metadata.
+
+    Args:
+        n_rows (int): Number of visit rows.
+        n_yes_no (int): Number of Hindi yes/no (हाँ/नहीं) columns needing sentiment.
+        n_hindi_categorical (int): Number of Hindi categorical columns (half with sentiment).
+        n_english_categorical (int): Number of English categorical columns needing sentiment.
+        n_multi_select (int): Number of Hindi multi-select columns (1-4 comma-joined options, sentiment required).
+        n_categories (int): Distinct values per categorical column.
+        typo_rate (float): Share of Hindi categorical cells replaced by a near-duplicate spelling.
+        seed (int): Random seed.
+
+    Returns:
+        tuple: (data_df, metadata_df)
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+
+    data = {
+        "visit_id": np.arange(1, n_rows + 1),
+        "udise_code": np_rng.integers(9_000_000, 9_999_999, n_rows),
+        "block_town": np_rng.choice(BLOCKS, n_rows),
+        "mentor_name": np_rng.choice(_hindi_phrases(rng, 60), n_rows),
+    }
+    meta = [
+        ("visit_id", "Visit identifier", "en", "no", "False"),
+        ("udise_code", "UDISE code of the school", "en", "no", "False"),
+        ("block_town", "Block or town of the school", "hi", "no", "True"),
+        ("mentor_name", "Name of the mentor", "hi", "no", "True"),
+    ]
+
+    for i in range(n_yes_no):
+        col = f"yes_no_q{i + 1}"
+        data[col] = np_rng.choice(["हाँ", "नहीं", None], n_rows, p=[0.6, 0.3, 0.1])
+        meta.append((col, f"Was checklist item {i + 1} observed during the visit", "hi", "yes", "True"))
+
+    for i in range(n_hindi_categorical):
+        col = f"hindi_cat_q{i + 1}"
+        values = np_rng.choice(_hindi_phrases(rng, n_categories), n_rows).astype(object)
+        typo_idx = np.flatnonzero(np_rng.random(n_rows) < typo_rate)
+        values[typo_idx] = [_typo_variant(values[i], rng) for i in typo_idx]
+        data[col] = values
+        sentiment = "yes" if i % 2 == 0 else "no"
+        meta.append((col, f"Observation {i + 1} recorded by the mentor", "hi", sentiment, "True"))
+
+    for i in range(n_english_categorical):
+        col = f"english_cat_q{i + 1}"
+        data[col] = np_rng.choice(ENGLISH_ANSWERS, n_rows)
+        meta.append((col, f"Status of activity {i + 1}", "en", "yes", "True"))
+
+    for i in range(n_multi_select):
+        col = f"multi_select_q{i + 1}"
+        options = _hindi_phrases(rng, n_categories)
+        data[col] = [
+            ", ".join(rng.sample(options, rng.randint(1, 4))) if rng.random() > 0.05 else None
+            for _ in range(n_rows)
+        ]
+        meta.append((col, f"Resources used in activity {i + 1} (multiple choice)", "hi", "yes", "True"))
+
+    data_df = pd.DataFrame(data)
+    data_df = data_df.astype({c: object for c in data_df.columns if data_df[c].dtype == object})
+
+    metadata_df = pd.DataFrame(
+        meta, columns=["column_name", "desc_en", "lang", "sentiment_required", "is_categorical"]
+    )
+    metadata_df["polarity"] = np.where(metadata_df["column_name"].str.startswith("yes_no_"), "positive", "")
+    metadata_df["is_proper_noun"] = metadata_df["column_name"].isin(["block_town", "mentor_name"]).astype(str)
+    metadata_df["is_multi_select"] = metadata_df["column_name"].str.startswith("multi_select_").astype(str)
+    metadata_df["category_values"] = "nan"
+    metadata_df["analysis_category"] = "unclassified"
+    metadata_df["pre_enrichment_col_seq"] = np.arange(1, len(metadata_df) + 1, dtype=float)
+
+    return data_df, metadata_df
+
+
+# Summarize a list of latencies
+def summarize_latencies(latencies_ms: list) -> dict:
+    """
+    Return count, p50, p95 and max of a list of latencies (ms).
+    """
+    if not latencies_ms:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    arr = np.asarray(latencies_ms, dtype=float)
+    return {
+        "count": int(arr.size),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "max_ms": float(arr.max()),
+    }
+
+
+# Run process_translation_and_sentiment against the stub and collect numbers
+def run_benchmark(
+    data_df,
+    metadata_df,
+    stub_config,
+    use_rules: bool = True,
+    encoding: str = "compact",
+    verbose: bool = False
+) -> dict:
+    """
+    Run the enrichment step against a fresh stub server.
+
+    Args:
+        data_df (pd.DataFrame): Synthetic data.
+        metadata_df (pd.DataFrame): Synthetic metadata.
+        stub_config (StubConfig): Latency/error configuration of the stub.
+        use_rules (bool): Pass-through to process_translation_and_sentiment.
+        encoding (str): Prompt encoding, 'compact' or 'items' (sets LLM_PROMPT_ENCODING).
+        verbose (bool): Pass-through to process_translation_and_sentiment.
+
+    Returns:
+        dict: Benchmark report.
+    """
+    from utils.llm_stub_server import start_stub_server
+
+    server, base_url, stats = start_stub_server(config=stub_config)
+    os.environ["LLM_BASE_URL"] = base_url
+    os.environ["LLM_PROMPT_ENCODING"] = encoding
+    for key in ("OPENAI_API_KEY", "GROQ_API_KEY", "DEEPSEEK_API_KEY"):
+        os.environ.setdefault(key, "stub")
+
+    from utils.feature_utils import process_translation_and_sentiment
+    from utils.llm_metrics import get_llm_call_records, summarize_llm_calls
+    from utils.llms import clear_llm_cache, reset_llm_clients
+
+    # Clients are created lazily; drop any that point at a previous server
+    reset_llm_clients()
+    clear_llm_cache()
+    get_llm_call_records(clear=True)
+
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", pd.errors.PerformanceWarning)
+            started = time.perf_counter()
+            enriched_df, _ = process_translation_and_sentiment(
+                data_df.copy(), metadata_df.copy(), use_rules=use_rules, verbose=verbose
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+
+    records = get_llm_call_records(clear=True)
+    server_stats = stats.as_dict()
+    latency = summarize_latencies(records.loc[~records["cache_hit"], "latency_ms"].tolist())
+    return {
+        "use_rules": use_rules,
+        "encoding": encoding,
+        "rows": len(data_df),
+        "columns": len(metadata_df),
+        "elapsed_s": elapsed,
+        "rows_per_s": len(data_df) / elapsed if elapsed else 0.0,
+        "columns_per_s": len(metadata_df) / elapsed if elapsed else 0.0,
+        "output_columns": enriched_df.shape[1],
+        "perf_warnings": sum(issubclass(w.category, pd.errors.PerformanceWarning) for w in caught),
+        "llm_calls": server_stats["calls"],
+        "llm_errors": server_stats["errors"],
+        "llm_retries": int(records["retries"].sum()),
+        "cache_hits": int(records["cache_hit"].sum()),
+        "prompt_tokens": server_stats["prompt_tokens"],
+        "cached_tokens": server_stats["cached_tokens"],
+        "completion_tokens": server_stats["completion_tokens"],
+        "p50_ms": latency["p50_ms"],
+        "p95_ms": latency["p95_ms"],
+        "per_route": summarize_llm_calls(records, by="route")[
+            ["route", "calls", "p50_latency_ms", "p95_latency_ms", "total_latency_ms", "cost_usd"]
+        ] if not records.empty else None,
+    }
+
+
+# Pretty-print a benchmark report
+def print_report(report: dict, title: str = "Enrichment Benchmark"):
+    """
+    Print a benchmark report as aligned key/value lines.
+    """
+    print(f"\n=== {title} ===")
+    for key, value in report.items():
+        if isinstance(value, pd.DataFrame):
+            print(f"{key:>20}:")
+            print(value.to_string(index=False))
+        elif isinstance(value, float):
+            print(f"{key:>20}: {value:,.2f}")
+        elif isinstance(value, int) and not isinstance(value, bool):
+            print(f"{key:>20}: {value:,}")
+        else:
+            print(f"{key:>20}: {value}")
+
+
+def main():
+    from utils.llm_stub_server import StubConfig
+
+    parser = argparse.ArgumentParser(description="Benchmark process_translation_and_sentiment offline.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--yes-no-columns", type=int, default=20)
+    parser.add_argument("--hindi-columns", type=int, default=20)
+    parser.add_argument("--english-columns", type=int, default=10)
+    parser.add_argument("--multi-select-columns", type=int, default=4)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--typo-rate", type=float, default=0.02)
+    parser.add_argument(
+        "--wide", action="store_true",
+        help="150 question columns (60 yes/no, 50 Hindi, 30 English, 10 multi-select)."
+    )
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--ms-per-output-token", type=float, default=1.0)
+    parser.add_argument("--ms-per-prompt-token", type=float, default=0.1)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-rules", action="store_true", help="Send every value to the LLM.")
+    parser.add_argument("--compare-rules", action="store_true", help="Run with and without the rules fast path.")
+    parser.add_argument("--encoding", choices=["compact", "items"], default="compact")
+    parser.add_argument("--compare-encodings", action="store_true", help="Run with the items and compact encodings.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.wide:
+        args.yes_no_columns, args.hindi_columns, args.english_columns, args.multi_select_columns = 60, 50, 30, 10
+
+    data_df, metadata_df = make_synthetic_dataset(
+        n_rows=args.rows,
+        n_yes_no=args.yes_no_columns,
+        n_hindi_categorical=args.hindi_columns,
+        n_english_categorical=args.english_columns,
+        n_multi_select=args.multi_select_columns,
+        n_categories=args.categories,
+        typo_rate=args.typo_rate,
+        seed=args.seed,
+    )
+    stub_config = StubConfig(
+        latency_ms=args.latency_ms,
+        ms_per_output_token=args.ms_per_output_token,
+        ms_per_prompt_token=args.ms_per_prompt_token,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    if args.compare_rules:
+        for use_rules in (False, True):
+            report = run_benchmark(
+                data_df, metadata_df, stub_config,
+                use_rules=use_rules, encoding=args.encoding, verbose=args.verbose
+            )
+            print_report(report, title=f"Enrichment Benchmark (rules {'on' if use_rules else 'off'})")
+    elif args.compare_encodings:
+        for encoding in ("items", "compact"):
+            report = run_benchmark(
+                data_df, metadata_df, stub_config,
+                use_rules=not args.no_rules, encoding=encoding, verbose=args.verbose
+            )
+            print_report(report, title=f"Enrichment Benchmark ({encoding} encoding)")
+    else:
+        report = run_benchmark(
+            data_df, metadata_df, stub_config,
+            use_rules=not args.no_rules, encoding=args.encoding, verbose=args.verbose
+        )
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
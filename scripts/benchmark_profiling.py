@@ -0,0 +1,130 @@
+"""
+Profiling Benchmark
+-------------------
+Runs `run_zero_stage_metadata_pipeline` on a synthetic ss_data-like dataset
+with column profiling in 1, 2, 4, ... worker processes (utils/profiling_utils.py)
+and reports the wall time, the speedup over one process, and whether the
+metadata is identical to the single-process run.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_profiling --rows 200000 --wide
+    python -m scripts.benchmark_profiling --workers 1 4 8
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.benchmark_enrichment import make_synthetic_dataset, print_report
+
+# Metadata fields filled by the zero-stage pipeline
+METADATA_FIELDS = [
+    "column_name", "original_column_name", "desc_en", "data_type", "count", "original_col_seq",
+    "is_identifier", "is_multi_select", "is_categorical", "is_proper_noun", "category_values",
+    "analysis_category", "pre_enrichment_col_seq",
+]
+
+
+# Synthetic data with numeric, ID and free-text columns added
+def make_profiling_dataset(n_rows: int, n_free_text: int = 2, seed: int = 42, **dataset_kwargs) -> pd.DataFrame:
+    """
+    Synthetic dataset of make_synthetic_dataset plus numeric, date, ID and
+    free-text columns (the high-cardinality columns that dominate profiling).
+    """
+    data_df, _ = make_synthetic_dataset(n_rows=n_rows, seed=seed, **dataset_kwargs)
+    rng = np.random.default_rng(seed)
+    data_df["visit_id"] = [f"V{i:08d}" for i in range(n_rows)]
+    data_df["students_present"] = rng.integers(0, 60, n_rows)
+    data_df["score"] = np.where(rng.random(n_rows) < 0.1, np.nan, rng.normal(60, 15, n_rows))
+    data_df["visit_date"] = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n_rows), unit="D")
+    for i in range(n_free_text):
+        data_df[f"remarks_{i + 1}"] = [
+            f"टिप्पणी {k} - बच्चों ने कक्षा में अच्छा पढ़ा, शिक्षक उपस्थित" for k in rng.integers(0, n_rows // 4 + 1, n_rows)
+        ]
+    return data_df
+
+
+# Time the zero-stage pipeline per worker count
+def run_benchmark(data_df: pd.DataFrame, worker_counts: list, verbose: bool = False) -> pd.DataFrame:
+    """
+    Run the zero-stage metadata pipeline once per worker count.
+
+    Returns:
+        pd.DataFrame: workers, seconds, speedup (vs the first count) and
+        identical (metadata equal to the first run's).
+    """
+    from pipelines.fill_metadata_pipelines import run_zero_stage_metadata_pipeline
+
+    metadata_df = pd.DataFrame({field: [np.nan] * data_df.shape[1] for field in METADATA_FIELDS}, dtype=object)
+    metadata_df["column_name"] = data_df.columns
+
+    rows, baseline = [], None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        result = run_zero_stage_metadata_pipeline(data_df, metadata_df.copy(), max_workers=workers, verbose=verbose)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = (elapsed, result)
+        rows.append({
+            "workers": workers,
+            "seconds": round(elapsed, 2),
+            "speedup": round(baseline[0] / elapsed, 2),
+            "identical": result.equals(baseline[1]),
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process-parallel metadata profiling.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--yes-no-columns", type=int, default=20)
+    parser.add_argument("--hindi-columns", type=int, default=20)
+    parser.add_argument("--english-columns", type=int, default=10)
+    parser.add_argument("--multi-select-columns", type=int, default=4)
+    parser.add_argument("--free-text-columns", type=int, default=2)
+    parser.add_argument(
+        "--wide", action="store_true",
+        help="150 question columns (60 yes/no, 50 Hindi, 30 English, 10 multi-select)."
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=None,
+        help="Worker counts to run, first is the baseline (default: 1, 2, 4, ... up to the CPU count)."
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.wide:
+        args.yes_no_columns, args.hindi_columns, args.english_columns, args.multi_select_columns = 60, 50, 30, 10
+
+    worker_counts = args.workers
+    if worker_counts is None:
+        cpus = os.cpu_count() or 1
+        worker_counts = [1]
+        while worker_counts[-1] * 2 < cpus:
+            worker_counts.append(worker_counts[-1] * 2)
+        if cpus > 1:
+            worker_counts.append(cpus)
+
+    data_df = make_profiling_dataset(
+        n_rows=args.rows,
+        n_free_text=args.free_text_columns,
+        seed=args.seed,
+        n_yes_no=args.yes_no_columns,
+        n_hindi_categorical=args.hindi_columns,
+        n_english_categorical=args.english_columns,
+        n_multi_select=args.multi_select_columns,
+    )
+    results = run_benchmark(data_df, worker_counts, verbose=args.verbose)
+    print_report({
+        "rows": len(data_df),
+        "columns": data_df.shape[1],
+        "cpus": os.cpu_count() or 1,
+        "runs": results,
+    }, title="Profiling Benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import pytest
+
+from utils.llm_stub_server import StubConfig, start_stub_server
+from utils.llms import clear_llm_cache, reset_llm_clients
+
+
+@pytest.fixture
+def start_stub(monkeypatch):
+    """
+    Start the local LLM stub server (StubConfig keyword arguments) and point the
+    LLM clients at it; returns the server's stats. Each call replaces the last.
+    """
+    servers = []
+
+    def start(**config):
+        server, base_url, stats = start_stub_server(config=StubConfig(**config))
+        servers.append(server)
+        monkeypatch.setenv("LLM_BASE_URL", base_url)
+        for key in ("OPENAI_API_KEY", "GROQ_API_KEY", "DEEPSEEK_API_KEY"):
+            monkeypatch.setenv(key, "stub")
+        reset_llm_clients()
+        clear_llm_cache()
+        return stats
+
+    yield start
+    for server in servers:
+        server.shutdown()
+    reset_llm_clients()
+    clear_llm_cache()
@@ -0,0 +1,35 @@
+"""
+Checkpointed translation/sentiment runs keep fallback results out of the checkpoint.
+"""
+
+from scripts.benchmark_enrichment import make_synthetic_dataset
+from utils.enrichment_checkpoint import EnrichmentCheckpoint
+from utils.feature_utils import process_translation_and_sentiment
+
+
+def _dataset():
+    return make_synthetic_dataset(
+        n_rows=200, n_yes_no=0, n_hindi_categorical=2, n_english_categorical=2, n_multi_select=1
+    )
+
+
+def test_fallbacks_are_not_checkpointed(start_stub, tmp_path):
+    data_df, metadata_df = _dataset()
+    columns = [c for c in metadata_df["column_name"] if "_q" in c]
+    checkpoint = EnrichmentCheckpoint("run", db_path=str(tmp_path / "checkpoint.duckdb"))
+
+    # Every reply item is malformed: all LLM results are fallbacks
+    start_stub(malformed_rate=1.0)
+    process_translation_and_sentiment(
+        data_df.copy(), metadata_df.copy(), columns=columns, use_rules=False, checkpoint=checkpoint
+    )
+    assert checkpoint.completed() == {}
+
+    # The resumed run enriches the columns and saves them
+    stats = start_stub()
+    enriched_df, _ = process_translation_and_sentiment(
+        data_df.copy(), metadata_df.copy(), columns=columns, use_rules=False, checkpoint=checkpoint
+    )
+    assert stats.as_dict()["calls"] > 0
+    assert set(checkpoint.completed()) == set(columns)
+    assert (enriched_df["english_cat_q1_sentiment"] != "unknown").all()
@@ -0,0 +1,113 @@
+"""
+Metadata pipeline -> free-text enrichment, end to end against the local LLM stub.
+"""
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from pipelines.fill_metadata_pipelines import run_zero_stage_metadata_pipeline
+from scripts.benchmark_profiling import METADATA_FIELDS
+from utils.freetext_enrichment import process_free_text_columns, side_table_name
+from utils.llms import clear_llm_cache
+
+
+def _survey(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    data_df = pd.DataFrame({
+        "yes_no_q1": rng.choice(["हाँ", "नहीं"], n_rows),
+        "remarks": [
+            f"टिप्पणी {k} - बच्चों ने कक्षा में अच्छा पढ़ा, शिक्षक उपस्थित" for k in rng.integers(0, 120, n_rows)
+        ],
+    })
+    metadata_df = pd.DataFrame({field: [np.nan] * data_df.shape[1] for field in METADATA_FIELDS}, dtype=object)
+    metadata_df["column_name"] = data_df.columns
+    metadata_df["desc_en"] = ["Was the checklist item observed", "Remarks of the mentor"]
+    metadata_df["lang"] = "hi"
+    metadata_df["sentiment_required"] = "yes"
+    return data_df, metadata_df
+
+
+def test_pipeline_flags_and_enriches_free_text(start_stub, tmp_path):
+    stats = start_stub(latency_ms=1)
+    data_df, metadata_df = _survey()
+
+    metadata_df = run_zero_stage_metadata_pipeline(data_df, metadata_df, verbose=False)
+    flags = dict(zip(metadata_df["column_name"], metadata_df["is_free_text"]))
+    assert flags == {"yes_no_q1": "False", "remarks": "True"}
+
+    enriched_df, enriched_meta = process_free_text_columns(
+        data_df, metadata_df, db_path=str(tmp_path / "freetext.duckdb")
+    )
+    assert {"remarks_en", "remarks_sentiment"} <= set(enriched_df.columns)
+    assert enriched_df["remarks_en"].notna().all()
+    assert enriched_df["remarks_sentiment"].notna().all()
+    assert "yes_no_q1_en" not in enriched_df.columns
+    assert {"remarks_en", "remarks_sentiment"} <= set(enriched_meta["column_name"])
+
+    # A second run is answered from the side table, not the response cache
+    clear_llm_cache()
+    n_calls = stats.as_dict()["calls"]
+    assert n_calls > 0
+    process_free_text_columns(data_df, metadata_df, db_path=str(tmp_path / "freetext.duckdb"))
+    assert stats.as_dict()["calls"] == n_calls
+
+
+def test_failed_values_stay_pending(start_stub, tmp_path):
+    data_df, metadata_df = _survey()
+    metadata_df = run_zero_stage_metadata_pipeline(data_df, metadata_df, verbose=False)
+    db_path = str(tmp_path / "freetext.duckdb")
+
+    # Every reply item is malformed: nothing is enriched, nothing is stored as done
+    start_stub(malformed_rate=1.0)
+    enriched_df, _ = process_free_text_columns(data_df, metadata_df, db_path=db_path)
+    assert enriched_df["remarks_en"].isna().all()
+    assert enriched_df["remarks_sentiment"].isna().all()
+    with duckdb.connect(db_path) as con:
+        side_df = con.execute(f'SELECT * FROM "{side_table_name("remarks")}"').fetchdf()
+    assert len(side_df) == data_df["remarks"].nunique()
+    assert side_df[["remarks_en", "remarks_sentiment"]].isna().all().all()
+
+    # The next run sends the failed values again
+    start_stub()
+    enriched_df, _ = process_free_text_columns(data_df, metadata_df, db_path=db_path)
+    assert enriched_df["remarks_en"].notna().all()
+    assert enriched_df["remarks_sentiment"].notna().all()
+
+
+def test_names_and_ids_are_not_free_text(start_stub, tmp_path):
+    stats = start_stub()
+    data_df, metadata_df = _survey()
+    data_df["village_name"] = [f"ग्राम पंचायत रामपुर खुर्द {k}, विकासखंड सदर" for k in range(len(data_df))]
+    metadata_df = pd.concat([metadata_df, metadata_df.iloc[[1]].assign(column_name="village_name")], ignore_index=True)
+
+    metadata_df = run_zero_stage_metadata_pipeline(data_df, metadata_df, verbose=False)
+    row = metadata_df.set_index("column_name").loc["village_name"]
+    assert row["is_proper_noun"] == "True"
+    assert row["is_free_text"] == "False"
+
+    # A hand-set flag does not send names to the LLM either
+    metadata_df.loc[metadata_df["column_name"] == "village_name", "is_free_text"] = "True"
+    enriched_df, _ = process_free_text_columns(
+        data_df.drop(columns="remarks"), metadata_df, db_path=str(tmp_path / "freetext.duckdb")
+    )
+    assert "village_name_en" not in enriched_df.columns
+    assert stats.as_dict()["calls"] == 0
+
+
+def test_rerun_on_enriched_data_is_a_no_op(start_stub, tmp_path):
+    stats = start_stub()
+    data_df, metadata_df = _survey()
+    metadata_df = run_zero_stage_metadata_pipeline(data_df, metadata_df, verbose=False)
+    db_path = str(tmp_path / "freetext.duckdb")
+
+    enriched_df, enriched_meta = process_free_text_columns(data_df, metadata_df, db_path=db_path)
+    en_row = enriched_meta.set_index("column_name").loc["remarks_en"]
+    assert (en_row["lang"], en_row["is_free_text"], en_row["sentiment_required"]) == ("en", "False", "no")
+
+    clear_llm_cache()
+    n_calls = stats.as_dict()["calls"]
+    rerun_df, rerun_meta = process_free_text_columns(enriched_df, enriched_meta, db_path=db_path)
+    assert stats.as_dict()["calls"] == n_calls
+    pd.testing.assert_frame_equal(rerun_df, enriched_df)
+    pd.testing.assert_frame_equal(rerun_meta, enriched_meta)
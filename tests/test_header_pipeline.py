@@ -0,0 +1,55 @@
+"""
+Header pipeline renames from the mapping it built and fails if it cannot save it.
+"""
+
+import pandas as pd
+import pytest
+
+from pipelines.clean_translate_rename_header_pipe import clean_translate_rename_headers_pipe
+from utils.header_registry import register_headers
+
+
+@pytest.fixture
+def registry(tmp_path):
+    db_path = str(tmp_path / "registry.duckdb")
+    register_headers([
+        {"original_name": "Teacher present", "translated_name": "Teacher present", "short_name": "teacher_present"},
+        {"original_name": "Students present", "translated_name": "Students present", "short_name": "students"},
+    ], source="mapping", db_path=db_path)
+    return db_path
+
+
+def _raw():
+    return pd.DataFrame({"Teacher present": ["हाँ"], "Students present": [12]})
+
+
+def _write_stale_mapping(path):
+    pd.DataFrame([{"original_name": "Teacher present", "translated_name": "Old", "short_name": "old_name"}]).to_csv(
+        path, index=False
+    )
+
+
+def test_renames_from_the_mapping_built(registry, tmp_path):
+    mapping_path = tmp_path / "mapping.csv"
+    _write_stale_mapping(mapping_path)
+    df = clean_translate_rename_headers_pipe(
+        _raw(), str(mapping_path), str(tmp_path / "out.csv"),
+        use_existing_mapping=False, registry_db_path=registry
+    )
+    assert df.columns.tolist() == ["teacher_present", "students"]
+    assert pd.read_csv(mapping_path)["short_name"].tolist() == ["teacher_present", "students"]
+
+
+def test_failed_mapping_save_raises(registry, tmp_path, monkeypatch):
+    # The stale file must not be used when the new mapping cannot be written
+    mapping_path = tmp_path / "mapping.csv"
+    _write_stale_mapping(mapping_path)
+    monkeypatch.setattr(
+        "pipelines.clean_translate_rename_header_pipe.save_column_mapping", lambda mapping, path: False
+    )
+    with pytest.raises(OSError):
+        clean_translate_rename_headers_pipe(
+            _raw(), str(mapping_path), str(tmp_path / "out.csv"),
+            use_existing_mapping=False, registry_db_path=registry
+        )
+    assert not (tmp_path / "out.csv").exists()
@@ -0,0 +1,69 @@
+"""
+Header registry: headers sharing a fingerprint keep their own entries.
+"""
+
+import duckdb
+
+from utils.header_registry import (
+    REGISTRY_TABLE,
+    header_fingerprint,
+    load_header_registry,
+    map_headers,
+    register_headers,
+)
+
+
+def test_colliding_headers_do_not_overwrite(tmp_path):
+    db_path = str(tmp_path / "registry.duckdb")
+    assert header_fingerprint("Teacher present") == header_fingerprint("present teacher")
+
+    register_headers([
+        {"original_name": "Teacher present", "translated_name": "Teacher present", "short_name": "teacher_present"},
+    ], db_path=db_path)
+    register_headers([
+        {"original_name": "present teacher", "translated_name": "Present teacher", "short_name": "present_teacher"},
+    ], db_path=db_path)
+
+    registry_df = load_header_registry(db_path)
+    assert dict(zip(registry_df["original_name"], registry_df["short_name"])) == {
+        "Teacher present": "teacher_present",
+        "present teacher": "present_teacher",
+    }
+
+    mapped = map_headers(["Teacher present", "present teacher"], db_path=db_path, verbose=False)
+    assert [(m["short_name"], m["match"]) for m in mapped] == [
+        ("teacher_present", "exact"),
+        ("present_teacher", "exact"),
+    ]
+
+
+def test_exact_match_needs_the_same_text(tmp_path):
+    db_path = str(tmp_path / "registry.duckdb")
+    register_headers([
+        {"original_name": "Teacher present", "translated_name": "Teacher present", "short_name": "teacher_present"},
+    ], db_path=db_path)
+
+    mapped = map_headers(["Teacher Present!"], db_path=db_path, verbose=False)
+    assert mapped[0]["match"] == "fuzzy"
+    assert set(load_header_registry(db_path)["original_name"]) == {"Teacher present", "Teacher Present!"}
+
+
+def test_registry_keyed_by_fingerprint_is_migrated(tmp_path):
+    db_path = str(tmp_path / "registry.duckdb")
+    with duckdb.connect(db_path) as con:
+        con.execute(f"""
+            CREATE TABLE {REGISTRY_TABLE} (
+                fingerprint VARCHAR PRIMARY KEY, original_name VARCHAR, translated_name VARCHAR,
+                short_name VARCHAR, source VARCHAR, created_at TIMESTAMP
+            )
+        """)
+        con.execute(
+            f"INSERT INTO {REGISTRY_TABLE} VALUES (?, 'Teacher present', 'Teacher present', 'teacher_present', "
+            f"'mapping', now())",
+            [header_fingerprint("Teacher present")]
+        )
+
+    register_headers([
+        {"original_name": "present teacher", "translated_name": "Present teacher", "short_name": "present_teacher"},
+    ], db_path=db_path)
+    assert set(load_header_registry(db_path)["original_name"]) == {"Teacher present", "present teacher"}
@@ -0,0 +1,20 @@
+"""
+Only replies that validate are cached, so a repair round reaches the model again.
+"""
+
+from utils.llm_utils import request_enrichment
+
+
+def test_malformed_reply_is_not_cached(start_stub):
+    stats = start_stub(malformed_rate=1.0)
+    output, failed = request_enrichment(["good", "bad"], ("sentiment",))
+    assert failed == [0, 1]
+    assert stats.as_dict()["calls"] == 2  # First request and repair round
+
+
+def test_valid_reply_is_cached(start_stub):
+    stats = start_stub()
+    request_enrichment(["good", "bad"], ("sentiment",))
+    output, failed = request_enrichment(["good", "bad"], ("sentiment",))
+    assert failed == []
+    assert stats.as_dict()["calls"] == 1
@@ -0,0 +1,42 @@
+"""
+Route configuration is read after .env is loaded, and defaults to DeepSeek.
+"""
+
+import dotenv
+
+import utils.llms
+from utils.llm_router import FAST_ROUTE, STRONG_ROUTE, get_route, same_model
+
+
+def test_routes_default_to_deepseek(monkeypatch):
+    for key in ("LLM_FAST_PROVIDER", "LLM_FAST_MODEL", "LLM_STRONG_PROVIDER", "LLM_STRONG_MODEL"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setattr(utils.llms, "_env_loaded", True)
+    assert get_route(FAST_ROUTE).provider == "deepseek"
+    assert get_route(STRONG_ROUTE).provider == "deepseek"
+    assert get_route(STRONG_ROUTE).model is None
+
+
+def test_route_settings_from_dotenv(monkeypatch):
+    monkeypatch.delenv("LLM_STRONG_PROVIDER", raising=False)
+    monkeypatch.delenv("LLM_STRONG_MODEL", raising=False)
+
+    def load_dotenv():
+        # Stands in for a .env file with a strong-route override
+        monkeypatch.setenv("LLM_STRONG_PROVIDER", "openai")
+        monkeypatch.setenv("LLM_STRONG_MODEL", "gpt-4o")
+
+    monkeypatch.setattr(dotenv, "load_dotenv", load_dotenv)
+    monkeypatch.setattr(utils.llms, "_env_loaded", False)
+    route = get_route(STRONG_ROUTE)
+    assert (route.provider, route.model) == ("openai", "gpt-4o")
+
+
+def test_default_routes_share_a_model(monkeypatch):
+    for key in ("LLM_FAST_PROVIDER", "LLM_FAST_MODEL", "LLM_STRONG_PROVIDER", "LLM_STRONG_MODEL"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setattr(utils.llms, "_env_loaded", True)
+    assert same_model(FAST_ROUTE, STRONG_ROUTE)
+    monkeypatch.setenv("LLM_STRONG_PROVIDER", "openai")
+    monkeypatch.setenv("LLM_STRONG_MODEL", "gpt-4o")
+    assert not same_model(FAST_ROUTE, STRONG_ROUTE)
@@ -0,0 +1,33 @@
+"""
+MetadataStore construction and the enrichment helpers that update metadata through it.
+"""
+
+import pandas as pd
+import pytest
+
+from utils.feature_utils import translate_and_replace_categorical_columns
+from utils.metadata_store import MetadataStore
+
+
+def test_duplicate_column_names_raise():
+    metadata_df = pd.DataFrame({"column_name": ["a", "b", "a"], "desc_en": ["x", "y", "z"]})
+    with pytest.raises(ValueError, match="'a'"):
+        MetadataStore.from_frame(metadata_df)
+
+
+def test_translate_and_replace_updates_metadata():
+    data_df = pd.DataFrame({"q1": ["हाँ", "नहीं", "हाँ"], "q2": ["x", "y", "x"]})
+    metadata_df = pd.DataFrame({
+        "column_name": ["q1", "q2"],
+        "is_categorical": ["True", "False"],
+        "category_values": [str(["हाँ", "नहीं"]), "nan"],
+    })
+    translations = {"हाँ": "yes", "नहीं": "no"}
+
+    data_df, metadata_df = translate_and_replace_categorical_columns(
+        data_df, metadata_df, lambda values: [translations[v] for v in values]
+    )
+    assert data_df["q1"].tolist() == ["yes", "no", "yes"]
+    assert data_df["q2"].tolist() == ["x", "y", "x"]
+    assert isinstance(metadata_df, pd.DataFrame)
+    assert metadata_df.set_index("column_name").loc["q1", "category_values"] == str(["yes", "no"])
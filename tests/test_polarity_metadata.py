@@ -0,0 +1,48 @@
+"""
+The metadata pipeline fills polarity of yes/no columns, so the sentiment rules apply.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pipelines.fill_metadata_pipelines import run_zero_stage_metadata_pipeline
+from scripts.benchmark_profiling import METADATA_FIELDS
+from utils.feature_utils import process_translation_and_sentiment
+from utils.sentiment_rules import question_polarity
+
+
+def test_question_polarity():
+    assert question_polarity("Was the TLM used in class?") == "positive"
+    assert question_polarity("Was there a shortage of books?") == "negative"
+    assert question_polarity("Was the teacher not present?") == "negative"
+    assert question_polarity("Description to be added later", "क्या शौचालय में गंदगी थी") == "negative"
+    assert question_polarity(np.nan, "क्या बच्चों ने पढ़ा") == "positive"
+
+
+def test_pipeline_polarity_drives_sentiment_rules(start_stub):
+    rng = np.random.default_rng(0)
+    data_df = pd.DataFrame({
+        "tlm_used": rng.choice(["हाँ", "नहीं", "Yes"], 100),
+        "book_shortage": rng.choice(["हां", "नहीं"], 100),
+        "block_town": rng.choice(["लखनऊ", "कानपुर"], 100),
+    })
+    metadata_df = pd.DataFrame({field: [np.nan] * 3 for field in METADATA_FIELDS}, dtype=object)
+    metadata_df["column_name"] = data_df.columns
+    metadata_df["desc_en"] = ["Was the TLM used in class", "Was there a shortage of books", "Block"]
+    metadata_df["lang"] = "hi"
+    metadata_df["sentiment_required"] = "yes"
+
+    metadata_df = run_zero_stage_metadata_pipeline(data_df, metadata_df, verbose=False)
+    polarity = dict(zip(metadata_df["column_name"], metadata_df["polarity"]))
+    assert polarity["tlm_used"] == "positive"
+    assert polarity["book_shortage"] == "negative"
+    assert pd.isna(polarity["block_town"]) or polarity["block_town"] == "nan"
+
+    stats = start_stub()
+    enriched_df, _ = process_translation_and_sentiment(
+        data_df.copy(), metadata_df, columns=["tlm_used", "book_shortage"], use_rules=True
+    )
+    assert stats.as_dict()["calls"] == 0
+    pairs = set(zip(data_df["book_shortage"], enriched_df["book_shortage_sentiment"]))
+    assert pairs == {("हां", "negative"), ("नहीं", "positive")}
+    assert set(enriched_df["tlm_used"]) == {"Yes", "No"}
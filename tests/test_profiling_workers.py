@@ -0,0 +1,42 @@
+"""
+Parallel profiling never forks a process that runs other threads.
+"""
+
+import threading
+
+from scripts.benchmark_profiling import make_profiling_dataset
+from utils import profiling_utils
+from utils.profiling_utils import profile_columns
+
+
+def _running_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, daemon=True)
+    thread.start()
+    return stop, thread
+
+
+def test_no_fork_with_threads_running():
+    stop, thread = _running_thread()
+    try:
+        assert profiling_utils._fork_context() is None
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_parallel_profile_with_threads_matches_serial():
+    data_df = make_profiling_dataset(
+        n_rows=2000, n_yes_no=3, n_hindi_categorical=2, n_english_categorical=2, n_multi_select=1
+    )
+    serial = profile_columns(data_df)
+
+    stop, thread = _running_thread()
+    try:
+        parallel = profile_columns(data_df, max_workers=2)
+    finally:
+        stop.set()
+        thread.join()
+    assert list(parallel) == list(serial)
+    for col in serial:
+        assert repr(parallel[col]) == repr(serial[col]), col
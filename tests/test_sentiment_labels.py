@@ -0,0 +1,25 @@
+"""
+Only sentiments that passed validation are recorded as classifier training labels.
+"""
+
+from scripts.benchmark_enrichment import make_synthetic_dataset
+from utils.feature_utils import process_translation_and_sentiment
+from utils.sentiment_classifier import flush_sentiment_labels, load_sentiment_labels
+
+
+def test_fallback_sentiments_are_not_labels(start_stub, tmp_path):
+    data_df, metadata_df = make_synthetic_dataset(
+        n_rows=200, n_yes_no=0, n_hindi_categorical=0, n_english_categorical=2, n_multi_select=0
+    )
+    columns = ["english_cat_q1", "english_cat_q2"]
+    db_path = str(tmp_path / "labels.duckdb")
+    flush_sentiment_labels(str(tmp_path / "earlier.duckdb"))
+
+    start_stub(malformed_rate=1.0)
+    process_translation_and_sentiment(data_df.copy(), metadata_df.copy(), columns=columns, use_rules=False)
+    assert flush_sentiment_labels(db_path) == 0
+
+    start_stub()
+    process_translation_and_sentiment(data_df.copy(), metadata_df.copy(), columns=columns, use_rules=False)
+    assert flush_sentiment_labels(db_path) > 0
+    assert "unknown" not in set(load_sentiment_labels(db_path)["sentiment"])
@@ -0,0 +1,18 @@
+"""
+Near-duplicate values are merged, but not values that differ in a number.
+"""
+
+from utils.value_dedup import collapse_near_duplicates
+
+
+def test_values_with_different_numbers_stay_apart():
+    values = ["Teacher present in class 1 and 2", "Teacher present in class 1 and 3"]
+    mapping = collapse_near_duplicates(values, threshold=0.8)
+    assert mapping == {value: value for value in values}
+
+
+def test_near_duplicates_with_same_numbers_merge():
+    values = ["Teacher present in class 1 and 2", "Teacher presnt in class 1 and 2."]
+    counts = {values[0]: 5, values[1]: 1}
+    mapping = collapse_near_duplicates(values, counts=counts, threshold=0.8)
+    assert set(mapping.values()) == {values[0]}
@@ -30,7 +30,6 @@ def clean_dataframe_cells(df: pd.DataFrame) -> pd.DataFrame:
 # Infer and convert column types
 from typing import Tuple, Dict
 import warnings
-warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
 
 def infer_and_convert_column_types(
     df: pd.DataFrame, sample_size: int = 100, verbose: bool = False
@@ -49,13 +48,15 @@ def infer_and_convert_column_types(
             - Dictionary mapping column names to inferred types.
     """
     inferred_types = {}
-    df_converted = df.copy()
+    # Converted columns are collected and the frame is built once at the end;
+    # assigning them one by one leaves one block per column
+    converted_columns = {}
 
     for col in df.columns:
         sample = df[col].dropna()
         if sample.empty:
             inferred_types[col] = "string"
-            df_converted[col] = df[col].astype(str)
+            converted_columns[col] = df[col].astype(str)
             if verbose:
                 print(f"[{col}] All values empty or NaN, defaulting to string.")
             continue
@@ -68,7 +69,7 @@ def infer_and_convert_column_types(
         try:
             converted = pd.to_numeric(sample, errors="raise", downcast="integer")
             if not converted.isna().all():
-                df_converted[col] = pd.to_numeric(df[col], errors="coerce", downcast="integer")
+                converted_columns[col] = pd.to_numeric(df[col], errors="coerce", downcast="integer")
                 inferred_types[col] = "integer"
                 if verbose:
                     print(f"[{col}] Inferred as integer.")
@@ -80,7 +81,7 @@ def infer_and_convert_column_types(
         try:
             converted = pd.to_numeric(sample, errors="raise", downcast="float")
             if not converted.isna().all():
-                df_converted[col] = pd.to_numeric(df[col], errors="coerce", downcast="float")
+                converted_columns[col] = pd.to_numeric(df[col], errors="coerce", downcast="float")
                 inferred_types[col] = "float"
                 if verbose:
                     print(f"[{col}] Inferred as float.")
@@ -94,7 +95,7 @@ def infer_and_convert_column_types(
                 warnings.simplefilter("ignore")
                 converted = pd.to_datetime(sample, errors="raise")
             if not converted.isna().all():
-                df_converted[col] = pd.to_datetime(df[col], errors="coerce")
+                converted_columns[col] = pd.to_datetime(df[col], errors="coerce")
                 inferred_types[col] = "datetime"
                 if verbose:
                     print(f"[{col}] Inferred as datetime.")
@@ -105,12 +106,15 @@ def infer_and_convert_column_types(
         # Default to string
         try:
             inferred_types[col] = "string"
-            df_converted[col] = df[col].astype(str)
+            converted_columns[col] = df[col].astype(str)
             if verbose:
                 print(f"[{col}] Defaulting to string.")
         except Exception:
             pass
 
+    df_converted = pd.DataFrame(
+        {col: converted_columns.get(col, df[col]) for col in df.columns}, index=df.index
+    )
     return df_converted, inferred_types
 
 
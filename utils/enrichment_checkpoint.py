@@ -0,0 +1,135 @@
+"""
+Enrichment Checkpoints
+-------------------
+Per-column results of a translation/sentiment run, persisted as each column
+completes so a run that fails part-way can be resumed without paying for the
+same LLM calls again.
+
+process_translation_and_sentiment(checkpoint=...) saves, for every enriched
+column, its distinct values with their translations and sentiments plus the
+metadata rows it updated (the column and its `<col>_sentiment` row). With the
+same checkpoint, finished columns are restored from it instead of re-enriched.
+Checkpoints of a run are keyed by `run_key` (see `checkpoint_key`), stored in a
+DuckDB table:
+
+    enrichment_checkpoint(run_key, column_name, result_json, saved_at)
+
+Free-text columns need no checkpoint: their side tables (utils/freetext_enrichment.py)
+already persist every value as its batch completes.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+# Default DuckDB file for checkpoints (override with ENRICHMENT_CHECKPOINT_DB)
+DEFAULT_CHECKPOINT_DB = "data/interim/enrichment_checkpoint.duckdb"
+CHECKPOINT_TABLE = "enrichment_checkpoint"
+
+# Plan keys needed to re-apply saved results (see feature_utils._map_enriched_values)
+_PLAN_KEYS = ("unique_values", "multi_select", "sentiment_required")
+
+
+# Run key of a set of input files
+def checkpoint_key(*paths) -> str:
+    """
+    Return a key identifying a run by its input files (absolute path, size and
+    modification time), so a resumed run only reuses checkpoints of unchanged inputs.
+    """
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}")
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _to_native(value):
+    # NumPy scalars -> Python scalars; anything else JSON cannot encode -> str
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class EnrichmentCheckpoint:
+    """
+    Completed columns of one enrichment run, stored in DuckDB.
+    """
+
+    def __init__(self, run_key: str, db_path: Optional[str] = None):
+        self.run_key = run_key
+        self.db_path = db_path or os.getenv("ENRICHMENT_CHECKPOINT_DB", DEFAULT_CHECKPOINT_DB)
+
+    def _connect(self):
+        import duckdb
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        con = duckdb.connect(self.db_path)
+        con.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                run_key VARCHAR,
+                column_name VARCHAR,
+                result_json VARCHAR,
+                saved_at TIMESTAMP,
+                PRIMARY KEY (run_key, column_name)
+            )
+        """)
+        return con
+
+    def completed(self) -> dict:
+        """
+        Saved results of the run.
+
+        Returns:
+            dict: {column_name: {"plan", "translated", "sentiments", "metadata"}}.
+        """
+        con = self._connect()
+        try:
+            rows = con.execute(
+                f"SELECT column_name, result_json FROM {CHECKPOINT_TABLE} WHERE run_key = ?", [self.run_key]
+            ).fetchall()
+        finally:
+            con.close()
+        return {col: json.loads(result) for col, result in rows}
+
+    def save(self, col: str, plan: dict, translated: list, sentiments: list, metadata_rows: list):
+        """
+        Persist the results of one column (committed immediately).
+
+        Args:
+            col (str): Column name.
+            plan (dict): The column's enrichment plan (only the keys needed to re-apply it are kept).
+            translated (list): Translations aligned with plan["unique_values"].
+            sentiments (list): Sentiments aligned with plan["unique_values"].
+            metadata_rows (list of dict): Metadata records updated for the column.
+        """
+        result = {
+            "plan": {key: plan[key] for key in _PLAN_KEYS},
+            "translated": translated,
+            "sentiments": sentiments,
+            "metadata": metadata_rows,
+        }
+        con = self._connect()
+        try:
+            con.execute(
+                f"INSERT OR REPLACE INTO {CHECKPOINT_TABLE} VALUES (?, ?, ?, ?)",
+                [self.run_key, col, json.dumps(result, ensure_ascii=False, default=_to_native), datetime.now()]
+            )
+        finally:
+            con.close()
+
+    def clear(self) -> int:
+        """
+        Delete every checkpoint of the run.
+
+        Returns:
+            int: Number of columns deleted.
+        """
+        con = self._connect()
+        try:
+            n = con.execute(
+                f"SELECT count(*) FROM {CHECKPOINT_TABLE} WHERE run_key = ?", [self.run_key]
+            ).fetchone()[0]
+            con.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE run_key = ?", [self.run_key])
+        finally:
+            con.close()
+        return n
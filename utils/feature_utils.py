@@ -1,9 +1,28 @@
 
+import numpy as np
 import pandas as pd
 from utils.llm_utils import (
     translate_list_with_llm,
     translate_list_and_infer_sentiment_with_llm,
     infer_sentiment_with_llm,
+    estimate_enrichment_request,
+    enrichment_batch_request,
+    request_enrichment,
+)
+from utils.llm_metrics import llm_call_context, estimate_cost_usd
+from utils.sentiment_rules import resolve_with_rules, parse_polarity
+from utils.value_dedup import collapse_near_duplicates
+from utils.sentiment_classifier import record_sentiment_labels
+from utils.llm_router import choose_route_for_values, get_route
+from utils.llms import resolve_provider_and_model
+from utils.transliteration import transliterate_values
+from utils.metadata_store import as_metadata_store, metadata_like
+from utils.multi_select import (
+    split_multi_select,
+    recombine_options,
+    majority_sentiment,
+    MULTI_SELECT_SEPARATOR,
+    RECOMBINE_SEPARATOR,
 )
 import ast
 
@@ -21,37 +40,31 @@ def translate_and_replace_categorical_columns(
 
     Args:
         data_df (pd.DataFrame): Main data.
-        metadata_df (pd.DataFrame): Metadata.
+        metadata_df (pd.DataFrame or MetadataStore): Metadata.
         llm_function (callable): LLM translator function.
         columns (list or None): Which columns to process.
         verbose (bool): Print progress.
 
     Returns:
         pd.DataFrame: Updated data_df.
-        pd.DataFrame: Updated metadata_df.
+        Updated metadata (same type as metadata_df).
     """
+    store = as_metadata_store(metadata_df)
     if columns is None:
-        columns = metadata_df.loc[
-            metadata_df["is_categorical"].astype(str).str.lower() == "true",
-            "column_name"
-        ].tolist()
+        columns = store.where_true("is_categorical")
     
     for col in columns:
         if verbose:
             print(f"\n🔹 Processing column: {col}")
         
         # Retrieve category_values
-        cat_values_str = metadata_df.loc[
-            metadata_df["column_name"] == col, "category_values"
-        ].values[0]
-        
-        if pd.isna(cat_values_str) or cat_values_str.strip() == "":
+        if store.is_blank(col, "category_values"):
             if verbose:
                 print(f"⚠️ No category_values for {col}. Skipping.")
             continue
         
         try:
-            original_values = ast.literal_eval(cat_values_str)
+            original_values = ast.literal_eval(store.get(col, "category_values"))
         except Exception as e:
             print(f"❌ Error parsing category_values for {col}: {e}")
             continue
@@ -70,31 +83,28 @@ def translate_and_replace_categorical_columns(
         mapping = dict(zip(original_values, translated_values))
         
         # Replace values in the column
-        data_df[col] = data_df[col].map(mapping).fillna(data_df[col])
+        data_df[col] = remap_by_codes(data_df[col], [mapping], fill_unmapped=True)[0]
         
         # Update metadata category_values
-        metadata_df.loc[
-            metadata_df["column_name"] == col, "category_values"
-        ] = str(translated_values)
+        store.set(col, "category_values", str(translated_values))
         
         if verbose:
             print(f"🟢 Replaced values in column '{col}' and updated metadata.")
     
-    return data_df, metadata_df
+    return data_df, metadata_like(store, metadata_df)
 
 # Translate and add sentiment   
 def translate_and_add_sentiment_column(data_df, metadata_df, llm_function, columns=None, verbose=False):
     """
     Translates categorical values and adds a sentiment column.
     Replaces original column values with translations.
-    Also updates metadata category_values.
+    Also updates metadata category_values (metadata_df may be a MetadataStore;
+    the same type is returned).
     """
+    store = as_metadata_store(metadata_df)
     if columns is None:
         # Auto-pick categorical columns
-        columns = metadata_df.loc[
-            metadata_df["is_categorical"].str.lower() == "true",
-            "column_name"
-        ].tolist()
+        columns = store.where_true("is_categorical")
 
     for col in columns:
         if verbose:
@@ -104,9 +114,7 @@ def translate_and_add_sentiment_column(data_df, metadata_df, llm_function, colum
         unique_values = sorted(data_df[col].dropna().unique().tolist())
 
         # Get column description from metadata
-        desc = metadata_df.loc[
-            metadata_df["column_name"] == col, "desc_en"
-        ].values[0]
+        desc = store.get(col, "desc_en")
 
         # Call LLM
         response = llm_function(unique_values, desc)
@@ -119,21 +127,17 @@ def translate_and_add_sentiment_column(data_df, metadata_df, llm_function, colum
         mapping = dict(zip(unique_values, translated))
         sentiment_mapping = dict(zip(unique_values, sentiments))
 
-        # Replace in dataframe
-        data_df[col] = data_df[col].map(mapping)
-        # Add sentiment column
+        # Replace in dataframe and add sentiment column, both from the original values' codes
         sentiment_col = f"{col}_sentiment"
-        data_df[sentiment_col] = data_df[col].map(sentiment_mapping)
+        data_df[col], data_df[sentiment_col] = remap_by_codes(data_df[col], [mapping, sentiment_mapping])
 
         # Update metadata
-        metadata_df.loc[
-            metadata_df["column_name"] == col, "category_values"
-        ] = str(translated)
+        store.set(col, "category_values", str(translated))
 
         if verbose:
             print(f"✅ {col} replaced and {sentiment_col} added.")
 
-    return data_df, metadata_df
+    return data_df, metadata_like(store, metadata_df)
 
 
 
@@ -193,7 +197,7 @@ def process_translation_and_sentiment_old(data_df, metadata_df, columns=None, ve
                 print("📝 Case: Hindi + Translation only")
             translated = translate_list_with_llm(unique_values)
             lookup = dict(zip(unique_values, translated))
-            data_df[col] = data_df[col].map(lookup)
+            data_df[col] = remap_by_codes(data_df[col], [lookup])[0]
 
             metadata_df.loc[metadata_df["column_name"] == col, "category_values"] = str(translated)
             if verbose:
@@ -207,15 +211,15 @@ def process_translation_and_sentiment_old(data_df, metadata_df, columns=None, ve
             translated = response["translated_value"]
             sentiments = response["sentiment"]
 
-            # Replace column with translated values
+            # Replace column with translated values and create sentiment column,
+            # both from the codes of the original values
             lookup_trans = dict(zip(unique_values, translated))
-            data_df[col] = data_df[col].map(lookup_trans)
-            metadata_df.loc[metadata_df["column_name"] == col, "category_values"] = str(translated)
-
-            # Create sentiment column
-            sentiment_col = f"{col}_sentiment"
             lookup_sent = dict(zip(unique_values, sentiments))
-            data_df[sentiment_col] = data_df[col].map(lambda x: lookup_sent.get(x, "unknown"))
+            sentiment_col = f"{col}_sentiment"
+            mapped_trans, mapped_sent = remap_by_codes(data_df[col], [lookup_trans, lookup_sent])
+            data_df[col] = mapped_trans
+            data_df[sentiment_col] = mapped_sent.fillna("unknown")
+            metadata_df.loc[metadata_df["column_name"] == col, "category_values"] = str(translated)
 
             # Append new row to metadata
             metadata_df = pd.concat([
@@ -238,7 +242,7 @@ def process_translation_and_sentiment_old(data_df, metadata_df, columns=None, ve
             sentiments = infer_sentiment_with_llm(unique_values, desc)
             sentiment_col = f"{col}_sentiment"
             lookup_sent = dict(zip(unique_values, sentiments))
-            data_df[sentiment_col] = data_df[col].map(lambda x: lookup_sent.get(x, "unknown"))
+            data_df[sentiment_col] = remap_by_codes(data_df[col], [lookup_sent])[0].fillna("unknown")
 
             metadata_df = pd.concat([
                 metadata_df,
@@ -260,17 +264,491 @@ def process_translation_and_sentiment_old(data_df, metadata_df, columns=None, ve
 
     return data_df, metadata_df
 
+# Distinct values of a column (atomic options for multi-select columns)
+def _unique_values(series, multi_select=False):
+    values = split_multi_select(series) if multi_select else series.dropna()
+    return sorted(values.unique().tolist())
+
+
+# Decide what enrichment a column needs
+def _column_enrichment_plan(col, data_df, store, use_category_values=True, verbose=False):
+    """
+    Work out what process_translation_and_sentiment will do for one column.
+    With use_category_values=False, filled category_values do not mark the column
+    as translated: unique values always come from the data (delta enrichment).
+
+    Returns:
+        dict or None: None if the column is skipped, else a plan with keys
+        lang, sentiment_required, polarity, col_desc, unique_values, skip_translation,
+        is_categorical, multi_select, transliterate and fields (the LLM fields to request:
+        'translated_value' and/or 'sentiment'). For multi-select columns unique_values
+        are the atomic options. Hindi proper-noun columns (is_proper_noun == True) are
+        transliterated locally instead of translated, categorical or not.
+    """
+    if col not in store:
+        if verbose:
+            print(f"[⚠️] Column '{col}' not found in metadata. Skipping.")
+        return None
+
+    is_categorical = store.is_true(col, "is_categorical")
+    lang = str(store.get(col, "lang")).strip().lower()
+    sentiment_required = str(store.get(col, "sentiment_required")).strip().lower() == "yes"
+    col_desc = str(store.get(col, "desc_en")).strip()
+    multi_select = store.is_true(col, "is_multi_select")
+    proper_noun = store.is_true(col, "is_proper_noun")
+    transliterate = proper_noun and lang == "hi"
+
+    if not is_categorical and not transliterate:
+        if verbose:
+            print(f"[ℹ️] Skipping '{col}': not categorical.")
+        return None
+
+    if lang == "en" and not sentiment_required:
+        if verbose:
+            print(f"[ℹ️] '{col}' is EN with no sentiment required. Skipping.")
+        return None
+
+    # Get current category_values
+    val = store.get(col, "category_values")
+
+    # Determine whether to skip re-translation
+    if sentiment_required or not use_category_values:
+        skip_translation = False
+    else:
+        skip_translation = not store.is_blank(col, "category_values")
+
+    # Get unique values from the data if needed
+    if skip_translation:
+        try:
+            unique_values = ast.literal_eval(val)
+        except Exception as e:
+            if verbose:
+                print(f"[⚠️] Failed to parse category_values for {col}: {e}. Will re-translate.")
+            unique_values = _unique_values(data_df[col], multi_select)
+            skip_translation = False
+    else:
+        unique_values = _unique_values(data_df[col], multi_select)
+
+    fields = []
+    if lang == "hi" and not skip_translation and not transliterate:
+        fields.append("translated_value")
+    if sentiment_required and lang in ("hi", "en"):
+        fields.append("sentiment")
+
+    polarity = store.get(col, "polarity")
+
+    return {
+        "lang": lang,
+        "sentiment_required": sentiment_required,
+        "polarity": parse_polarity(polarity),
+        "col_desc": col_desc,
+        "unique_values": unique_values,
+        "skip_translation": skip_translation,
+        "is_categorical": is_categorical,
+        "multi_select": multi_select,
+        "transliterate": transliterate and not skip_translation,
+        "fields": tuple(fields),
+    }
+
+
+# Split a column's values into rule-resolved values and LLM representatives
+def _prepare_llm_values(col, plan, data_df, use_rules=True, dedup_threshold=0.9):
+    """
+    Resolve what the rules can and collapse the remaining near-duplicates.
+
+    Returns:
+        tuple: (resolved {field: {value: result}}, values to send to the LLM,
+                {pending value: representative sent in its place})
+    """
+    fields = plan["fields"]
+    pending = plan["unique_values"]
+    resolved = {field: {} for field in fields}
+    if not fields:
+        return resolved, [], {}
+
+    if use_rules:
+        rule_translations, rule_sentiments, pending = resolve_with_rules(
+            pending,
+            polarity=plan["polarity"],
+            need_translation="translated_value" in fields,
+            need_sentiment="sentiment" in fields
+        )
+        resolved["translated_value"] = rule_translations
+        resolved["sentiment"] = rule_sentiments
+        resolved = {field: resolved[field] for field in fields}
+
+    if dedup_threshold is not None and len(pending) > 1:
+        if col not in data_df.columns:
+            counts = None
+        elif plan.get("multi_select"):
+            counts = split_multi_select(data_df[col]).value_counts().to_dict()
+        else:
+            counts = data_df[col].value_counts().to_dict()
+        representative_of = collapse_near_duplicates(pending, counts=counts, threshold=dedup_threshold)
+    else:
+        representative_of = {value: value for value in pending}
+
+    to_send = list(dict.fromkeys(representative_of[value] for value in pending))
+    return resolved, to_send, representative_of
+
+
+# Call the LLM helper matching the requested fields
+def _enrich_values_with_llm(values, fields, col_desc, lang=None):
+    """
+    Translate and/or infer sentiment for `values` with the LLM helpers, on the
+    model route chosen from the values (utils/llm_router.py).
+
+    Returns:
+        tuple: ({field: {value: result}} for each requested field, set of values
+        that failed validation and got fallbacks).
+    """
+    if not values or not fields:
+        return {field: {} for field in fields}, set()
+
+    route = choose_route_for_values(values, lang, translate="translated_value" in fields)
+    result, failed = request_enrichment(values, fields, col_desc, route=route)
+    return {field: dict(zip(values, result[field])) for field in fields}, {values[i] for i in failed}
+
+
+# Classify sentiment locally where confident, send the rest to the LLM
+def _enrich_values(values, fields, col_desc, lang=None, sentiment_classifier=None, classifier_threshold=0.8):
+    """
+    Enrich `values` with the LLM, classifying sentiment locally first when a
+    SentimentClassifier is given. Values classified with confidence >= threshold
+    only go to the LLM for translation (if required); sentiments returned by
+    the LLM that passed validation are recorded as new training labels.
+
+    Returns:
+        tuple: ({field: {value: result}} for each requested field, set of values
+        whose LLM results are fallbacks).
+    """
+    results = {field: {} for field in fields}
+    failed = set()
+    llm_values = list(values)
+
+    if sentiment_classifier is not None and "sentiment" in fields and llm_values:
+        labels, confidences = sentiment_classifier.predict(llm_values, col_desc)
+        confident = [v for v, c in zip(llm_values, confidences) if c >= classifier_threshold]
+        results["sentiment"].update(
+            (v, label) for v, label, c in zip(llm_values, labels, confidences) if c >= classifier_threshold
+        )
+        llm_values = [v for v, c in zip(llm_values, confidences) if c < classifier_threshold]
+
+        if confident and "translated_value" in fields:
+            translations, failed = _enrich_values_with_llm(confident, ("translated_value",), col_desc, lang)
+            results["translated_value"].update(translations["translated_value"])
+
+    llm_results, llm_failed = _enrich_values_with_llm(llm_values, fields, col_desc, lang)
+    for field, mapping in llm_results.items():
+        results[field].update(mapping)
+
+    # Only validated sentiments become training labels, not the 'unknown' fallbacks
+    labelled = [v for v in llm_values if v not in llm_failed]
+    if "sentiment" in fields and labelled:
+        record_sentiment_labels(
+            col_desc, labelled, [llm_results["sentiment"][v] for v in labelled]
+        )
+    return results, failed | llm_failed
+
+
+# Translations and sentiments of one column's distinct values
+def _enrich_column(
+    col, plan, data_df, use_rules=True, dedup_threshold=0.9,
+    sentiment_classifier=None, classifier_threshold=0.8, verbose=False
+):
+    """
+    Enrich plan["unique_values"] of one column: rules, near-duplicate collapsing,
+    local transliteration or classifier, and the LLM for the rest.
+
+    Returns:
+        tuple: (translated, sentiments, failed). Lists aligned with plan["unique_values"];
+        values without a translation keep their value, without a sentiment get
+        'unknown'. `failed` is the set of values whose LLM results are such
+        fallbacks (not to be persisted as enriched).
+    """
+    unique_values = plan["unique_values"]
+    if verbose:
+        print(
+            f"[📝] Processing '{col}': LANG={plan['lang'].upper()} SENTIMENT={plan['sentiment_required']} "
+            f"Unique: {len(unique_values)} Skip Translation: {plan['skip_translation']}"
+        )
+
+    # Resolve what the rules can, collapse near-duplicates, send the rest to the LLM
+    resolved, to_send, representative_of = _prepare_llm_values(
+        col, plan, data_df, use_rules, dedup_threshold
+    )
+    if verbose and len(to_send) < len(unique_values):
+        print(f"[⚡] Sending {len(to_send)} of {len(unique_values)} values to the LLM.")
+
+    if plan["transliterate"]:
+        # Proper nouns: local transliteration, no LLM translation
+        resolved["translated_value"] = dict(zip(unique_values, transliterate_values(unique_values)))
+        if verbose:
+            print(f"[🔤] Transliterated {len(unique_values)} proper-noun values locally.")
+
+    with llm_call_context(column_name=col):
+        llm_results, llm_failed = _enrich_values(
+            to_send, plan["fields"], plan["col_desc"], plan["lang"], sentiment_classifier, classifier_threshold
+        )
+    for field, mapping in llm_results.items():
+        for value, representative in representative_of.items():
+            if representative in mapping:
+                resolved[field][value] = mapping[representative]
+    failed = {value for value, representative in representative_of.items() if representative in llm_failed}
+
+    translated = [resolved.get("translated_value", {}).get(v, v) for v in unique_values]
+    sentiments = [resolved.get("sentiment", {}).get(v, "unknown") for v in unique_values]
+    return translated, sentiments, failed
+
+
+# Apply a column's translations and sentiments to its values
+def _map_enriched_values(series, plan, translated, sentiments):
+    """
+    Map a column's values through the results of _enrich_column. Multi-select
+    values are split into options; translations are joined back per value and
+    the sentiment is the majority vote of the options.
+
+    Returns:
+        tuple: (translated values, sentiments or None if not required), Series
+        aligned on series.index.
+    """
+    unique_values = plan["unique_values"]
+    lookups = [dict(zip(unique_values, translated))]
+    if plan["sentiment_required"]:
+        lookups.append(dict(zip(unique_values, sentiments)))
+
+    if not plan["multi_select"]:
+        mapped = remap_by_codes(series, lookups)
+        return mapped[0], (mapped[1] if plan["sentiment_required"] else None)
+
+    # Map each option once, then join options / vote sentiment per value
+    n_rows = len(series)
+    mapped = remap_by_codes(split_multi_select(series), lookups)
+    values = pd.Series(recombine_options(mapped[0], n_rows).to_numpy(), index=series.index)
+    if not plan["sentiment_required"]:
+        return values, None
+    return values, pd.Series(majority_sentiment(mapped[1], n_rows).to_numpy(), index=series.index)
+
+
+# Distinct values holding a fallback result
+def _failed_value_mask(values, plan, failed):
+    """
+    Boolean mask over `values` (distinct values of a column): True where the
+    value, or for multi-select columns one of its options, is in `failed`
+    (from _enrich_column).
+    """
+    values = pd.Series(values, dtype=object).reset_index(drop=True)
+    if not failed:
+        return np.zeros(len(values), dtype=bool)
+    if not plan["multi_select"]:
+        return values.isin(list(failed)).to_numpy()
+    options = split_multi_select(values)
+    return np.isin(np.arange(len(values)), options.index[options.isin(list(failed))])
+
+
+# Metadata updates of an enriched column
+def _record_enrichment_metadata(store, col, plan, translated, sentiments):
+    """
+    Set category_values of a categorical column to its translations and add the
+    metadata row of its sentiment column if sentiment is required.
+
+    Returns:
+        str or None: Name of the sentiment column, if any.
+    """
+    if plan["is_categorical"]:
+        store.set(col, "category_values", str(translated))
+    if not plan["sentiment_required"]:
+        return None
+
+    # Create metadata entry for sentiment column (marked non-categorical)
+    sentiment_col = f"{col}_sentiment"
+    flags = {flag: "False" for flag in ("is_multi_select", "is_proper_noun") if flag in store.fields}
+    store.copy_row(
+        col,
+        sentiment_col,
+        desc_en=f"Sentiment: {store.get(col, 'desc_en')}",
+        pre_enrichment_col_seq=float(store.get(col, "pre_enrichment_col_seq")) + 0.1,
+        is_categorical="False",
+        category_values=str(sorted(set(sentiments))),
+        **flags
+    )
+    return sentiment_col
+
+
+# Lookup rows of each column
+def _lookup_rows_by_column(known_lookup):
+    if known_lookup is None:
+        return None
+    return {col: rows for col, rows in known_lookup.groupby("column_name", sort=False)}
+
+
+# Translations of the options of known multi-select combinations
+def _known_option_translations(known):
+    """
+    {option: translation} recovered from known combinations whose translation
+    splits back into as many parts as the combination has options.
+    """
+    translations = {}
+    for source, (translated, _) in known.items():
+        if translated is None or pd.isna(translated):
+            continue
+        options = [o.strip() for o in source.split(MULTI_SELECT_SEPARATOR) if o.strip()]
+        parts = str(translated).split(RECOMBINE_SEPARATOR)
+        if len(options) == len(parts):
+            translations.update(zip(options, parts))
+    return translations
+
+
+# Enrich only the values of a column missing from its lookup rows
+def _enrich_column_delta(
+    col, plan, data_df, store, lookup_rows, use_rules=True, dedup_threshold=0.9,
+    sentiment_classifier=None, classifier_threshold=0.8, verbose=False
+):
+    """
+    Delta enrichment of one column: distinct values with a lookup row holding every
+    result the plan needs are reused, only the others are enriched (for multi-select
+    columns, the options of new combinations). Metadata is recorded for the merged
+    results, as by _record_enrichment_metadata.
+
+    Args:
+        lookup_rows (pd.DataFrame or None): The column's enrichment lookup rows
+            (load_enrichment_lookup).
+
+    Returns:
+        tuple: (value_plan, translated, sentiments, sentiment_col, failed). Results
+        are per distinct value of the column (value_plan["unique_values"], applied
+        with _map_enriched_values like a plain column); `failed` holds the distinct
+        values with fallback results.
+    """
+    translates = "translated_value" in plan["fields"] or plan["transliterate"]
+    known = {}
+    if lookup_rows is not None:
+        rows = lookup_rows
+        if translates:
+            rows = rows[rows["translated_value"].notna()]
+        if plan["sentiment_required"]:
+            rows = rows[rows["sentiment"].notna()]
+        known = dict(zip(rows["source_value"], zip(rows["translated_value"], rows["sentiment"])))
+
+    source = pd.Series(data_df[col].dropna().unique(), dtype=object)
+    is_new = ~source.astype(str).isin(list(known))
+    new_source = source[is_new]
+    new_plan = {**plan, "unique_values": _unique_values(new_source, plan["multi_select"])}
+    if verbose:
+        print(f"[🆕] '{col}': {int(is_new.sum())} of {len(source)} distinct values not enriched yet.")
+
+    translated, sentiments, failed = [], [], set()
+    if new_plan["unique_values"]:
+        translated, sentiments, failed = _enrich_column(
+            col, new_plan, data_df, use_rules, dedup_threshold,
+            sentiment_classifier, classifier_threshold, verbose
+        )
+
+    # Results per distinct value: known rows, then the new values
+    value_translated, value_sentiments = {}, {}
+    for value in source[~is_new]:
+        known_translated, known_sentiment = known[str(value)]
+        value_translated[value] = known_translated if translates else value
+        value_sentiments[value] = known_sentiment if plan["sentiment_required"] else "unknown"
+    new_values, new_sentiments = _map_enriched_values(new_source, new_plan, translated, sentiments)
+    if new_sentiments is None:
+        new_sentiments = ["unknown"] * len(new_source)
+    value_translated.update(zip(new_source, new_values))
+    value_sentiments.update(zip(new_source, new_sentiments))
+
+    # Metadata lists per plan["unique_values"] (atomic options of multi-select columns)
+    if plan["multi_select"]:
+        option_translated = _known_option_translations(known) if translates else {}
+        option_translated.update(zip(new_plan["unique_values"], translated))
+        meta_translated = [option_translated.get(v, v) for v in plan["unique_values"]]
+        meta_sentiments = sentiments + [s for _, s in known.values()]
+    else:
+        meta_translated = [value_translated[v] for v in plan["unique_values"]]
+        meta_sentiments = [value_sentiments[v] for v in plan["unique_values"]]
+    sentiment_col = _record_enrichment_metadata(store, col, plan, meta_translated, meta_sentiments)
+
+    value_plan = {**plan, "unique_values": source.tolist(), "multi_select": False}
+    values = value_plan["unique_values"]
+    return (
+        value_plan,
+        [value_translated[v] for v in values],
+        [value_sentiments[v] for v in values],
+        sentiment_col,
+        set(new_source[_failed_value_mask(new_source, new_plan, failed)])
+    )
+
+
+# Map a column through value lookups by factorize codes
+def remap_by_codes(series, lookups, fill_unmapped=False):
+    """
+    Apply {value: result} lookups to a column at O(unique values) cost.
+
+    The column is coded once against its distinct values; each lookup is applied
+    to the distinct values and the results are gathered back to the rows with a
+    take on the codes. Several derived columns (e.g. translation and sentiment)
+    share one coding pass, and no per-row dict lookups are made. Nulls stay null.
+
+    Args:
+        series (pd.Series): Column to map.
+        lookups (list of dict): One lookup per output column.
+        fill_unmapped (bool): Keep the original value where a lookup has no (or a
+            null) result, like `.map(lookup).fillna(series)`; else NaN, like `.map(lookup)`.
+
+    Returns:
+        list of pd.Series: One per lookup, aligned on series.index.
+    """
+    # unique() + get_indexer is faster than pd.factorize on pandas' str dtype
+    uniques = pd.Index(series.unique()).dropna()
+    codes = uniques.get_indexer(series)  # -1 for nulls
+    distinct = pd.Series(uniques, dtype=object)
+    results = []
+    for lookup in lookups:
+        mapped = distinct.map(lookup)
+        if fill_unmapped:
+            mapped = mapped.fillna(distinct)
+        # Trailing NaN slot: take() with code -1 reads the last element.
+        # Built from a list so the dtype is inferred as .map would.
+        table = pd.Series(mapped.tolist() + [np.nan])
+        results.append(table.take(codes).set_axis(series.index))
+    return results
+
+
+# Attach enrichment outputs to the dataset in one step
+def assemble_columns(data_df, replaced, added):
+    """
+    Return data_df with the columns in `replaced` swapped for their new values and
+    the columns in `added` appended in insertion order.
+
+    Enrichment collects its outputs per column and calls this once at the end:
+    inserting one `<col>_sentiment` column at a time fragments the frame into one
+    block per column (pandas' PerformanceWarning). The result is built with a
+    single DataFrame construction, so columns of one dtype share one block.
+
+    Args:
+        data_df (pd.DataFrame): Dataset being enriched.
+        replaced (dict): {existing column: new values (Series aligned on data_df.index or array)}.
+        added (dict): {new column: values}.
+
+    Returns:
+        pd.DataFrame: New frame (data_df itself if there is nothing to attach).
+    """
+    if not replaced and not added:
+        return data_df
+    columns = {col: replaced.get(col, data_df[col]) for col in data_df.columns}
+    columns.update(added)
+    return pd.DataFrame(columns, index=data_df.index)
 
-    from utils.llm_utils import (
-    translate_list_with_llm,
-    translate_list_and_infer_sentiment_with_llm
-)
-import ast
 
 def process_translation_and_sentiment(
     data_df,
     metadata_df,
     columns=None,
+    use_rules=True,
+    dedup_threshold=0.9,
+    sentiment_classifier=None,
+    classifier_threshold=0.8,
+    checkpoint=None,
+    known_lookup=None,
     verbose=False
 ):
     """
@@ -282,111 +760,294 @@ def process_translation_and_sentiment(
         - If LANG == EN:
             - If sentiment == True: infer sentiment only
             - If sentiment == False: do nothing
+
+    With use_rules=True, values fully determined by the lexicon in
+    utils/sentiment_rules.py (हाँ/नहीं/blank, using the column's `polarity`
+    metadata) are resolved locally; only the remaining values reach the LLM.
+    Near-duplicate values (punctuation, matra typos, word order) are clustered
+    by utils/value_dedup.py and only one representative per cluster is sent;
+    its result is propagated to the other members (dedup_threshold=None disables).
+
+    With a SentimentClassifier (utils/sentiment_classifier.py), sentiment of values
+    classified with confidence >= classifier_threshold is taken from the local
+    model; only low-confidence values need the LLM for sentiment. Sentiments
+    returned by the LLM are buffered as training labels (flush_sentiment_labels).
+
+    Each LLM request goes to the fast or strong model route chosen from the values'
+    count, average length and language (utils/llm_router.py); values failing
+    validation are retried on the strong route. LLM calls made for a column are
+    tagged with its name and route in utils/llm_metrics.py.
+
+    Multi-select columns (is_multi_select == True) are split into atomic options
+    (utils/multi_select.py); each option is enriched once, translations are joined
+    back per row and the row sentiment is the majority vote of its options.
+
+    Hindi proper-noun columns (is_proper_noun == True: school, mentor and place
+    names) are transliterated locally (utils/transliteration.py) and skip LLM
+    translation, whether or not they are categorical.
+
+    Results are applied through the column's factorize codes (remap_by_codes), so
+    translation and sentiment cost O(unique values), not a dict lookup per row.
+    Translated and sentiment columns are collected and attached to data_df in one
+    step after the loop (assemble_columns); data_df itself is not modified.
+
+    With an EnrichmentCheckpoint (utils/enrichment_checkpoint.py), each column's
+    results and metadata rows are saved as soon as it is enriched, and columns
+    already in the checkpoint are restored from it without calling the LLM. A
+    column with values that still failed validation (fallback results) is not
+    saved, so a resumed run enriches it again.
+
+    Delta mode: with `known_lookup` (enrichment lookup rows of earlier runs, see
+    load_enrichment_lookup in utils/enrichment_lookup.py), unique values always come
+    from the data, even if category_values is filled, and only values without a
+    lookup row are enriched; the known results are reused and merged into metadata.
+    Enrichment of a new month then costs its new values, not the whole vocabulary.
     """
+    store = as_metadata_store(metadata_df)
     if columns is None:
-        columns = metadata_df["column_name"].tolist()
+        columns = store.column_names
+    replaced, added = {}, {}
+    known = _lookup_rows_by_column(known_lookup)
+    done = checkpoint.completed() if checkpoint is not None else {}
+    if verbose and done:
+        print(f"[♻️] Resuming: {len(done)} columns restored from checkpoint.")
 
     for col in columns:
-        # Get metadata row
-        meta_row = metadata_df.loc[metadata_df["column_name"] == col]
+        if col in done:
+            saved = done[col]
+            plan, translated, sentiments = saved["plan"], saved["translated"], saved["sentiments"]
+            for row in saved["metadata"]:
+                store.add_row(row)
+            sentiment_col = f"{col}_sentiment" if plan["sentiment_required"] else None
+        else:
+            plan = _column_enrichment_plan(
+                col, data_df, store, use_category_values=known is None, verbose=verbose
+            )
+            if plan is None:
+                continue
+            if known is not None:
+                plan, translated, sentiments, sentiment_col, failed = _enrich_column_delta(
+                    col, plan, data_df, store, known.get(col), use_rules, dedup_threshold,
+                    sentiment_classifier, classifier_threshold, verbose
+                )
+            else:
+                translated, sentiments, failed = _enrich_column(
+                    col, plan, data_df, use_rules, dedup_threshold,
+                    sentiment_classifier, classifier_threshold, verbose
+                )
+                sentiment_col = _record_enrichment_metadata(store, col, plan, translated, sentiments)
+            if checkpoint is not None and failed:
+                # Fallbacks are not results: leave the column to be enriched again on resume
+                if verbose:
+                    print(f"[⚠️] '{col}': {len(failed)} values got fallbacks; column not checkpointed.")
+            elif checkpoint is not None:
+                metadata_rows = [store.row(c) for c in (col, sentiment_col) if c]
+                checkpoint.save(col, plan, translated, sentiments, metadata_rows)
 
-        if meta_row.empty:
+        replaced[col], mapped_sentiments = _map_enriched_values(data_df[col], plan, translated, sentiments)
+        if sentiment_col:
+            added[sentiment_col] = mapped_sentiments
             if verbose:
-                print(f"[⚠️] Column '{col}' not found in metadata. Skipping.")
-            continue
-
-        is_categorical = str(meta_row["is_categorical"].values[0]).strip().lower() == "true"
-        lang = str(meta_row["lang"].values[0]).strip().lower()
-        sentiment_required = str(meta_row["sentiment_required"].values[0]).strip().lower() == "yes"
-        col_desc = str(meta_row["desc_en"].values[0]).strip()
+                print(f"[✅] Added sentiment column '{sentiment_col}'.")
 
-        if not is_categorical:
+        else:
             if verbose:
-                print(f"[ℹ️] Skipping '{col}': not categorical.")
-            continue
+                print(f"[✅] Translated '{col}' with {len(plan['unique_values'])} unique values.")
 
-        # Get current category_values
-        current_value = metadata_df.loc[metadata_df["column_name"] == col, "category_values"]
-        val = current_value.iloc[0]
-        val_str = str(val).strip().lower()
+    data_df = assemble_columns(data_df, replaced, added)
+    return data_df, metadata_like(store, metadata_df)
 
-        # Determine whether to skip re-translation
-        if sentiment_required:
-            skip_translation = False
-        else:
-            skip_translation = val_str not in ("", "nan")
 
-        # Get unique values from the data if needed
-        if skip_translation:
-            try:
-                unique_values = ast.literal_eval(val)
-            except Exception as e:
-                if verbose:
-                    print(f"[⚠️] Failed to parse category_values for {col}: {e}. Will re-translate.")
-                unique_values = sorted(data_df[col].dropna().unique().tolist())
-                skip_translation = False
+# Enrichment results as lookup rows instead of rewritten data
+def build_enrichment_lookup(
+    data_df,
+    metadata_df,
+    columns=None,
+    use_rules=True,
+    dedup_threshold=0.9,
+    sentiment_classifier=None,
+    classifier_threshold=0.8,
+    known_lookup=None,
+    verbose=False
+):
+    """
+    Enrich columns like process_translation_and_sentiment, but return the results
+    as one lookup row per distinct value of each enriched column (per distinct
+    combination for multi-select columns) instead of rewriting data_df. Store them
+    with write_enrichment_lookup and query the enriched data through
+    create_enriched_view (utils/enrichment_lookup.py).
+
+    Metadata is updated as by process_translation_and_sentiment (category_values
+    and the rows of the sentiment columns). With `known_lookup` (the current lookup
+    rows), only values without a lookup row are enriched (delta mode, see
+    process_translation_and_sentiment); rows are still returned for every value,
+    except values whose LLM results failed validation, which are left without a
+    row so the next delta run enriches them again.
+
+    Returns:
+        tuple: (lookup_df, metadata_df). lookup_df has the columns column_name,
+        source_value (the value as a string), translated_value (None if the column
+        is not translated) and sentiment (None if not required).
+    """
+    store = as_metadata_store(metadata_df)
+    if columns is None:
+        columns = store.column_names
+
+    known = _lookup_rows_by_column(known_lookup)
+    frames = []
+    for col in columns:
+        plan = _column_enrichment_plan(
+            col, data_df, store, use_category_values=known is None, verbose=verbose
+        )
+        if plan is None or not (plan["fields"] or plan["transliterate"]):
+            continue
+        if known is not None:
+            plan, translated, sentiments, _, failed = _enrich_column_delta(
+                col, plan, data_df, store, known.get(col), use_rules, dedup_threshold,
+                sentiment_classifier, classifier_threshold, verbose
+            )
         else:
-            unique_values = sorted(data_df[col].dropna().unique().tolist())
+            translated, sentiments, failed = _enrich_column(
+                col, plan, data_df, use_rules, dedup_threshold,
+                sentiment_classifier, classifier_threshold, verbose
+            )
+            _record_enrichment_metadata(store, col, plan, translated, sentiments)
 
+        # Values with fallback results get no lookup row, so delta mode enriches them again
+        source = pd.Series(data_df[col].dropna().unique(), dtype=object)
+        source = source[~_failed_value_mask(source, plan, failed)].reset_index(drop=True)
+        values, mapped_sentiments = _map_enriched_values(source, plan, translated, sentiments)
+        translates = "translated_value" in plan["fields"] or plan["transliterate"]
+        frames.append(pd.DataFrame({
+            "column_name": col,
+            "source_value": source.astype(str).to_numpy(),
+            "translated_value": values.to_numpy(dtype=object) if translates else None,
+            "sentiment": mapped_sentiments.to_numpy(dtype=object) if mapped_sentiments is not None else None,
+        }))
         if verbose:
-            print(
-                f"[📝] Processing '{col}': LANG={lang.upper()} SENTIMENT={sentiment_required} "
-                f"Unique: {len(unique_values)} Skip Translation: {skip_translation}"
-            )
+            print(f"[✅] Built {len(source)} lookup rows for '{col}'.")
 
-        # Determine what action to take
-        translated = unique_values
-        sentiments = ["unknown"] * len(unique_values)
+    lookup_columns = ["column_name", "source_value", "translated_value", "sentiment"]
+    lookup_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=lookup_columns)
+    return lookup_df, metadata_like(store, metadata_df)
 
-        if lang == "hi" and sentiment_required:
-            # Translate + sentiment
-            result = translate_list_and_infer_sentiment_with_llm(unique_values, col_desc)
-            translated = result["translated_value"]
-            sentiments = result["sentiment"]
 
-        elif lang == "hi" and not sentiment_required:
-            if not skip_translation:
-                translated = translate_list_with_llm(unique_values)
+# Requests a batch job would need to pre-answer
+def collect_translation_and_sentiment_requests(
+    data_df,
+    metadata_df,
+    columns=None,
+    use_rules=True,
+    dedup_threshold=0.9
+):
+    """
+    Build the LLM requests process_translation_and_sentiment would send, without
+    calling any LLM, for run_batch_job() in utils/llms.py. Once the batch results
+    are ingested, running process_translation_and_sentiment with the same
+    arguments is answered from the response cache.
 
-        elif lang == "en" and sentiment_required:
-            sentiments = infer_sentiment_with_llm(unique_values, col_desc)
+    Only the first request per column is collected; values that fail validation
+    are repaired interactively. Run without a sentiment_classifier, which would
+    change the requests.
 
-        elif lang == "en" and not sentiment_required:
-            if verbose:
-                print(f"[ℹ️] '{col}' is EN with no sentiment required. Skipping.")
+    Returns:
+        list of BatchRequest: One request per column that needs the LLM.
+    """
+    store = as_metadata_store(metadata_df)
+    if columns is None:
+        columns = store.column_names
+
+    requests = []
+    for col in columns:
+        plan = _column_enrichment_plan(col, data_df, store)
+        if plan is None or not plan["fields"]:
+            continue
+        _, to_send, _ = _prepare_llm_values(col, plan, data_df, use_rules, dedup_threshold)
+        if not to_send:
             continue
+        route = choose_route_for_values(
+            to_send, plan["lang"], translate="translated_value" in plan["fields"]
+        )
+        requests.append(enrichment_batch_request(to_send, plan["fields"], plan["col_desc"], route=route))
+    return requests
 
-        # Build lookup
-        lookup_trans = dict(zip(unique_values, translated))
-        data_df[col] = data_df[col].map(lookup_trans)
 
-        # Update metadata category_values
-        metadata_df.loc[metadata_df["column_name"] == col, "category_values"] = str(translated)
+# Dry-run estimate of LLM calls and tokens
+def estimate_translation_and_sentiment_calls(
+    data_df,
+    metadata_df,
+    columns=None,
+    model=None,
+    use_rules=True,
+    dedup_threshold=0.9
+):
+    """
+    Predict the LLM calls, tokens and cost process_translation_and_sentiment would
+    spend, without calling any LLM.
 
-        if sentiment_required:
-            # Map sentiments
-            lookup_sentiment = dict(zip(translated, sentiments))
-            sentiment_col = f"{col}_sentiment"
-            data_df[sentiment_col] = data_df[col].map(lookup_sentiment)
-
-            # Create metadata entry for sentiment column
-            new_row = metadata_df.loc[metadata_df["column_name"] == col].copy()
-            new_row["column_name"] = sentiment_col
-            orig_desc = new_row["desc_en"].values[0]
-            new_row["desc_en"] = f"Sentiment: {orig_desc}"
-            orig_seq = float(new_row["pre_enrichment_col_seq"].values[0])
-            new_row["pre_enrichment_col_seq"] = orig_seq + 0.1
-            # Mark this column as non-categorical
-            new_row["is_categorical"] = "False"
-            new_row["category_values"] = str(sorted(set(sentiments)))
-            # Append to metadata
-            metadata_df = pd.concat([metadata_df, new_row], ignore_index=True)
+    Unique values come from category_values where available, otherwise from data_df
+    (pass data_df=None to rely on metadata only; such columns are then skipped).
 
-            if verbose:
-                print(f"[✅] Added sentiment column '{sentiment_col}'.")
+    Args:
+        data_df (pd.DataFrame or None): Dataset to enrich.
+        metadata_df (pd.DataFrame or MetadataStore): Metadata table.
+        columns (list or None): Columns to consider (default: all in metadata).
+        model (str or None): Model used to price the estimate (default: the model of each column's route).
+        use_rules (bool): Leave out values the sentiment rules resolve locally.
+        dedup_threshold (float or None): Count one value per near-duplicate cluster.
 
+    Returns:
+        pd.DataFrame: One row per column that needs the LLM: column_name, fields,
+        unique_values, route, calls, prompt_tokens, completion_tokens, cost_usd.
+    """
+    store = as_metadata_store(metadata_df)
+    if columns is None:
+        columns = store.column_names
+    if data_df is None:
+        data_df = pd.DataFrame()
+
+    rows = []
+    for col in columns:
+        if col not in data_df.columns:
+            # Metadata-only: force the plan to use category_values
+            if col not in store or store.is_blank(col, "category_values"):
+                continue
+            plan = _column_enrichment_plan(
+                col,
+                pd.DataFrame({col: ast.literal_eval(str(store.get(col, "category_values")))}),
+                store
+            )
         else:
-            if verbose:
-                print(f"[✅] Translated '{col}' with {len(unique_values)} unique values.")
+            plan = _column_enrichment_plan(col, data_df, store)
+
+        if plan is None or not plan["fields"]:
+            continue
+
+        _, pending, _ = _prepare_llm_values(col, plan, data_df, use_rules, dedup_threshold)
+        if not pending:
+            continue
+
+        prompt_tokens, completion_tokens = estimate_enrichment_request(
+            pending, plan["fields"], plan["col_desc"]
+        )
+        route = choose_route_for_values(
+            pending, plan["lang"], translate="translated_value" in plan["fields"]
+        )
+        route_config = get_route(route)
+        price_model = model or resolve_provider_and_model(route_config.provider, route_config.model)[1]
+        rows.append({
+            "column_name": col,
+            "fields": ",".join(plan["fields"]),
+            "unique_values": len(pending),
+            "route": route,
+            "calls": 1,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": estimate_cost_usd(price_model, prompt_tokens, completion_tokens),
+        })
 
-    return data_df, metadata_df
\ No newline at end of file
+    return pd.DataFrame(
+        rows,
+        columns=["column_name", "fields", "unique_values", "route", "calls",
+                 "prompt_tokens", "completion_tokens", "cost_usd"]
+    )
@@ -0,0 +1,376 @@
+"""
+Free-text Enrichment
+-------------------
+Row-level translation and sentiment for free-text columns (remarks, comments)
+flagged with `is_free_text` in metadata.
+
+Unlike process_translation_and_sentiment, which sends all unique values of a
+categorical column in one prompt, values are split into batches that fit a
+token budget and the batches run concurrently. Every finished batch is written
+straight into a per-column DuckDB side table keyed by value hash:
+
+    freetext_<col>(value_hash, value, <col>_en, <col>_sentiment)
+
+so an interrupted run resumes where it stopped and values already enriched in
+earlier runs are never sent again.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+
+import pandas as pd
+
+from utils.feature_utils import assemble_columns, remap_by_codes
+from utils.llm_metrics import estimate_tokens, llm_call_context, submit_in_context
+from utils.metadata_store import as_metadata_store, metadata_like
+from utils.llm_router import choose_route_for_values
+from utils.llm_utils import enrichment_batch_request, request_enrichment
+
+# Default DuckDB file for side tables (override with FREETEXT_ENRICHMENT_DB)
+DEFAULT_FREETEXT_DB = "data/interim/freetext_enrichment.duckdb"
+
+# Estimated prompt + completion tokens per request, and values per request
+MAX_BATCH_TOKENS = 3000
+MAX_BATCH_VALUES = 100
+DEFAULT_MAX_WORKERS = 8
+
+# Fixed per-value overhead of the numbered prompt line and reply entry
+_TOKENS_PER_VALUE_OVERHEAD = 6
+
+
+# Stable key of a value in the side tables
+def value_hash(value) -> str:
+    """
+    Return the 16-hex-digit SHA-1 key of a value.
+    """
+    return hashlib.sha1(str(value).encode("utf-8")).hexdigest()[:16]
+
+
+def side_table_name(col: str) -> str:
+    """
+    Name of the side table of a free-text column.
+    """
+    return f"freetext_{col}"
+
+
+def _output_columns(col, fields):
+    names = {"translated_value": f"{col}_en", "sentiment": f"{col}_sentiment"}
+    return {field: names[field] for field in fields}
+
+
+# Split values into requests that fit a token budget
+def batch_values_by_tokens(
+    values,
+    fields,
+    max_batch_tokens: int = MAX_BATCH_TOKENS,
+    max_batch_values: int = MAX_BATCH_VALUES
+) -> list:
+    """
+    Greedily pack values into batches whose estimated prompt + completion tokens
+    stay within `max_batch_tokens` (a single oversized value gets its own batch).
+
+    Args:
+        values (list): Values to enrich.
+        fields (tuple): Requested fields; a translation roughly doubles a value's cost.
+        max_batch_tokens (int): Token budget per request.
+        max_batch_values (int): Maximum values per request.
+
+    Returns:
+        list of list: Batches of values.
+    """
+    per_token_factor = 2 if "translated_value" in fields else 1
+    batches, batch, batch_tokens = [], [], 0
+    for value in values:
+        cost = estimate_tokens(json.dumps(str(value), ensure_ascii=False)) * per_token_factor
+        cost += _TOKENS_PER_VALUE_OVERHEAD
+        if batch and (batch_tokens + cost > max_batch_tokens or len(batch) >= max_batch_values):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(value)
+        batch_tokens += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _batch_route(values, fields, lang):
+    return choose_route_for_values(values, lang, translate="translated_value" in fields)
+
+
+def _enrich_batch(values, fields, col_desc, lang):
+    # ({field: [result per value]}, indices of values that failed validation)
+    return request_enrichment(values, fields, col_desc, route=_batch_route(values, fields, lang))
+
+
+def _ensure_side_table(con, col, fields):
+    table = side_table_name(col)
+    con.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (value_hash VARCHAR PRIMARY KEY, value VARCHAR)')
+    for out_col in _output_columns(col, fields).values():
+        con.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS "{out_col}" VARCHAR')
+
+
+def _load_side_table(con, col, fields) -> pd.DataFrame:
+    out_cols = ", ".join(f'"{c}"' for c in _output_columns(col, fields).values())
+    return con.execute(f'SELECT value_hash, value, {out_cols} FROM "{side_table_name(col)}"').fetchdf()
+
+
+def _pending_values(con, values, col, fields) -> list:
+    _ensure_side_table(con, col, fields)
+    done = _load_side_table(con, col, fields).dropna(subset=list(_output_columns(col, fields).values()))
+    done_hashes = set(done["value_hash"])
+    return [v for v in values if value_hash(v) not in done_hashes]
+
+
+def _free_text_plan(col, data_df, store):
+    """
+    (fields, lang, col_desc) for a free-text column, or None if it needs no enrichment.
+    """
+    if col not in store or col not in data_df.columns:
+        return None
+    if not store.is_true(col, "is_free_text"):
+        return None
+    if store.is_true(col, "is_proper_noun") or store.is_true(col, "is_identifier"):
+        return None  # Names and IDs are kept as they are
+
+    lang = str(store.get(col, "lang")).strip().lower()
+    sentiment_required = str(store.get(col, "sentiment_required")).strip().lower() == "yes"
+    col_desc = str(store.get(col, "desc_en")).strip()
+
+    fields = []
+    if lang == "hi":
+        fields.append("translated_value")
+    if sentiment_required and lang in ("hi", "en"):
+        fields.append("sentiment")
+    return (tuple(fields), lang, col_desc) if fields else None
+
+
+# Enrich one free-text column into its side table
+def enrich_free_text_column(
+    con,
+    values,
+    col: str,
+    fields: tuple,
+    col_desc: str,
+    lang: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_batch_tokens: int = MAX_BATCH_TOKENS,
+    verbose: bool = False
+) -> pd.DataFrame:
+    """
+    Enrich the values of a free-text column that are not yet in its side table.
+
+    Batches run concurrently; each finished batch is inserted right away, so
+    the side table doubles as the checkpoint. Values whose results failed
+    validation are stored with NULL outputs: they stay pending and are sent
+    again by the next run, and join back as missing rather than as fallbacks.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection holding the side tables.
+        values (list): Unique values of the column.
+        col (str): Column name.
+        fields (tuple): 'translated_value' and/or 'sentiment'.
+        col_desc (str): Column description (prompt context).
+        lang (str or None): Column language (used to pick the model route).
+        max_workers (int): Concurrent LLM requests.
+        max_batch_tokens (int): Token budget per request.
+        verbose (bool): Print progress.
+
+    Returns:
+        pd.DataFrame: The side table (value_hash, value, <col>_en?, <col>_sentiment?).
+    """
+    table = side_table_name(col)
+    out_cols = _output_columns(col, fields)
+    pending = _pending_values(con, values, col, fields)
+    batches = batch_values_by_tokens(pending, fields, max_batch_tokens)
+
+    if verbose:
+        print(
+            f"[📝] '{col}': {len(values)} unique values, {len(values) - len(pending)} already enriched, "
+            f"{len(pending)} pending in {len(batches)} batches."
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            submit_in_context(executor, _enrich_batch, batch, fields, col_desc, lang): batch
+            for batch in batches
+        }
+        for n_done, future in enumerate(as_completed(futures), start=1):
+            batch = futures[future]
+            try:
+                result, failed = future.result()
+            except Exception as e:
+                print(f"[⚠️] Batch of {len(batch)} values for '{col}' failed: {e}")
+                continue
+
+            failed = set(failed)
+            batch_df = pd.DataFrame({
+                "value_hash": [value_hash(v) for v in batch],
+                "value": [str(v) for v in batch],
+                **{
+                    out_cols[field]: [None if i in failed else r for i, r in enumerate(result[field])]
+                    for field in fields
+                },
+            }, dtype=object)
+            con.register("batch_df", batch_df)
+            con.execute(f'INSERT OR REPLACE INTO "{table}" BY NAME SELECT * FROM batch_df')
+            con.unregister("batch_df")
+
+            if verbose:
+                print(
+                    f"[✅] '{col}': batch {n_done}/{len(batches)} saved "
+                    f"({len(batch) - len(failed)} of {len(batch)} values enriched)."
+                )
+
+    return _load_side_table(con, col, fields)
+
+
+def _add_metadata_row(store, col, new_col, desc_prefix, seq_offset, category_values):
+    # Derived columns are English and already enriched, so a rerun skips them
+    store.copy_row(
+        col,
+        new_col,
+        desc_en=f"{desc_prefix}: {store.get(col, 'desc_en')}",
+        pre_enrichment_col_seq=float(store.get(col, "pre_enrichment_col_seq")) + seq_offset,
+        lang="en",
+        is_categorical="False",
+        is_free_text="False",
+        sentiment_required="no",
+        category_values=category_values,
+    )
+
+
+# Enrich every free-text column of a dataset
+def process_free_text_columns(
+    data_df,
+    metadata_df,
+    columns=None,
+    db_path: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_batch_tokens: int = MAX_BATCH_TOKENS,
+    verbose: bool = False
+):
+    """
+    For each column with is_free_text == True:
+    - If LANG == HI: add '<col>_en' (translation)
+    - If sentiment_required == yes: add '<col>_sentiment'
+
+    Results are stored in DuckDB side tables keyed by value hash (see module
+    docstring) and joined back onto data_df; the original column is kept. The new
+    columns are attached in one step after the loop (see
+    utils/feature_utils.py:assemble_columns).
+
+    Args:
+        data_df (pd.DataFrame): Dataset to enrich.
+        metadata_df (pd.DataFrame or MetadataStore): Metadata table with an 'is_free_text' column.
+        columns (list or None): Columns to consider (default: all in metadata).
+        db_path (str or None): DuckDB file for side tables (default: FREETEXT_ENRICHMENT_DB).
+        max_workers (int): Concurrent LLM requests per column.
+        max_batch_tokens (int): Token budget per request.
+        verbose (bool): Print progress.
+
+    Returns:
+        tuple: (data_df, metadata_df) with the new columns and metadata rows.
+    """
+    import duckdb
+
+    store = as_metadata_store(metadata_df)
+    if "is_free_text" not in store.fields:
+        if verbose:
+            print("[ℹ️] No 'is_free_text' metadata column; no free-text columns to enrich.")
+        return data_df, metadata_df
+    if columns is None:
+        columns = store.column_names
+
+    db_path = db_path or os.getenv("FREETEXT_ENRICHMENT_DB", DEFAULT_FREETEXT_DB)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    con = duckdb.connect(db_path)
+
+    added = {}
+    try:
+        for col in columns:
+            plan = _free_text_plan(col, data_df, store)
+            if plan is None:
+                continue
+            fields, lang, col_desc = plan
+
+            unique_values = data_df[col].dropna().unique().tolist()
+            with llm_call_context(column_name=col):
+                side_df = enrich_free_text_column(
+                    con, unique_values, col, fields, col_desc, lang,
+                    max_workers=max_workers, max_batch_tokens=max_batch_tokens, verbose=verbose
+                )
+
+            # Join results back by value hash, applied through the column's factorize codes
+            side_df = side_df.set_index("value_hash")
+            hashes = [value_hash(v) for v in unique_values]
+            out_cols = _output_columns(col, fields)
+            lookups = [dict(zip(unique_values, side_df[c].reindex(hashes))) for c in out_cols.values()]
+            mapped = dict(zip(out_cols.values(), remap_by_codes(data_df[col], lookups)))
+            seq_offset = 0.1
+            if "translated_value" in fields:
+                added[out_cols["translated_value"]] = mapped[out_cols["translated_value"]]
+                _add_metadata_row(store, col, out_cols["translated_value"], "English", seq_offset, "nan")
+                seq_offset += 0.1
+            if "sentiment" in fields:
+                sentiment_col = out_cols["sentiment"]
+                added[sentiment_col] = mapped[sentiment_col]
+                _add_metadata_row(
+                    store, col, sentiment_col, "Sentiment", seq_offset,
+                    str(sorted(added[sentiment_col].dropna().unique().tolist()))
+                )
+
+            if verbose:
+                print(f"[✅] Enriched free-text column '{col}' ({', '.join(out_cols.values())}).")
+    finally:
+        con.close()
+
+    data_df = assemble_columns(data_df, {}, added)
+    return data_df, metadata_like(store, metadata_df)
+
+
+# Requests a batch job would need to pre-answer
+def collect_free_text_requests(
+    data_df,
+    metadata_df,
+    columns=None,
+    db_path: Optional[str] = None,
+    max_batch_tokens: int = MAX_BATCH_TOKENS
+) -> list:
+    """
+    Build the LLM requests process_free_text_columns would send for values not yet
+    in the side tables, for run_batch_job() in utils/llms.py. After the batch
+    results are ingested, process_free_text_columns with the same arguments is
+    answered from the response cache.
+
+    Returns:
+        list of BatchRequest: One request per token-bounded batch.
+    """
+    import duckdb
+
+    store = as_metadata_store(metadata_df)
+    if "is_free_text" not in store.fields:
+        return []
+    if columns is None:
+        columns = store.column_names
+
+    db_path = db_path or os.getenv("FREETEXT_ENRICHMENT_DB", DEFAULT_FREETEXT_DB)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    con = duckdb.connect(db_path)
+
+    requests = []
+    try:
+        for col in columns:
+            plan = _free_text_plan(col, data_df, store)
+            if plan is None:
+                continue
+            fields, lang, col_desc = plan
+            pending = _pending_values(con, data_df[col].dropna().unique().tolist(), col, fields)
+            for batch in batch_values_by_tokens(pending, fields, max_batch_tokens):
+                route = _batch_route(batch, fields, lang)
+                requests.append(enrichment_batch_request(batch, fields, col_desc, route=route))
+    finally:
+        con.close()
+    return requests
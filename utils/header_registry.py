@@ -0,0 +1,271 @@
+"""
+Header Registry
+-------------------
+Persistent mapping of raw column headers to translated names and short_names,
+so a new form export only sends headers never seen before to the LLM.
+
+Headers are keyed by a fingerprint of their normalized text (case, punctuation,
+short/long matras and word order ignored) together with the original text, so
+different headers with the same fingerprint never overwrite each other. Lookup
+of a new export:
+    1. exact     fingerprint and original text already in the registry
+    2. fuzzy     character n-gram cosine similarity >= threshold with a known
+                 header, same numbers and same negation (small wording changes,
+                 including headers that only share the fingerprint)
+    3. llm       the rest, translated concurrently by translate_headers_via_llm
+
+Every mapped header is registered under its own text, so the next export with
+the same wording is an exact match. Stored in a DuckDB table:
+
+    header_registry(fingerprint, original_name, translated_name, short_name, source, created_at)
+"""
+
+import hashlib
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.header_translation import translate_headers_via_llm
+from utils.value_dedup import has_negation, normalize_value_key
+
+# Default DuckDB file of the registry (override with HEADER_REGISTRY_DB)
+DEFAULT_HEADER_REGISTRY_DB = "data/interim/header_registry.duckdb"
+REGISTRY_TABLE = "header_registry"
+REGISTRY_COLUMNS = ["fingerprint", "original_name", "translated_name", "short_name", "source", "created_at"]
+
+FUZZY_THRESHOLD = 0.85
+DEFAULT_MAX_WORKERS = 4
+
+_NUMBER = re.compile(r"\d+")
+
+
+# Stable key of a header
+def header_fingerprint(header) -> str:
+    """
+    Return the 16-hex-digit SHA-1 of the normalized header
+    (see utils/value_dedup.py:normalize_value_key).
+    """
+    return hashlib.sha1(normalize_value_key(header).encode("utf-8")).hexdigest()[:16]
+
+
+def _registry_path(db_path):
+    return db_path or os.getenv("HEADER_REGISTRY_DB", DEFAULT_HEADER_REGISTRY_DB)
+
+
+def _create_registry_table(con, table):
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            fingerprint VARCHAR,
+            original_name VARCHAR,
+            translated_name VARCHAR,
+            short_name VARCHAR,
+            source VARCHAR,
+            created_at TIMESTAMP,
+            PRIMARY KEY (fingerprint, original_name)
+        )
+    """)
+
+
+def _ensure_registry_table(con):
+    _create_registry_table(con, REGISTRY_TABLE)
+    key = con.execute(
+        "SELECT constraint_column_names FROM duckdb_constraints() "
+        "WHERE table_name = ? AND constraint_type = 'PRIMARY KEY'",
+        [REGISTRY_TABLE]
+    ).fetchone()
+    if key and list(key[0]) == ["fingerprint"]:
+        # Registries created when the fingerprint alone was the key
+        con.execute(f"ALTER TABLE {REGISTRY_TABLE} RENAME TO {REGISTRY_TABLE}_old")
+        _create_registry_table(con, REGISTRY_TABLE)
+        con.execute(f"INSERT INTO {REGISTRY_TABLE} BY NAME SELECT * FROM {REGISTRY_TABLE}_old")
+        con.execute(f"DROP TABLE {REGISTRY_TABLE}_old")
+
+
+# Read the registry
+def load_header_registry(db_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load every registered header.
+
+    Returns:
+        pd.DataFrame: Columns of REGISTRY_COLUMNS (empty if the registry does not exist).
+    """
+    import duckdb
+
+    db_path = _registry_path(db_path)
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=REGISTRY_COLUMNS)
+
+    con = duckdb.connect(db_path)
+    try:
+        _ensure_registry_table(con)
+        return con.execute(f"SELECT * FROM {REGISTRY_TABLE}").fetchdf()
+    finally:
+        con.close()
+
+
+# Add or update headers
+def register_headers(entries, source: str = "llm", db_path: Optional[str] = None) -> int:
+    """
+    Upsert header mappings, keyed by original_name and its fingerprint. An entry
+    only replaces the registered mapping of the same header text; another header
+    with the same fingerprint is added next to it.
+
+    Args:
+        entries (list of dict): {original_name, translated_name, short_name} dicts
+            (e.g. translate_headers_via_llm output or rows of a column mapping CSV).
+        source (str): Where the mapping came from ('llm', 'fuzzy', 'mapping', ...).
+        db_path (str or None): Registry file (default: HEADER_REGISTRY_DB or data/interim/header_registry.duckdb).
+
+    Returns:
+        int: Number of headers written.
+    """
+    import duckdb
+
+    entries_df = pd.DataFrame(list(entries), columns=["original_name", "translated_name", "short_name"])
+    if entries_df.empty:
+        return 0
+    entries_df = entries_df.astype(str)
+    entries_df.insert(0, "fingerprint", entries_df["original_name"].map(header_fingerprint))
+    entries_df["source"] = source
+    entries_df["created_at"] = datetime.now()
+    entries_df = entries_df.drop_duplicates(["fingerprint", "original_name"], keep="last")
+
+    db_path = _registry_path(db_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    con = duckdb.connect(db_path)
+    try:
+        _ensure_registry_table(con)
+        con.register("entries_df", entries_df)
+        con.execute(f"INSERT OR REPLACE INTO {REGISTRY_TABLE} BY NAME SELECT * FROM entries_df")
+    finally:
+        con.close()
+    return len(entries_df)
+
+
+# Best fuzzy match in the registry for each header
+def fuzzy_match_headers(headers, registry_df: pd.DataFrame, threshold: float = FUZZY_THRESHOLD) -> dict:
+    """
+    Match headers to registered ones by character n-gram (TF, no IDF) cosine similarity
+    of their normalized text. A match must also have the same numbers (so
+    "Question 12" never maps to "Question 13") and the same negation.
+
+    Returns:
+        dict: {header: matching registry row (pd.Series)} for headers with a match.
+    """
+    if not len(headers) or registry_df.empty:
+        return {}
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    keys = [normalize_value_key(h) for h in headers]
+    known_keys = [normalize_value_key(h) for h in registry_df["original_name"]]
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), use_idf=False).fit(known_keys + keys)
+    similarity = (vectorizer.transform(keys) @ vectorizer.transform(known_keys).T).toarray()
+
+    matches = {}
+    for i, header in enumerate(headers):
+        for j in np.argsort(-similarity[i]):
+            if similarity[i, j] < threshold:
+                break
+            if (
+                _NUMBER.findall(keys[i]) == _NUMBER.findall(known_keys[j])
+                and has_negation(keys[i]) == has_negation(known_keys[j])
+            ):
+                matches[header] = registry_df.iloc[j]
+                break
+    return matches
+
+
+def _unique_short_name(short_name, taken):
+    candidate, n = short_name, 2
+    while candidate in taken:
+        candidate = f"{short_name}_{n}"
+        n += 1
+    return candidate
+
+
+# Map the headers of an export
+def map_headers(
+    headers,
+    db_path: Optional[str] = None,
+    fuzzy_threshold: Optional[float] = FUZZY_THRESHOLD,
+    batch_size: int = 5,
+    model: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    verbose: bool = True
+) -> list:
+    """
+    Map headers to {original_name, translated_name, short_name} using the registry;
+    only headers with neither an exact nor a fuzzy match go to the LLM.
+
+    Short names are unique within the export: a fuzzy match whose short_name is
+    already used by another header of the export is sent to the LLM instead, and
+    LLM short_names that collide get a numeric suffix.
+
+    Args:
+        headers (list of str): Cleaned column headers.
+        db_path (str or None): Registry file (default: HEADER_REGISTRY_DB).
+        fuzzy_threshold (float or None): Minimum similarity of a fuzzy match (None disables fuzzy matching).
+        batch_size (int): Headers per LLM request.
+        model (str or None): OpenAI model instead of routing (see translate_headers_via_llm).
+        max_workers (int): LLM requests sent concurrently.
+        verbose (bool): Print match counts.
+
+    Returns:
+        list of dict: One mapping per header that could be mapped, in header order,
+        with a 'match' key ('exact', 'fuzzy' or 'llm').
+    """
+    headers = list(dict.fromkeys(headers))
+    registry_df = load_header_registry(db_path)
+    registered = {(row.fingerprint, row.original_name): row for row in registry_df.itertuples(index=False)}
+
+    mapped, taken = {}, set()
+    for header in headers:
+        # Exact only if the text agrees, not just the fingerprint
+        row = registered.get((header_fingerprint(header), str(header)))
+        if row is not None and row.short_name not in taken:
+            mapped[header] = {
+                "original_name": header,
+                "translated_name": row.translated_name,
+                "short_name": row.short_name,
+                "match": "exact",
+            }
+            taken.add(row.short_name)
+
+    unmatched = [h for h in headers if h not in mapped]
+    fuzzy = fuzzy_match_headers(unmatched, registry_df, fuzzy_threshold) if fuzzy_threshold is not None else {}
+    for header, row in fuzzy.items():
+        if row["short_name"] in taken:
+            continue
+        mapped[header] = {
+            "original_name": header,
+            "translated_name": row["translated_name"],
+            "short_name": row["short_name"],
+            "match": "fuzzy",
+        }
+        taken.add(row["short_name"])
+
+    new_headers = [h for h in headers if h not in mapped]
+    if verbose:
+        n_exact = sum(m["match"] == "exact" for m in mapped.values())
+        print(
+            f"[🗂️] Headers: {len(headers)} total, {n_exact} known, "
+            f"{len(mapped) - n_exact} fuzzy-matched, {len(new_headers)} new."
+        )
+
+    if new_headers:
+        translated = translate_headers_via_llm(
+            new_headers, batch_size=batch_size, model=model, max_workers=max_workers
+        )
+        for item in translated:
+            short_name = _unique_short_name(item["short_name"], taken)
+            mapped[item["original_name"]] = {**item, "short_name": short_name, "match": "llm"}
+            taken.add(short_name)
+
+    for source in ("fuzzy", "llm"):
+        register_headers([m for m in mapped.values() if m["match"] == source], source=source, db_path=db_path)
+
+    return [mapped[h] for h in headers if h in mapped]
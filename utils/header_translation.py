@@ -0,0 +1,150 @@
+"""
+Header Translation
+-------------------
+LLM translation of raw column headers into English names and snake_case
+short_names, used by utils/header_registry.py for headers it has not seen.
+Batches go to the model route chosen from the headers (utils/llm_router.py)
+and run concurrently; entries failing validation are re-requested once on the
+strong route.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.llms import call_llm
+from utils.llm_metrics import submit_in_context
+from utils.llm_router import call_route, choose_route_for_values, escalate
+from utils.llm_utils import JSON_RESPONSE_FORMAT, safe_parse_llm_response
+from utils.data_utils import batch_items
+
+SHORT_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+HEADER_FIELDS = ("original_name", "translated_name", "short_name")
+
+
+def validate_header_items(parsed, batch):
+    """
+    Validate a JSON-mode header translation response element by element.
+
+    Expected shape:
+        {"headers": [{"original_name": ..., "translated_name": ..., "short_name": ...}, ...]}
+
+    Args:
+        parsed (dict): Parsed LLM response.
+        batch (list of str): Headers sent in the prompt.
+
+    Returns:
+        tuple: (list of valid header dicts, list of headers missing a valid entry)
+    """
+    items = parsed.get("headers") if isinstance(parsed, dict) else None
+    valid = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        if not all(isinstance(item.get(f), str) and item.get(f).strip() for f in HEADER_FIELDS):
+            continue
+        if item["original_name"] not in batch or item["original_name"] in valid:
+            continue
+        if not SHORT_NAME_PATTERN.match(item["short_name"]):
+            continue
+        valid[item["original_name"]] = {f: item[f] for f in HEADER_FIELDS}
+
+    missing = [h for h in batch if h not in valid]
+    return [valid[h] for h in batch if h in valid], missing
+
+
+HEADER_SYSTEM_PROMPT = """You are a helpful assistant that translates Hindi column headers and generates short, snake_case names.
+For each of the following column headers, return a JSON object {"headers": [...]} where each item has:
+- "original_name": the original name, copied exactly
+- "translated_name": a clear English translation
+- "short_name": a concise, snake_case identifier usable in Python (lowercase letters, digits and underscores)
+"""
+
+
+def _translate_header_batch(batch, model=None, route=None):
+    """
+    Translate one batch of headers, re-requesting invalid entries once on the
+    strong route, bypassing the response cache. Returns the valid header dicts
+    in batch order.
+    """
+    results = []
+    pending = list(batch)
+    batch_route = route or choose_route_for_values(batch, lang="hi", translate=True)
+    for attempt in range(2):
+        if not pending:
+            break
+        user_prompt = "Column Headers:\n" + "\n".join([f"- {h}" for h in pending])
+
+        print(f"\n🧪 Sending batch ({model or batch_route}):")
+        print(user_prompt)
+
+        def all_valid(reply, sent=tuple(pending)):
+            # Only a reply that validates in full is cached and reused
+            try:
+                parsed = safe_parse_llm_response(reply)
+            except (ValueError, SyntaxError):
+                return False
+            return not validate_header_items(parsed, list(sent))[1]
+
+        if model:
+            response = call_llm(
+                system_prompt=HEADER_SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                provider="openai",
+                model=model,
+                response_format=JSON_RESPONSE_FORMAT,
+                use_cache=attempt == 0,
+                cache_if=all_valid
+            )
+        else:
+            response = call_route(
+                batch_route,
+                system_prompt=HEADER_SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                response_format=JSON_RESPONSE_FORMAT,
+                use_cache=attempt == 0,
+                cache_if=all_valid
+            )
+            batch_route = escalate(batch_route)
+
+        try:
+            parsed = safe_parse_llm_response(response) if response else {}
+        except (ValueError, SyntaxError) as e:
+            print(f"[ERROR] Failed to parse response:\n{response}\nError: {e}")
+            parsed = {}
+
+        valid, pending = validate_header_items(parsed, pending)
+        results.extend(valid)
+
+    if pending:
+        print(f"[ERROR] No valid translation for headers: {pending}")
+
+    order = {h: i for i, h in enumerate(batch)}
+    return sorted(results, key=lambda item: order[item["original_name"]])
+
+
+def translate_headers_via_llm(headers, batch_size=5, model=None, route=None, max_workers=1):
+    """
+    Translates a list of column headers (Hindi or English) into structured JSON with
+    translated names and short, snake_case aliases.
+
+    Each batch goes to the model route chosen from the headers' length
+    (utils/llm_router.py); headers whose entry fails validation are re-requested
+    once on their own, escalated to the strong route.
+
+    Args:
+        headers (list of str): List of column headers to translate
+        batch_size (int): Number of headers per API call
+        model (str or None): OpenAI model to use instead of routing
+        route (str or None): Force a route ('fast' or 'strong') instead of choosing one
+        max_workers (int): Batches sent concurrently
+
+    Returns:
+        List of dicts: [{original_name, translated_name, short_name}, ...] in header order
+    """
+    batches = list(batch_items(headers, batch_size))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            submit_in_context(executor, _translate_header_batch, batch, model, route)
+            for batch in batches
+        ]
+        return [item for future in futures for item in future.result()]
@@ -0,0 +1,272 @@
+"""
+LLM Metrics
+-------------------
+Per-call instrumentation for utils/llms.py.
+
+Every chat call records provider, model, token usage (including prompt tokens
+served from the provider's prefix cache), latency, retry count, cache hit and
+estimated cost, tagged with the current pipeline run, column and model route
+(see `llm_call_context`). Records are buffered in memory and written to a local
+DuckDB table with `flush_llm_metrics`.
+"""
+
+import contextvars
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+# Default DuckDB file for call records (override with LLM_METRICS_DB)
+DEFAULT_METRICS_DB = "data/interim/llm_metrics.duckdb"
+METRICS_TABLE = "llm_calls"
+
+# USD per 1M tokens: (prompt, completion)
+MODEL_PRICES = {
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+    "gpt-4": (30.0, 60.0),
+    "gpt-4o": (2.50, 10.0),
+    "gpt-4o-mini": (0.15, 0.60),
+    "mixtral-8x7b": (0.24, 0.24),
+}
+
+# USD per 1M prompt tokens served from the provider's prefix cache
+MODEL_CACHED_PROMPT_PRICES = {
+    "deepseek-chat": 0.07,
+    "deepseek-reasoner": 0.14,
+    "gpt-4o": 1.25,
+    "gpt-4o-mini": 0.075,
+}
+
+_run_id = contextvars.ContextVar("llm_run_id", default=None)
+_column_name = contextvars.ContextVar("llm_column_name", default=None)
+_route = contextvars.ContextVar("llm_route", default=None)
+
+_records = []
+_records_lock = threading.Lock()
+
+
+@dataclass
+class LLMCallRecord:
+    """
+    One instrumented LLM call.
+    """
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False
+    success: bool = True
+    cost_usd: float = 0.0
+    run_id: Optional[str] = None
+    column_name: Optional[str] = None
+    route: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+
+
+# New pipeline run identifier
+def new_run_id() -> str:
+    """
+    Return a new run identifier, e.g. '20250101T120000-1a2b3c'.
+    """
+    return f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+# Tag LLM calls made inside the block with a run, column and/or route
+@contextmanager
+def llm_call_context(
+    run_id: Optional[str] = None,
+    column_name: Optional[str] = None,
+    route: Optional[str] = None
+):
+    """
+    Tag every LLM call made inside the block with `run_id`, `column_name` and/or `route`.
+    Arguments left as None keep the enclosing context's value.
+    """
+    tokens = []
+    if run_id is not None:
+        tokens.append((_run_id, _run_id.set(run_id)))
+    if column_name is not None:
+        tokens.append((_column_name, _column_name.set(column_name)))
+    if route is not None:
+        tokens.append((_route, _route.set(route)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+# Run a task on an executor with the caller's call tags
+def submit_in_context(executor, fn, *args):
+    """
+    executor.submit(fn, *args), run in a copy of the caller's context: worker
+    threads do not inherit context variables, so without it LLM calls made by the
+    task would lose the run/column/route tags of llm_call_context.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+# Estimated cost of a call
+def estimate_cost_usd(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    Estimate the USD cost of a call from MODEL_PRICES (0.0 for unknown models).
+    `cached_tokens` of the prompt tokens are priced at MODEL_CACHED_PROMPT_PRICES.
+    """
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    cached_price = MODEL_CACHED_PROMPT_PRICES.get(model, prompt_price)
+    return (
+        (prompt_tokens - cached_tokens) * prompt_price
+        + cached_tokens * cached_price
+        + completion_tokens * completion_price
+    ) / 1_000_000
+
+
+# Approximate token count of a prompt or reply
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count: ~4 characters per token for Latin script and
+    ~1.5 characters per token for Devanagari and other non-ASCII text.
+    """
+    if not text:
+        return 0
+    n_ascii = sum(1 for ch in text if ord(ch) < 128)
+    n_other = len(text) - n_ascii
+    return max(1, round(n_ascii / 4 + n_other / 1.5))
+
+
+# Record one call
+def record_llm_call(
+    provider: str,
+    model: str,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    latency_ms: float = 0.0,
+    retries: int = 0,
+    cache_hit: bool = False,
+    success: bool = True,
+    cached_tokens: int = 0
+) -> LLMCallRecord:
+    """
+    Buffer a call record tagged with the current run, column and route context.
+
+    Returns:
+        LLMCallRecord: The buffered record.
+    """
+    record = LLMCallRecord(
+        provider=provider,
+        model=model,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cached_tokens=cached_tokens,
+        latency_ms=latency_ms,
+        retries=retries,
+        cache_hit=cache_hit,
+        success=success,
+        cost_usd=estimate_cost_usd(model, prompt_tokens, completion_tokens, cached_tokens),
+        run_id=_run_id.get(),
+        column_name=_column_name.get(),
+        route=_route.get(),
+    )
+    with _records_lock:
+        _records.append(record)
+    return record
+
+
+# Buffered records as a DataFrame
+def get_llm_call_records(clear: bool = False):
+    """
+    Return buffered (not yet flushed) call records as a DataFrame.
+
+    Args:
+        clear (bool): Empty the buffer after reading.
+
+    Returns:
+        pd.DataFrame: One row per call.
+    """
+    import pandas as pd
+
+    with _records_lock:
+        records = list(_records)
+        if clear:
+            _records.clear()
+    columns = list(LLMCallRecord.__dataclass_fields__)
+    return pd.DataFrame([asdict(r) for r in records], columns=columns)
+
+
+# Write buffered records to DuckDB
+def flush_llm_metrics(db_path: Optional[str] = None, verbose: bool = False) -> int:
+    """
+    Append buffered call records to the `llm_calls` table and clear the buffer.
+
+    Args:
+        db_path (str or None): DuckDB file (default: LLM_METRICS_DB or data/interim/llm_metrics.duckdb).
+        verbose (bool): Print how many records were written.
+
+    Returns:
+        int: Number of records written.
+    """
+    import duckdb
+
+    records_df = get_llm_call_records(clear=True)
+    if records_df.empty:
+        return 0
+
+    db_path = db_path or os.getenv("LLM_METRICS_DB", DEFAULT_METRICS_DB)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    con = duckdb.connect(db_path)
+    try:
+        con.register("records_df", records_df)
+        con.execute(f"CREATE TABLE IF NOT EXISTS {METRICS_TABLE} AS SELECT * FROM records_df LIMIT 0")
+        # Tables created before a field was added get the new column
+        for name, dtype, *_ in con.execute("DESCRIBE SELECT * FROM records_df").fetchall():
+            con.execute(f'ALTER TABLE {METRICS_TABLE} ADD COLUMN IF NOT EXISTS "{name}" {dtype}')
+        con.execute(f"INSERT INTO {METRICS_TABLE} BY NAME SELECT * FROM records_df")
+    finally:
+        con.close()
+
+    if verbose:
+        print(f"[📊] Wrote {len(records_df)} LLM call records to {db_path}:{METRICS_TABLE}")
+    return len(records_df)
+
+
+# Per-column summary of call records
+def summarize_llm_calls(records_df, by: str = "column_name"):
+    """
+    Summarize call records: calls, tokens, prefix-cached prompt share, latency,
+    retries, cache hits and cost per group.
+
+    Args:
+        records_df (pd.DataFrame): Output of get_llm_call_records() or the llm_calls table.
+        by (str): Column to group by (default: column_name; e.g. 'route' or 'model').
+
+    Returns:
+        pd.DataFrame: One row per group, sorted by total latency.
+    """
+    import pandas as pd
+
+    if records_df.empty:
+        return pd.DataFrame()
+    grouped = records_df.fillna({by: "(none)"}).groupby(by)
+    summary = grouped.agg(
+        calls=("model", "size"),
+        prompt_tokens=("prompt_tokens", "sum"),
+        cached_tokens=("cached_tokens", "sum"),
+        completion_tokens=("completion_tokens", "sum"),
+        total_latency_ms=("latency_ms", "sum"),
+        p50_latency_ms=("latency_ms", "median"),
+        p95_latency_ms=("latency_ms", lambda s: s.quantile(0.95)),
+        retries=("retries", "sum"),
+        cache_hits=("cache_hit", "sum"),
+        failures=("success", lambda s: int((~s.astype(bool)).sum())),
+        cost_usd=("cost_usd", "sum"),
+    )
+    summary["cached_share"] = (summary["cached_tokens"] / summary["prompt_tokens"].where(summary["prompt_tokens"] > 0)).fillna(0.0)
+    return summary.sort_values("total_latency_ms", ascending=False).reset_index()
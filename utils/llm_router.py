@@ -0,0 +1,153 @@
+"""
+LLM Router
+-------------------
+Cost/latency-aware model selection for enrichment tasks.
+
+Two routes are configured:
+    fast    cheap, low-latency model for short categorical values (yes/no,
+            short options) — default: DeepSeek's default model
+    strong  heavier model for long free text, large value sets and Hindi
+            translation of long phrases — default: DeepSeek's default model
+
+Config (environment or .env):
+    LLM_FAST_PROVIDER / LLM_FAST_MODEL       Fast route (default: deepseek / provider default)
+    LLM_STRONG_PROVIDER / LLM_STRONG_MODEL   Strong route (default: deepseek / provider default)
+
+Both routes default to DeepSeek, so enrichment needs no key besides
+DEEPSEEK_API_KEY. To use a heavier model for the strong route, set e.g.
+LLM_STRONG_PROVIDER=openai and LLM_STRONG_MODEL=gpt-4o (needs OPENAI_API_KEY).
+
+Values that fail validation are re-requested on the strong route (see
+utils/llm_utils.py), bypassing the response cache. With the default config both
+routes resolve to the same model, so that repair round is a plain retry and is
+logged as such (same_model()). Calls are tagged with the route name in
+utils/llm_metrics.py, so latency and cost can be summarized per route.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from utils.llms import _load_env, call_llm, resolve_provider_and_model
+from utils.llm_metrics import llm_call_context
+
+FAST_ROUTE = "fast"
+STRONG_ROUTE = "strong"
+
+# Thresholds above which a value set is considered hard
+FAST_MAX_UNIQUE = 200
+FAST_MAX_AVG_CHARS = 40
+FAST_MAX_AVG_CHARS_TRANSLATION = 25  # Hindi -> English translation of longer phrases
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    A named provider/model pair.
+    """
+    name: str
+    provider: str
+    model: Optional[str] = None  # None = provider default (see utils/llms.py)
+
+
+# Configured route by name
+def get_route(name: str) -> Route:
+    """
+    Return the configured 'fast' or 'strong' route.
+    """
+    _load_env()  # Route settings may come from .env
+    if name == FAST_ROUTE:
+        return Route(FAST_ROUTE, os.getenv("LLM_FAST_PROVIDER", "deepseek"), os.getenv("LLM_FAST_MODEL"))
+    if name == STRONG_ROUTE:
+        return Route(STRONG_ROUTE, os.getenv("LLM_STRONG_PROVIDER", "deepseek"), os.getenv("LLM_STRONG_MODEL"))
+    raise ValueError(f"Unknown route '{name}'. Known: {[FAST_ROUTE, STRONG_ROUTE]}")
+
+
+# Pick a route from simple features of the work
+def choose_route(n_unique: int, avg_length: float, lang: Optional[str] = None, translate: bool = False) -> str:
+    """
+    Choose 'fast' or 'strong' from the number of unique values, their average
+    length and the language.
+
+    Args:
+        n_unique (int): Unique values in the request.
+        avg_length (float): Average value length in characters.
+        lang (str or None): Column language ('hi' or 'en').
+        translate (bool): The request includes Hindi -> English translation.
+
+    Returns:
+        str: Route name.
+    """
+    max_chars = FAST_MAX_AVG_CHARS
+    if translate and str(lang).lower() == "hi":
+        max_chars = FAST_MAX_AVG_CHARS_TRANSLATION
+    if n_unique > FAST_MAX_UNIQUE or avg_length > max_chars:
+        return STRONG_ROUTE
+    return FAST_ROUTE
+
+
+def choose_route_for_values(values, lang: Optional[str] = None, translate: bool = False) -> str:
+    """
+    choose_route() computed from a list of values.
+    """
+    values = [str(v) for v in values]
+    avg_length = sum(len(v) for v in values) / len(values) if values else 0.0
+    return choose_route(len(values), avg_length, lang, translate)
+
+
+# Next route after a validation failure
+def escalate(route_name: str) -> str:
+    """
+    Return the route to retry on after validation failed ('fast' -> 'strong').
+    """
+    return STRONG_ROUTE
+
+
+# Chat call on a route
+def call_route(
+    route_name: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.2,
+    response_format: dict | None = None,
+    use_cache: bool = True,
+    cache_if: Optional[Callable[[str], bool]] = None
+) -> str:
+    """
+    call_llm() on the provider/model of a route, tagging the call with the route name.
+
+    Returns:
+        str: Text content from the assistant's reply ("" on error).
+    """
+    route = get_route(route_name)
+    with llm_call_context(route=route.name):
+        return call_llm(
+            system_prompt,
+            user_prompt,
+            provider=route.provider,
+            model=route.model,
+            temperature=temperature,
+            response_format=response_format,
+            use_cache=use_cache,
+            cache_if=cache_if,
+        )
+
+
+# Provider/model a route resolves to
+def describe_route(route_name: str) -> str:
+    """
+    Return 'route: provider/model' for logs.
+    """
+    route = get_route(route_name)
+    provider, model = resolve_provider_and_model(route.provider, route.model)
+    return f"{route.name}: {provider}/{model}"
+
+
+# Whether two routes resolve to the same provider/model
+def same_model(route_a: str, route_b: str) -> bool:
+    """
+    Return True if both routes call the same provider/model, i.e. escalating from
+    one to the other only retries the request.
+    """
+    a, b = get_route(route_a), get_route(route_b)
+    return resolve_provider_and_model(a.provider, a.model) == resolve_provider_and_model(b.provider, b.model)
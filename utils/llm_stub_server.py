@@ -0,0 +1,571 @@
+"""
+LLM Stub Server
+-------------------
+Local, OpenAI-compatible stand-in for DeepSeek/OpenAI/Groq chat completions.
+
+Returns deterministic fake translations and sentiments for the prompts built in
+utils/llm_utils.py, with configurable latency and error rate, so enrichment can
+be benchmarked and regression-tested offline.
+
+Also emulates the Files and Batch APIs (POST /v1/files, GET /v1/files/{id}/content,
+POST /v1/batches, GET /v1/batches/{id}) for the batch mode in utils/llms.py;
+a batch completes `batch_latency_ms` after it was created.
+
+Prefix caching is emulated DeepSeek-style: once a system prompt has been seen,
+later requests starting with it report its tokens (in 64-token units) as cached
+(`prompt_tokens_details.cached_tokens` / `prompt_cache_hit_tokens`) and skip
+their prefill time (`ms_per_prompt_token`).
+
+Usage:
+    python -m utils.llm_stub_server --port 8765 --latency-ms 200 --error-rate 0.02
+
+    # then point utils/llms.py at it before importing it
+    export LLM_BASE_URL=http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import ast
+import email.parser
+import email.policy
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+# Granularity of the emulated prefix cache
+PREFIX_CACHE_UNIT_TOKENS = 64
+
+# Values whose fake translation/sentiment is fixed, so yes/no columns look real
+KNOWN_VALUES = {
+    "हाँ": ("Yes", "positive"),
+    "हां": ("Yes", "positive"),
+    "नहीं": ("No", "negative"),
+    "yes": ("Yes", "positive"),
+    "no": ("No", "negative"),
+    "nan": ("nan", "unknown"),
+}
+
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+NUMBERED_VALUE = re.compile(r'^(\d+)\. (".*")$')
+
+# Single-letter sentiment codes of the compact encoding (see utils/llm_utils.py)
+SENTIMENT_CODE_OF = {"positive": "p", "negative": "n", "neutral": "u", "unknown": "x"}
+
+
+@dataclass
+class StubConfig:
+    """
+    Behaviour of the stub server.
+
+    Args:
+        latency_ms (float): Fixed latency added to every request.
+        ms_per_output_token (float): Extra latency per completion token (models decode time).
+        ms_per_prompt_token (float): Extra latency per uncached prompt token (models prefill time).
+        jitter_ms (float): Uniform random jitter added on top of the latency.
+        error_rate (float): Probability (0-1) of answering with an HTTP error.
+        malformed_rate (float): Probability (0-1) that a single JSON item is corrupted.
+        seed (int): Seed for the jitter/error random generator.
+        batch_latency_ms (float): Time until a batch job completes.
+    """
+    latency_ms: float = 0.0
+    ms_per_output_token: float = 0.0
+    ms_per_prompt_token: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int = 42
+    batch_latency_ms: float = 0.0
+
+
+@dataclass
+class StubStats:
+    """
+    Counters collected by the stub server (thread-safe via `lock`).
+    """
+    calls: int = 0
+    errors: int = 0
+    batch_requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    latencies_ms: list = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "batch_requests": self.batch_requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "latencies_ms": list(self.latencies_ms),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.calls = 0
+            self.errors = 0
+            self.batch_requests = 0
+            self.prompt_tokens = 0
+            self.cached_tokens = 0
+            self.completion_tokens = 0
+            self.latencies_ms = []
+
+
+# Rough token count (~4 characters per token)
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count of a text, ~4 characters per token.
+    """
+    return max(1, len(text) // 4) if text else 0
+
+
+# Deterministic fake translation
+def fake_translate(value) -> str:
+    """
+    Deterministic fake English translation of a value.
+    Non-Hindi values are returned unchanged.
+    """
+    text = str(value).strip()
+    if text.lower() in KNOWN_VALUES:
+        return KNOWN_VALUES[text.lower()][0]
+    if not DEVANAGARI.search(text):
+        return text
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:6]
+    return f"translated {digest}"
+
+
+# Deterministic fake sentiment
+def fake_sentiment(value) -> str:
+    """
+    Deterministic fake sentiment of a value.
+    """
+    text = str(value).strip()
+    if text.lower() in KNOWN_VALUES:
+        return KNOWN_VALUES[text.lower()][1]
+    digest = int(hashlib.sha1(text.encode("utf-8")).hexdigest(), 16)
+    return SENTIMENTS[digest % len(SENTIMENTS)]
+
+
+# Pull the list of values out of a prompt built by utils/llm_utils.py
+def extract_values(prompt: str) -> list:
+    """
+    Find the values embedded in a prompt.
+
+    Looks for a line starting with '[' or 'Values: [', or for numbered
+    '1. "value"' lines (compact encoding).
+
+    Returns:
+        list: Values found, or an empty list.
+    """
+    numbered = [NUMBERED_VALUE.match(line.strip()) for line in prompt.splitlines()]
+    numbered = [m for m in numbered if m]
+    if numbered:
+        return [json.loads(m.group(2)) for m in numbered]
+
+    for line in prompt.splitlines():
+        candidate = line.strip()
+        if candidate.startswith("Values:"):
+            candidate = candidate[len("Values:"):].strip()
+        if candidate.startswith("[") and candidate.endswith("]"):
+            try:
+                return list(ast.literal_eval(candidate))
+            except (ValueError, SyntaxError):
+                try:
+                    return list(json.loads(candidate))
+                except ValueError:
+                    continue
+    return []
+
+
+# Fake snake_case short name for a header
+def fake_short_name(header: str) -> str:
+    """
+    Deterministic snake_case identifier for a header.
+    """
+    words = re.findall(r"[a-z0-9]+", fake_translate(header).lower())
+    return "_".join(words) or "column"
+
+
+# Build the fake assistant reply for a prompt
+def build_reply(system_prompt: str, user_prompt: str, rng: Optional[random.Random] = None,
+                malformed_rate: float = 0.0) -> str:
+    """
+    Build a deterministic reply in the shape the prompt asks for.
+
+    - header prompts       -> {"headers": [{original_name, translated_name, short_name}]}
+    - JSON "items" prompts -> {"items": [{"i", "translated_value"?, "sentiment"?}]}
+    - compact prompts      -> {"t": {number: translation}?, "s": {number: code}?}
+    - legacy prompts       -> list of translations / {"sentiment": [...]} / both lists
+    """
+    if user_prompt.startswith("Column Headers:"):
+        headers = [line[2:] for line in user_prompt.splitlines()[1:] if line.startswith("- ")]
+        return json.dumps({"headers": [
+            {"original_name": h, "translated_name": fake_translate(h), "short_name": fake_short_name(h)}
+            for h in headers
+        ]}, ensure_ascii=False)
+
+    # Output format comes from the static instructions (system prompt),
+    # values from the payload (user prompt)
+    values = extract_values(user_prompt)
+    instructions = f"{system_prompt}\n{user_prompt}"
+
+    if '"t": {' in instructions or '"s": {' in instructions:
+        reply = {}
+        if '"t": {' in instructions:
+            reply["t"] = {str(n): fake_translate(v) for n, v in enumerate(values, start=1)}
+        if '"s": {' in instructions:
+            reply["s"] = {str(n): SENTIMENT_CODE_OF[fake_sentiment(v)] for n, v in enumerate(values, start=1)}
+        for n in range(1, len(values) + 1):
+            if rng is not None and rng.random() < malformed_rate:
+                for mapping in reply.values():
+                    mapping[str(n)] = "great" if mapping is reply.get("s") else ""
+        return json.dumps(reply, ensure_ascii=False)
+
+    if '"items"' in instructions:
+        wants_translation = '"translated_value"' in instructions
+        wants_sentiment = '"sentiment"' in instructions
+        items = []
+        for i, v in enumerate(values):
+            item = {"i": i}
+            if wants_translation:
+                item["translated_value"] = fake_translate(v)
+            if wants_sentiment:
+                item["sentiment"] = fake_sentiment(v)
+            if rng is not None and rng.random() < malformed_rate:
+                item = {"i": i, "sentiment": "great"} if wants_sentiment else {"i": i}
+            items.append(item)
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    wants_translation = "translate" in user_prompt.lower()
+    wants_sentiment = "sentiment" in user_prompt.lower()
+    if wants_translation and wants_sentiment:
+        reply = {
+            "translated_value": [fake_translate(v) for v in values],
+            "sentiment": [fake_sentiment(v) for v in values],
+        }
+    elif wants_sentiment:
+        reply = {"sentiment": [fake_sentiment(v) for v in values]}
+    else:
+        reply = [fake_translate(v) for v in values]
+
+    return json.dumps(reply, ensure_ascii=False)
+
+
+def _chat_completion(
+    body: dict,
+    rng: random.Random,
+    rng_lock: threading.Lock,
+    config: StubConfig,
+    prefix_cache: set
+) -> dict:
+    """
+    Build an OpenAI chat.completion object for a request body, reporting the
+    system prompt as cached if an earlier request started with it.
+    """
+    messages = body.get("messages", [])
+    system_prompt = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+    user_prompt = "\n".join(m["content"] for m in messages if m.get("role") == "user")
+
+    with rng_lock:
+        content = build_reply(system_prompt, user_prompt, rng, config.malformed_rate)
+    system_tokens = estimate_tokens(system_prompt)
+    prompt_tokens = system_tokens + estimate_tokens(user_prompt)
+    completion_tokens = estimate_tokens(content)
+
+    prefix_key = (body.get("model"), hashlib.sha1(system_prompt.encode("utf-8")).hexdigest())
+    with rng_lock:
+        seen = prefix_key in prefix_cache
+        prefix_cache.add(prefix_key)
+    cached_tokens = system_tokens // PREFIX_CACHE_UNIT_TOKENS * PREFIX_CACHE_UNIT_TOKENS if seen else 0
+
+    return {
+        "id": f"chatcmpl-stub-{hashlib.sha1(user_prompt.encode('utf-8')).hexdigest()[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            "prompt_cache_hit_tokens": cached_tokens,
+            "prompt_cache_miss_tokens": prompt_tokens - cached_tokens,
+        },
+    }
+
+
+# Multipart upload -> (filename, purpose, content bytes)
+def _parse_multipart(content_type: str, body: bytes) -> tuple:
+    message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+    )
+    filename, purpose, content = "upload.jsonl", "batch", b""
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name == "file":
+            filename = part.get_filename() or filename
+            content = part.get_payload(decode=True) or b""
+        elif name == "purpose":
+            purpose = (part.get_payload(decode=True) or b"batch").decode("utf-8")
+    return filename, purpose, content
+
+
+def _make_handler(config: StubConfig, stats: StubStats):
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+    files = {}
+    batches = {}
+    batch_started = {}
+    prefix_cache = set()
+    store_lock = threading.Lock()
+
+    def _file_object(file_id):
+        filename, purpose, content, created = files[file_id]
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": created,
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def _run_batch(batch):
+        # Answer every line of the input file, like the chat endpoint would
+        _, _, content, _ = files[batch["input_file_id"]]
+        lines = [json.loads(line) for line in content.decode("utf-8").splitlines() if line.strip()]
+        output = []
+        for n, line in enumerate(lines):
+            completion = _chat_completion(line.get("body", {}), rng, rng_lock, config, prefix_cache)
+            with stats.lock:
+                stats.batch_requests += 1
+                stats.prompt_tokens += completion["usage"]["prompt_tokens"]
+                stats.completion_tokens += completion["usage"]["completion_tokens"]
+            output.append({
+                "id": f"batch_req_{n}",
+                "custom_id": line.get("custom_id"),
+                "response": {"status_code": 200, "request_id": f"req_{n}", "body": completion},
+                "error": None,
+            })
+        output_id = f"file-stub-{len(files) + 1}"
+        body = "".join(json.dumps(o, ensure_ascii=False) + "\n" for o in output).encode("utf-8")
+        files[output_id] = (f"{batch['id']}_output.jsonl", "batch_output", body, int(time.time()))
+        now = int(time.time())
+        batch.update(
+            status="completed",
+            output_file_id=output_id,
+            completed_at=now,
+            request_counts={"total": len(lines), "completed": len(lines), "failed": 0},
+        )
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_not_found(self):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        def do_GET(self):
+            path = self.path.rstrip("/")
+            parts = path.split("/")
+            if path.endswith("/stats"):
+                self._send_json(200, stats.as_dict())
+            elif "/files/" in path and path.endswith("/content"):
+                with store_lock:
+                    entry = files.get(parts[-2])
+                if entry is None:
+                    self._send_not_found()
+                    return
+                body = entry[2]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif "/files/" in path:
+                with store_lock:
+                    payload = _file_object(parts[-1]) if parts[-1] in files else None
+                self._send_json(200, payload) if payload else self._send_not_found()
+            elif "/batches/" in path:
+                with store_lock:
+                    batch = batches.get(parts[-1])
+                    if batch is not None and batch["status"] == "in_progress" \
+                            and (time.time() - batch_started[batch["id"]]) * 1000.0 >= config.batch_latency_ms:
+                        _run_batch(batch)
+                    payload = dict(batch) if batch is not None else None
+                self._send_json(200, payload) if payload else self._send_not_found()
+            else:
+                self._send_not_found()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            path = self.path.rstrip("/")
+
+            if path.endswith("/files"):
+                filename, purpose, content = _parse_multipart(self.headers.get("Content-Type", ""), raw)
+                with store_lock:
+                    file_id = f"file-stub-{len(files) + 1}"
+                    files[file_id] = (filename, purpose, content, int(time.time()))
+                    payload = _file_object(file_id)
+                self._send_json(200, payload)
+                return
+
+            body = json.loads(raw or b"{}")
+
+            if path.endswith("/stats/reset"):
+                stats.reset()
+                self._send_json(200, {"reset": True})
+                return
+
+            if path.endswith("/batches"):
+                with store_lock:
+                    if body.get("input_file_id") not in files:
+                        self._send_json(400, {"error": {"message": "Unknown input_file_id"}})
+                        return
+                    batch_id = f"batch-stub-{len(batches) + 1}"
+                    batches[batch_id] = {
+                        "id": batch_id,
+                        "object": "batch",
+                        "endpoint": body.get("endpoint", "/v1/chat/completions"),
+                        "input_file_id": body["input_file_id"],
+                        "completion_window": body.get("completion_window", "24h"),
+                        "status": "in_progress",
+                        "created_at": int(time.time()),
+                        "output_file_id": None,
+                        "error_file_id": None,
+                        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                    }
+                    batch_started[batch_id] = time.time()
+                    payload = dict(batches[batch_id])
+                self._send_json(200, payload)
+                return
+
+            if not path.endswith("/chat/completions"):
+                self._send_not_found()
+                return
+
+            started = time.perf_counter()
+            completion = _chat_completion(body, rng, rng_lock, config, prefix_cache)
+            prompt_tokens = completion["usage"]["prompt_tokens"]
+            cached_tokens = completion["usage"]["prompt_cache_hit_tokens"]
+            completion_tokens = completion["usage"]["completion_tokens"]
+
+            with rng_lock:
+                jitter = rng.uniform(0, config.jitter_ms)
+                fail = rng.random() < config.error_rate
+            delay_ms = (
+                config.latency_ms
+                + config.ms_per_prompt_token * (prompt_tokens - cached_tokens)
+                + config.ms_per_output_token * completion_tokens
+                + jitter
+            )
+            time.sleep(delay_ms / 1000.0)
+
+            with stats.lock:
+                stats.calls += 1
+                if fail:
+                    stats.errors += 1
+                else:
+                    stats.prompt_tokens += prompt_tokens
+                    stats.cached_tokens += cached_tokens
+                    stats.completion_tokens += completion_tokens
+                stats.latencies_ms.append((time.perf_counter() - started) * 1000.0)
+
+            if fail:
+                self._send_json(500, {"error": {"message": "Injected stub error", "type": "server_error"}})
+                return
+
+            self._send_json(200, completion)
+
+    return StubHandler
+
+
+# Start the stub server in a background thread
+def start_stub_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    config: Optional[StubConfig] = None
+):
+    """
+    Start the stub server in a daemon thread.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind (0 picks a free port).
+        config (StubConfig or None): Latency/error behaviour.
+
+    Returns:
+        tuple: (server, base_url, stats) - call server.shutdown() to stop it.
+    """
+    config = config or StubConfig()
+    stats = StubStats()
+    server = ThreadingHTTPServer((host, port), _make_handler(config, stats))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, base_url, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local OpenAI-compatible LLM stub server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--ms-per-output-token", type=float, default=0.0)
+    parser.add_argument("--ms-per-prompt-token", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        ms_per_output_token=args.ms_per_output_token,
+        ms_per_prompt_token=args.ms_per_prompt_token,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+        batch_latency_ms=args.batch_latency_ms,
+    )
+    server, base_url, _ = start_stub_server(args.host, args.port, config)
+    print(f"[🚀] LLM stub server listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("[🏁] LLM stub server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,94 +1,501 @@
-from utils.llms import call_deepseek
+from utils.llm_router import FAST_ROUTE, call_route, describe_route, escalate, get_route, same_model
+from utils.llms import make_batch_request
+from utils.llm_metrics import estimate_tokens
 import ast
+import json
+import os
+from dataclasses import dataclass
 
-def safe_parse_llm_response(response):
-    """
-    Clean LLM output and safely parse to dict.
-    """
+try:
+    import orjson
+
+    def _json_loads(text):
+        return orjson.loads(text)
+except ImportError:  # orjson is optional; fall back to the standard library
+    def _json_loads(text):
+        return json.loads(text)
+
+# Sentiment labels the enrichment pipeline accepts
+ALLOWED_SENTIMENTS = ("positive", "negative", "neutral", "unknown")
+
+# Longest translated value accepted from the LLM
+MAX_TRANSLATION_LENGTH = 500
+
+# Ask OpenAI-compatible APIs for a JSON object instead of free-form text
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Prompt/response encodings (default: LLM_PROMPT_ENCODING or 'compact')
+#   compact: numbered values in, {"t": {number: translation}, "s": {number: code}} out
+#   items:   JSON list in, {"items": [{"i", "translated_value", "sentiment"}]} out
+PROMPT_ENCODINGS = ("compact", "items")
+
+# Single-letter sentiment codes of the compact encoding
+SENTIMENT_CODES = {"p": "positive", "n": "negative", "u": "neutral", "x": "unknown"}
+
+# Role line of the system prompt per set of requested fields
+SYSTEM_PROMPTS = {
+    ("translated_value",): "You are a Hindi to English translator.",
+    ("sentiment",): "You are a helpful sentiment classification assistant.",
+    ("translated_value", "sentiment"): "You are a Hindi to English translator.",
+}
+
+
+def _strip_code_fences(response):
     cleaned = response.strip()
     if cleaned.startswith("```"):
         # Remove any code fences
         cleaned = "\n".join(
             line for line in cleaned.splitlines() if not line.strip().startswith("```")
         )
-    return ast.literal_eval(cleaned)
+    return cleaned
+
 
-def translate_list_with_llm(values):
+def safe_parse_llm_response(response):
     """
-    Example: translate Hindi strings to English.
+    Clean LLM output and safely parse to dict.
+
+    Parses JSON first (fast path for JSON-mode responses) and falls back
+    to ast.literal_eval for Python-literal replies.
     """
-    prompt = (
-        f"The following values are part of dataset that records a mentor's visit to schools during a monitoring excercise for the field whose description is:\n" 
-        f"{values}\n"
-        "Translate the Hindi entries in Values list to English. \n"
-        "Return the list of translations with the Hindi entries translated. \n"
-        "Do not add any additional text to the response.\n\n"
-    )
-    
-    response = call_deepseek(
-        system_prompt="You are a Hindi to English translator.",
-        user_prompt=prompt
-    )
+    cleaned = _strip_code_fences(response)
+    try:
+        return _json_loads(cleaned)
+    except ValueError:
+        return ast.literal_eval(cleaned)
 
-    return safe_parse_llm_response(response)
 
+def validate_enrichment_items(parsed, n_values, fields):
+    """
+    Validate a JSON-mode enrichment response element by element.
 
-from utils.llms import call_deepseek
-import ast
+    Expected shape:
+        {"items": [{"i": 0, "translated_value": "...", "sentiment": "positive"}, ...]}
+
+    Args:
+        parsed (dict): Parsed LLM response.
+        n_values (int): Number of values sent in the prompt.
+        fields (tuple): Fields each item must carry ('translated_value' and/or 'sentiment').
 
-def infer_sentiment_with_llm(values, col_desc):
+    Returns:
+        tuple: ({index: {field: value}} for valid items, sorted list of missing/invalid indices)
     """
-    Given a list of values, return a list of inferred sentiments.
-    
+    valid = {}
+    items = parsed.get("items") if isinstance(parsed, dict) else None
+    if not isinstance(items, list):
+        return valid, list(range(n_values))
+
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        idx = item.get("i")
+        if not isinstance(idx, int) or isinstance(idx, bool) or not 0 <= idx < n_values or idx in valid:
+            continue
+
+        record = {}
+        for field in fields:
+            value = item.get(field)
+            if field == "sentiment":
+                value = str(value).strip().lower() if value is not None else ""
+                if value not in ALLOWED_SENTIMENTS:
+                    break
+            elif not isinstance(value, str) or not value.strip() or len(value) > MAX_TRANSLATION_LENGTH:
+                break
+            record[field] = value
+        else:
+            valid[idx] = record
+
+    bad_indices = [i for i in range(n_values) if i not in valid]
+    return valid, bad_indices
+
+
+def _parse_item_number(key, n_values):
+    """
+    0-based index of a compact-encoding key ("1".."n"), or None if out of range.
+    """
+    try:
+        number = int(str(key).strip())
+    except ValueError:
+        return None
+    return number - 1 if 1 <= number <= n_values else None
+
+
+def validate_compact_response(parsed, n_values, fields):
+    """
+    Validate and decode a compact-encoding response element by element.
+
+    Expected shape (numbers are the 1-based positions of the values in the prompt):
+        {"t": {"1": "...", "2": "..."}, "s": {"1": "p", "2": "n"}}
+
     Args:
-        values (list): List of strings (unique values from the column).
-        col_desc (str): Description of the column (to provide context).
+        parsed (dict): Parsed LLM response.
+        n_values (int): Number of values sent in the prompt.
+        fields (tuple): Fields each value must carry ('translated_value' and/or 'sentiment').
 
     Returns:
-        dict: {'sentiment': [list of sentiments]}
+        tuple: ({index: {field: value}} for valid values, sorted list of missing/invalid indices)
     """
-    prompt = (
-        f"The following values are part of a dataset that records a mentor's visit to schools during a monitoring exercise.\n"
-        f"Column Description: {col_desc}\n"
-        f"Values: {values}\n"
-        "For each entry in the list, infer whether the sentiment is positive, negative, neutral, or unknown. "
-        "If the value is nan, set sentiment to 'unknown'.\n\n"
-        "Output Format: Python dictionary with exactly this structure:\n"
-        "{'sentiment': [list of sentiments]}\n"
-        "Do not add any other text."
-    )
-    
-    response = call_deepseek(
-        system_prompt="You are a helpful sentiment classification assistant.",
-        user_prompt=prompt
+    decoded = {field: {} for field in fields}
+    if isinstance(parsed, dict):
+        if "translated_value" in fields and isinstance(parsed.get("t"), dict):
+            for key, value in parsed["t"].items():
+                idx = _parse_item_number(key, n_values)
+                if idx is not None and isinstance(value, str) and value.strip() \
+                        and len(value) <= MAX_TRANSLATION_LENGTH:
+                    decoded["translated_value"][idx] = value
+        if "sentiment" in fields and isinstance(parsed.get("s"), dict):
+            for key, code in parsed["s"].items():
+                idx = _parse_item_number(key, n_values)
+                sentiment = SENTIMENT_CODES.get(str(code).strip().lower())
+                if idx is not None and sentiment is not None:
+                    decoded["sentiment"][idx] = sentiment
+
+    valid = {
+        i: {field: decoded[field][i] for field in fields}
+        for i in range(n_values)
+        if all(i in decoded[field] for field in fields)
+    }
+    bad_indices = [i for i in range(n_values) if i not in valid]
+    return valid, bad_indices
+
+
+# Static context shared by every enrichment prompt
+DATASET_CONTEXT = (
+    "The values come from a dataset that records a mentor's visit to schools during a "
+    "monitoring exercise. Each request lists the unique values of one column of the "
+    "dataset, optionally preceded by a description of the column."
+)
+
+TRANSLATION_INSTRUCTIONS = (
+    "Translate every Hindi entry to English. Keep English entries unchanged. "
+    "Keep translations short and literal, in the register of a survey answer. "
+    "Keep numbers, dates and codes as they are and transliterate names of people, "
+    "schools and places instead of translating them."
+)
+
+SENTIMENT_INSTRUCTIONS = (
+    "Classify every entry as positive, negative, neutral or unknown, judged as an answer "
+    "to the question in the column description: positive if it reports that things are "
+    "as they should be, negative if it reports a problem, shortage or absence, neutral "
+    "if it is factual or mixed, and unknown if it is nan, empty or cannot be judged."
+)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    Enrichment prompt split into a static instruction prefix (system message,
+    identical for every request with the same fields and encoding) and a
+    per-request payload (user message: column description and values).
+
+    Keeping everything static first lets provider-side prefix caches reuse the
+    instruction tokens across columns and requests.
+    """
+    encoding: str
+    fields: tuple
+    system_prompt: str
+
+    def render_payload(self, values, col_desc=None) -> str:
+        """
+        Render the user message: optional column description, then the values.
+        """
+        lines = []
+        if col_desc:
+            lines.append(f"Column Description: {col_desc}")
+        if self.encoding == "compact":
+            lines.append("Values:")
+            lines.extend(f"{n}. {json.dumps(str(v), ensure_ascii=False)}" for n, v in enumerate(values, start=1))
+        else:
+            lines.append(f"Values: {json.dumps([str(v) for v in values], ensure_ascii=False)}")
+        return "\n".join(lines)
+
+
+def _make_template(encoding, fields):
+    lines = [SYSTEM_PROMPTS[fields], DATASET_CONTEXT]
+    if "translated_value" in fields:
+        lines.append(TRANSLATION_INSTRUCTIONS)
+    if "sentiment" in fields:
+        lines.append(SENTIMENT_INSTRUCTIONS)
+
+    example_values = ["हाँ", "नहीं", "nan"]
+    example = {
+        "translated_value": ["Yes", "No", "nan"],
+        "sentiment": ["positive", "negative", "unknown"],
+    }
+    codes = {label: code for code, label in SENTIMENT_CODES.items()}
+
+    if encoding == "compact":
+        output_keys = []
+        reply = {}
+        if "translated_value" in fields:
+            output_keys.append('"t": {"1": "<translation>", ...}')
+            reply["t"] = {str(n): t for n, t in enumerate(example["translated_value"], start=1)}
+        if "sentiment" in fields:
+            legend = ", ".join(f"{code}={label}" for code, label in SENTIMENT_CODES.items())
+            lines.append(f"Write each sentiment as one letter: {legend}.")
+            output_keys.append('"s": {"1": "p", ...}')
+            reply["s"] = {str(n): codes[x] for n, x in enumerate(example["sentiment"], start=1)}
+        lines.append(
+            "Values are numbered from 1. Output Format: a JSON object keyed by value number, "
+            f"one entry per value: {{{', '.join(output_keys)}}}"
+        )
+    else:
+        item_keys = ", ".join(f'"{field}": ...' for field in fields)
+        reply = {"items": [
+            {"i": i, **{field: example[field][i] for field in fields}}
+            for i in range(len(example_values))
+        ]}
+        lines.append(
+            "Output Format: a JSON object with exactly this structure, one item per value, "
+            f'where i is the 0-based position of the value in Values: {{"items": [{{"i": 0, {item_keys}}}]}}'
+        )
+
+    payload = PromptTemplate(encoding, fields, "").render_payload(example_values, "Was the library used?")
+    lines.append(f"Example request:\n{payload}")
+    lines.append(f"Example reply:\n{json.dumps(reply, ensure_ascii=False)}")
+    lines.append("Do not add any other text.")
+    return PromptTemplate(encoding, fields, "\n\n".join(lines))
+
+
+# Prompt template per (encoding, fields)
+PROMPT_TEMPLATES = {
+    (encoding, fields): _make_template(encoding, fields)
+    for encoding in PROMPT_ENCODINGS
+    for fields in SYSTEM_PROMPTS
+}
+
+
+def _prompt_encoding(encoding=None):
+    encoding = encoding or os.getenv("LLM_PROMPT_ENCODING", "compact")
+    if encoding not in PROMPT_ENCODINGS:
+        raise ValueError(f"Unknown prompt encoding '{encoding}'. Known: {PROMPT_ENCODINGS}")
+    return encoding
+
+
+def get_prompt_template(fields, encoding=None) -> PromptTemplate:
+    """
+    Return the registered PromptTemplate for `fields` and `encoding`
+    (default: LLM_PROMPT_ENCODING or 'compact').
+    """
+    return PROMPT_TEMPLATES[(_prompt_encoding(encoding), tuple(fields))]
+
+
+def _validator(encoding):
+    return validate_compact_response if encoding == "compact" else validate_enrichment_items
+
+
+def _request_enrichment(
+    values,
+    fields,
+    col_desc=None,
+    max_repair_rounds=1,
+    route=FAST_ROUTE,
+    encoding=None
+):
+    """
+    Request structured enrichment for `values` and validate it against the schema.
+
+    The first request goes to `route` (see utils/llm_router.py). Only the indices
+    that fail validation are re-requested (up to `max_repair_rounds`), escalated to
+    the next stronger route, so one malformed element does not cost the whole batch.
+    Repair rounds bypass the response cache; when the stronger route resolves to
+    the same model they are plain retries, which is logged.
+    Elements that still fail fall back to the original value (translation) and
+    'unknown' (sentiment).
+
+    With the 'compact' encoding values are numbered and the reply maps numbers
+    to translations and single-letter sentiment codes, which roughly halves the
+    completion tokens of the 'items' encoding. Prompts come from PROMPT_TEMPLATES:
+    static instructions first, values last.
+
+    Returns:
+        tuple: ({field: [one entry per value]}, failed), `failed` listing the
+        indices of the values that got fallbacks.
+    """
+    values = list(values)
+    results = {}
+    pending = list(range(len(values)))
+    template = get_prompt_template(fields, encoding)
+    validate = _validator(template.encoding)
+
+    for round_no in range(1 + max_repair_rounds):
+        if not pending:
+            break
+        if round_no:
+            next_route = escalate(route)
+            if same_model(route, next_route):
+                print(f"[ℹ️] Retrying {len(pending)} values on the same model ({describe_route(next_route)}).")
+            route = next_route
+        batch = [values[i] for i in pending]
+
+        def all_valid(reply, size=len(batch)):
+            # Only a reply that validates in full is cached and reused
+            try:
+                parsed = safe_parse_llm_response(reply)
+            except (ValueError, SyntaxError):
+                return False
+            return len(validate(parsed, size, fields)[0]) == size
+
+        response = call_route(
+            route,
+            system_prompt=template.system_prompt,
+            user_prompt=template.render_payload(batch, col_desc),
+            response_format=JSON_RESPONSE_FORMAT,
+            use_cache=round_no == 0,
+            cache_if=all_valid
+        )
+        try:
+            parsed = safe_parse_llm_response(response) if response else {}
+        except (ValueError, SyntaxError) as e:
+            print(f"[⚠️] Could not parse LLM response: {e}")
+            parsed = {}
+
+        valid, _ = validate(parsed, len(batch), fields)
+        for local_idx, record in valid.items():
+            results[pending[local_idx]] = record
+        pending = [i for i in pending if i not in results]
+
+    if pending:
+        print(f"[⚠️] {len(pending)} of {len(values)} values failed validation; using fallbacks.")
+
+    output = {field: [] for field in fields}
+    for i, value in enumerate(values):
+        record = results.get(i, {})
+        for field in fields:
+            default = value if field == "translated_value" else "unknown"
+            output[field].append(record.get(field, default))
+    return output, pending
+
+
+def request_enrichment(values, fields, col_desc=None, route=FAST_ROUTE, encoding=None):
+    """
+    Translate and/or infer sentiment for `values`, like the helpers below, and
+    report which values failed validation (their entries are fallbacks: the
+    original value as the translation, 'unknown' as the sentiment). Callers that
+    persist results should leave the failed values out, so they are retried.
+
+    Args:
+        values (list): Values to enrich.
+        fields (tuple): 'translated_value' and/or 'sentiment'.
+        col_desc (str or None): Column description (not sent for translation only).
+        route (str): Model route to start on ('fast' or 'strong').
+        encoding (str or None): Prompt encoding (default: LLM_PROMPT_ENCODING).
+
+    Returns:
+        tuple: ({field: [one entry per value]}, list of failed indices)
+    """
+    fields = tuple(fields)
+    if fields == ("translated_value",):
+        col_desc = None  # Same prompt as translate_list_with_llm
+    return _request_enrichment(values, fields=fields, col_desc=col_desc, route=route, encoding=encoding)
+
+
+def enrichment_batch_request(values, fields, col_desc=None, route=FAST_ROUTE, encoding=None):
+    """
+    Describe the first enrichment request for `values` as a BatchRequest
+    (utils/llms.py), identical to what _request_enrichment would send, so an
+    ingested batch result answers it from the response cache.
+
+    Returns:
+        BatchRequest: The request.
+    """
+    fields = tuple(fields)
+    if fields == ("translated_value",):
+        col_desc = None  # translate_list_with_llm sends no column description
+    template = get_prompt_template(fields, encoding)
+    route_config = get_route(route)
+    return make_batch_request(
+        system_prompt=template.system_prompt,
+        user_prompt=template.render_payload(list(values), col_desc),
+        provider=route_config.provider,
+        model=route_config.model,
+        response_format=JSON_RESPONSE_FORMAT
     )
 
-    # print("[🔍] Raw response:\n", response)
 
-    # Parse response
-    parsed = safe_parse_llm_response(response)
+def estimate_enrichment_request(values, fields, col_desc=None, encoding=None):
+    """
+    Estimate prompt and completion tokens of one enrichment request without calling the LLM.
+
+    The completion is approximated by a well-formed reply that echoes each value
+    as its translation.
 
-    return parsed
+    Returns:
+        tuple: (prompt_tokens, completion_tokens)
+    """
+    fields = tuple(fields)
+    template = get_prompt_template(fields, encoding)
+    prompt = template.render_payload(values, col_desc)
+    if template.encoding == "compact":
+        reply = {}
+        if "translated_value" in fields:
+            reply["t"] = {str(n): str(v) for n, v in enumerate(values, start=1)}
+        if "sentiment" in fields:
+            reply["s"] = {str(n): "p" for n in range(1, len(values) + 1)}
+        reply = json.dumps(reply, ensure_ascii=False)
+    else:
+        items = []
+        for i, value in enumerate(values):
+            item = {"i": i}
+            if "translated_value" in fields:
+                item["translated_value"] = str(value)
+            if "sentiment" in fields:
+                item["sentiment"] = "positive"
+            items.append(item)
+        reply = json.dumps({"items": items}, ensure_ascii=False)
+    return estimate_tokens(template.system_prompt) + estimate_tokens(prompt), estimate_tokens(reply)
 
 
-def translate_list_and_infer_sentiment_with_llm(values, col_desc):
+def translate_list_with_llm(values, route=FAST_ROUTE):
     """
     Example: translate Hindi strings to English.
+
+    Args:
+        values (list): Hindi strings.
+        route (str): Model route to start on ('fast' or 'strong').
+
+    Returns:
+        list: One translation per value (original value where translation failed).
     """
-    prompt = (
-        f"The following values are part of dataset that records a mentor's visit to schools during a monitoring excercise for the field whose description is:\n" 
-        f"Column Description: {col_desc} \n"
-        f"Values: {values}\n"
-        "Translate the Hindi entries in Values list to English. \n"
-        "For each entry in the list infer whether it is positive, negative, neutral or unknown. For nan values set it to unknown. \n"
-        "Output Format: JSON containing the list of translations and sentiments. \n"
-        "{'translated_value': [list of translations for each value], 'sentiment': [list of sentiment for each value]}"
-        "Do not add any additional text to the response.\n\n"
+    result, _ = _request_enrichment(
+        values,
+        fields=("translated_value",),
+        route=route
     )
-    
-    response = call_deepseek(
-        system_prompt="You are a Hindi to English translator.",
-        user_prompt=prompt
+    return result["translated_value"]
+
+
+def infer_sentiment_with_llm(values, col_desc, route=FAST_ROUTE):
+    """
+    Given a list of values, return a list of inferred sentiments.
+
+    Args:
+        values (list): List of strings (unique values from the column).
+        col_desc (str): Description of the column (to provide context).
+        route (str): Model route to start on ('fast' or 'strong').
+
+    Returns:
+        dict: {'sentiment': [list of sentiments]}
+    """
+    result, _ = _request_enrichment(
+        values,
+        fields=("sentiment",),
+        col_desc=col_desc,
+        route=route
     )
+    return result
+
+
+def translate_list_and_infer_sentiment_with_llm(values, col_desc, route=FAST_ROUTE):
+    """
+    Example: translate Hindi strings to English and infer their sentiment.
 
-    return safe_parse_llm_response(response)
\ No newline at end of file
+    Returns:
+        dict: {'translated_value': [list of translations], 'sentiment': [list of sentiments]}
+    """
+    result, _ = _request_enrichment(
+        values,
+        fields=("translated_value", "sentiment"),
+        col_desc=col_desc,
+        route=route
+    )
+    return result
@@ -1,67 +1,362 @@
+"""
+LLM Clients
+-------------------
+Provider registry and chat wrappers for OpenAI, Groq and DeepSeek.
+
+Clients are created lazily on first use (one per provider) and share a pooled
+keep-alive HTTP connection, so importing this module costs next to nothing for
+pipelines and dashboards that never call an LLM.
+
+Config (environment or .env):
+    LLM_PROVIDER            Default provider for call_llm (default: deepseek)
+    LLM_MODEL               Default model for the default provider
+    <PROVIDER>_MODEL        Default model per provider (e.g. DEEPSEEK_MODEL)
+    <PROVIDER>_API_KEY      API key per provider
+    <PROVIDER>_BASE_URL     Base URL per provider
+    LLM_BASE_URL            Overrides every base URL (e.g. the local stub server)
+    LLM_MAX_CONNECTIONS     Size of each provider's connection pool (default: 20)
+    LLM_TIMEOUT_S           Request timeout in seconds (default: 120)
+    LLM_MAX_RETRIES         Retries per call after the first attempt (default: 2)
+    LLM_RETRY_BACKOFF_S     Initial retry backoff in seconds, doubled per retry (default: 1.0)
+
+Every call is recorded by utils/llm_metrics.py (provider, model, tokens incl.
+provider prefix-cache hits, latency, retries, cache hit), and identical requests are answered from an in-process
+response cache.
+
+Batch mode (backfills): pending requests are written to a JSONL job file,
+submitted to the provider's OpenAI-compatible Batch API, polled until done and
+ingested into the response cache (and optionally a JSONL cache file), so the
+following interactive run is answered from the cache:
+
+    requests = collect_translation_and_sentiment_requests(data_df, metadata_df)
+    run_batch_job(requests, "data/interim/batch_job.jsonl", cache_path="data/interim/llm_cache.jsonl")
+    process_translation_and_sentiment(data_df, metadata_df)
+"""
+
+import hashlib
+import json
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
-from openai.types.chat import ChatCompletion
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
 
-# Load environment variables from .env file (once per session)
-load_dotenv()
+from utils.llm_metrics import llm_call_context, record_llm_call
 
-# Now your key is available to `os.getenv()`
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def call_openai(
+@dataclass(frozen=True)
+class ProviderConfig:
+    """
+    Static description of an LLM provider.
+
+    Args:
+        sdk (str): Client SDK to use ('openai' or 'groq').
+        api_key_env (str): Environment variable holding the API key.
+        base_url_env (str): Environment variable overriding the base URL.
+        default_base_url (str or None): Base URL when no override is set (None = SDK default).
+        default_model (str): Model used when none is configured.
+    """
+    sdk: str
+    api_key_env: str
+    base_url_env: str
+    default_base_url: Optional[str]
+    default_model: str
+
+
+PROVIDERS = {
+    "openai": ProviderConfig("openai", "OPENAI_API_KEY", "OPENAI_BASE_URL", None, "gpt-4"),
+    "groq": ProviderConfig("groq", "GROQ_API_KEY", "GROQ_BASE_URL", None, "mixtral-8x7b"),
+    "deepseek": ProviderConfig(
+        "openai", "DEEPSEEK_API_KEY", "DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1", "deepseek-chat"
+    ),
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+_env_loaded = False
+
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+
+# Load .env once, on first use
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+
+
+# Resolve provider and model from arguments and config
+def resolve_provider_and_model(
+    provider: Optional[str] = None,
+    model: Optional[str] = None
+) -> tuple[str, str]:
+    """
+    Resolve which provider and model a call should use.
+
+    Precedence: explicit argument > <PROVIDER>_MODEL > LLM_MODEL (default provider only)
+    > the provider's default model.
+
+    Returns:
+        tuple[str, str]: (provider, model)
+    """
+    _load_env()
+    default_provider = os.getenv("LLM_PROVIDER", "deepseek").lower()
+    provider = (provider or default_provider).lower()
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{provider}'. Known: {sorted(PROVIDERS)}")
+
+    if model is None:
+        model = os.getenv(f"{provider.upper()}_MODEL")
+    if model is None and provider == default_provider:
+        model = os.getenv("LLM_MODEL")
+    return provider, model or PROVIDERS[provider].default_model
+
+
+# Build (or reuse) the client for a provider
+def get_client(provider: str):
+    """
+    Return the client for `provider`, creating it on first use.
+
+    Each client owns one pooled keep-alive httpx connection pool that is reused
+    across calls and threads.
+
+    Args:
+        provider (str): One of PROVIDERS.
+
+    Returns:
+        OpenAI or Groq client.
+    """
+    client = _clients.get(provider)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(provider)
+        if client is not None:
+            return client
+
+        _load_env()
+        config = PROVIDERS[provider]
+        import httpx
+
+        max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=float(os.getenv("LLM_TIMEOUT_S", "120")),
+        )
+        base_url = (
+            os.getenv("LLM_BASE_URL")
+            or os.getenv(config.base_url_env)
+            or config.default_base_url
+        )
+
+        if config.sdk == "groq":
+            from groq import Groq
+
+            client = Groq(
+                api_key=os.getenv(config.api_key_env),
+                base_url=base_url,
+                http_client=http_client,
+                max_retries=0,  # retries are counted in call_llm
+            )
+        else:
+            from openai import OpenAI
+
+            client = OpenAI(
+                api_key=os.getenv(config.api_key_env),
+                base_url=base_url,
+                http_client=http_client,
+                max_retries=0,  # retries are counted in call_llm
+            )
+
+        _clients[provider] = client
+        return client
+
+
+# Drop cached clients (e.g. after changing LLM_BASE_URL)
+def reset_llm_clients():
+    """
+    Close and forget every cached client; the next call recreates them from config.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _clients.clear()
+
+
+# Forget cached responses
+def clear_llm_cache():
+    """
+    Empty the in-process response cache.
+    """
+    with _response_cache_lock:
+        _response_cache.clear()
+
+
+def _cache_key(provider, model, temperature, response_format, system_prompt, user_prompt) -> str:
+    payload = json.dumps(
+        [provider, model, temperature, response_format, system_prompt, user_prompt],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Prompt tokens served from the provider's prefix cache
+def _cached_prompt_tokens(usage) -> int:
+    """
+    Cached prompt tokens from a usage object or dict: OpenAI reports
+    prompt_tokens_details.cached_tokens, DeepSeek prompt_cache_hit_tokens.
+    """
+    if usage is None:
+        return 0
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details") or {}
+        return int(details.get("cached_tokens") or usage.get("prompt_cache_hit_tokens") or 0)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    return int(cached or getattr(usage, "prompt_cache_hit_tokens", 0) or 0)
+
+
+# Provider-agnostic chat call
+def call_llm(
     system_prompt: str,
     user_prompt: str,
-    model: str = "gpt-4",
-    temperature: float = 0.2
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: float = 0.2,
+    response_format: dict | None = None,
+    max_retries: int | None = None,
+    use_cache: bool = True,
+    cache_if: Optional[Callable[[str], bool]] = None
 ) -> str:
     """
-    Wrapper to call OpenAI Chat API (new SDK) with system and user prompts.
+    Call a chat completion API with system and user prompts.
 
     Args:
         system_prompt (str): Instruction to the assistant.
         user_prompt (str): Task or input message from user.
-        model (str): OpenAI model to use (default: gpt-4).
+        provider (str or None): 'openai', 'groq' or 'deepseek' (default: LLM_PROVIDER).
+        model (str or None): Model to use (default: from config, see module docstring).
         temperature (float): Randomness in output (0 = deterministic).
+        response_format (dict or None): e.g. {"type": "json_object"} for JSON mode.
+        max_retries (int or None): Retries after a failed attempt (default: LLM_MAX_RETRIES).
+        use_cache (bool): Answer identical requests from the response cache.
+        cache_if (callable or None): Check of a reply (e.g. parse and validate); a
+            reply failing it is neither cached nor served from the cache, so a
+            retry of a malformed reply reaches the model again.
 
     Returns:
-        str: Text content from the assistant's reply.
+        str: Text content from the assistant's reply ("" on error).
     """
+    started = time.perf_counter()
     try:
-        response: ChatCompletion = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature
-        )
-        return response.choices[0].message.content.strip()
-    
-    except Exception as e:
-        print(f"[OpenAI API Error] {e}")
+        provider, model = resolve_provider_and_model(provider, model)
+    except ValueError as e:
+        print(f"[LLM API Error] {e}")
         return ""
 
+    key = _cache_key(provider, model, temperature, response_format, system_prompt, user_prompt)
+    if use_cache:
+        with _response_cache_lock:
+            cached = _response_cache.get(key)
+            if cached is not None and cache_if is not None and not cache_if(cached):
+                # E.g. a malformed reply ingested from a batch job
+                del _response_cache[key]
+                cached = None
+        if cached is not None:
+            record_llm_call(
+                provider, model, latency_ms=(time.perf_counter() - started) * 1000.0, cache_hit=True
+            )
+            return cached
 
+    if max_retries is None:
+        max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    backoff_s = float(os.getenv("LLM_RETRY_BACKOFF_S", "1.0"))
 
-# call_GROW_API function
+    last_error = None
+    for attempt in range(max_retries + 1):
+        try:
+            response = get_client(provider).chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                **({"response_format": response_format} if response_format else {})
+            )
+            content = response.choices[0].message.content.strip()
+            usage = response.usage
+            record_llm_call(
+                provider,
+                model,
+                prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+                latency_ms=(time.perf_counter() - started) * 1000.0,
+                retries=attempt,
+                cached_tokens=_cached_prompt_tokens(usage),
+            )
+            if use_cache and content and (cache_if is None or cache_if(content)):
+                with _response_cache_lock:
+                    _response_cache[key] = content
+            return content
 
-import os
-from dotenv import load_dotenv
-from groq import Groq
-from groq.types.chat import ChatCompletion
+        except Exception as e:
+            last_error = e
+            if attempt < max_retries:
+                time.sleep(backoff_s * 2 ** attempt)
 
-# Load environment variables from .env
-load_dotenv()
+    print(f"[{provider} API Error] {last_error}")
+    record_llm_call(
+        provider,
+        model,
+        latency_ms=(time.perf_counter() - started) * 1000.0,
+        retries=max_retries,
+        success=False,
+    )
+    return ""
+
+
+def call_openai(
+    system_prompt: str,
+    user_prompt: str,
+    model: str | None = None,
+    temperature: float = 0.2,
+    response_format: dict | None = None
+) -> str:
+    """
+    Wrapper to call OpenAI Chat API (new SDK) with system and user prompts.
+
+    Args:
+        system_prompt (str): Instruction to the assistant.
+        user_prompt (str): Task or input message from user.
+        model (str or None): OpenAI model to use (default: OPENAI_MODEL or gpt-4).
+        temperature (float): Randomness in output (0 = deterministic).
+        response_format (dict or None): e.g. {"type": "json_object"} for JSON mode.
+
+    Returns:
+        str: Text content from the assistant's reply.
+    """
+    return call_llm(system_prompt, user_prompt, "openai", model, temperature, response_format)
 
-# Initialize Groq client with your API key
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
 def call_groq(
     system_prompt: str,
     user_prompt: str,
-    model: str = "mixtral-8x7b",
-    temperature: float = 0.2
+    model: str | None = None,
+    temperature: float = 0.2,
+    response_format: dict | None = None
 ) -> str:
     """
     Wrapper to call Groq (Mixtral) Chat API.
@@ -69,49 +364,22 @@ def call_groq(
     Args:
         system_prompt (str): System instruction.
         user_prompt (str): User prompt text.
-        model (str): Model to use (default: Mixtral).
+        model (str or None): Model to use (default: GROQ_MODEL or Mixtral).
         temperature (float): Randomness in output.
+        response_format (dict or None): e.g. {"type": "json_object"} for JSON mode.
 
     Returns:
         str: The content of the assistant's reply.
     """
-    try:
-        response: ChatCompletion = groq_client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature
-        )
-        return response.choices[0].message.content.strip()
-    
-    except Exception as e:
-        print(f"[Groq API Error] {e}")
-        return ""
-
-# Call Deepseek API
-
-# utils/deepseek_utils.py
-
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load your DeepSeek API key from .env
-load_dotenv()
+    return call_llm(system_prompt, user_prompt, "groq", model, temperature, response_format)
 
-# Initialize DeepSeek client
-deepseek_client = OpenAI(
-    api_key=os.getenv("DEEPSEEK_API_KEY"),
-    base_url="https://api.deepseek.com/v1"
-)
 
 def call_deepseek(
     system_prompt: str,
     user_prompt: str,
-    model: str = "deepseek-chat",
-    temperature: float = 0.2
+    model: str | None = None,
+    temperature: float = 0.2,
+    response_format: dict | None = None
 ) -> str:
     """
     Wrapper to call DeepSeek Chat API with system and user prompts.
@@ -119,22 +387,273 @@ def call_deepseek(
     Args:
         system_prompt (str): Instruction to the assistant.
         user_prompt (str): Task or input message from user.
-        model (str): DeepSeek model to use (default: deepseek-chat).
+        model (str or None): DeepSeek model to use (default: DEEPSEEK_MODEL or deepseek-chat).
         temperature (float): Randomness in output.
+        response_format (dict or None): e.g. {"type": "json_object"} for JSON mode.
 
     Returns:
         str: Text content from the assistant's reply.
     """
-    try:
-        response = deepseek_client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"[DeepSeek API Error] {e}")
-        return ""
\ No newline at end of file
+    return call_llm(system_prompt, user_prompt, "deepseek", model, temperature, response_format)
+
+
+# ---------------------------------------------------------------------------
+# Batch jobs
+# ---------------------------------------------------------------------------
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_DONE_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    """
+    One chat request of a batch job. `custom_id` is the response-cache key, so an
+    ingested result answers the identical interactive call.
+    """
+    custom_id: str
+    provider: str
+    model: str
+    system_prompt: str
+    user_prompt: str
+    temperature: float = 0.2
+    response_format: Optional[dict] = None
+
+
+# Describe a chat call as a batch request
+def make_batch_request(
+    system_prompt: str,
+    user_prompt: str,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: float = 0.2,
+    response_format: dict | None = None
+) -> BatchRequest:
+    """
+    Build the BatchRequest equivalent of call_llm() with the same arguments.
+    """
+    provider, model = resolve_provider_and_model(provider, model)
+    return BatchRequest(
+        custom_id=_cache_key(provider, model, temperature, response_format, system_prompt, user_prompt),
+        provider=provider,
+        model=model,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        temperature=temperature,
+        response_format=response_format,
+    )
+
+
+# Write requests as an OpenAI Batch API input file
+def write_batch_job_file(requests: list, path: str) -> int:
+    """
+    Write requests (de-duplicated by custom_id) as a JSONL batch input file.
+
+    Returns:
+        int: Number of requests written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    seen = set()
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            if request.custom_id in seen:
+                continue
+            seen.add(request.custom_id)
+            body = {
+                "model": request.model,
+                "messages": [
+                    {"role": "system", "content": request.system_prompt},
+                    {"role": "user", "content": request.user_prompt},
+                ],
+                "temperature": request.temperature,
+            }
+            if request.response_format:
+                body["response_format"] = request.response_format
+            line = {"custom_id": request.custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return len(seen)
+
+
+# Upload a job file and start the batch
+def submit_batch_job(path: str, provider: Optional[str] = None) -> str:
+    """
+    Upload a JSONL job file and create a batch on `provider`.
+
+    Returns:
+        str: Batch id.
+    """
+    provider, _ = resolve_provider_and_model(provider)
+    client = get_client(provider)
+    with open(path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+# Poll a batch until it finishes
+def wait_for_batch(
+    batch_id: str,
+    provider: Optional[str] = None,
+    poll_interval_s: float = 30.0,
+    timeout_s: Optional[float] = None,
+    verbose: bool = False
+):
+    """
+    Poll a batch until its status is completed, failed, expired or cancelled.
+
+    Raises:
+        TimeoutError: If `timeout_s` elapses first.
+
+    Returns:
+        Batch: The final batch object.
+    """
+    provider, _ = resolve_provider_and_model(provider)
+    client = get_client(provider)
+    started = time.monotonic()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if verbose:
+            counts = batch.request_counts
+            done = f" ({counts.completed}/{counts.total})" if counts else ""
+            print(f"[⏳] Batch {batch_id}: {batch.status}{done}")
+        if batch.status in BATCH_DONE_STATUSES:
+            return batch
+        if timeout_s is not None and time.monotonic() - started > timeout_s:
+            raise TimeoutError(f"Batch {batch_id} still '{batch.status}' after {timeout_s}s")
+        time.sleep(poll_interval_s)
+
+
+# Put batch results into the response cache
+def ingest_batch_results(batch, provider: Optional[str] = None, cache_path: Optional[str] = None) -> int:
+    """
+    Download a finished batch's output and add every successful reply to the
+    response cache (keyed by custom_id). Token usage is recorded in
+    utils/llm_metrics.py under route 'batch'.
+
+    Args:
+        batch: Batch object returned by wait_for_batch().
+        provider (str or None): Provider the batch ran on.
+        cache_path (str or None): Also append the replies to this JSONL cache file
+            (reload later with load_llm_cache_file).
+
+    Returns:
+        int: Number of replies ingested.
+    """
+    provider, _ = resolve_provider_and_model(provider)
+    if not batch.output_file_id:
+        return 0
+    client = get_client(provider)
+    output = client.files.content(batch.output_file_id).text
+
+    entries = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if result.get("error") or response.get("status_code") != 200:
+            continue
+        body = response.get("body") or {}
+        content = (body.get("choices") or [{}])[0].get("message", {}).get("content", "").strip()
+        if not content:
+            continue
+        entries.append({"custom_id": result["custom_id"], "content": content})
+
+        usage = body.get("usage") or {}
+        with llm_call_context(route="batch"):
+            record_llm_call(
+                provider,
+                body.get("model", ""),
+                prompt_tokens=usage.get("prompt_tokens", 0) or 0,
+                completion_tokens=usage.get("completion_tokens", 0) or 0,
+                cached_tokens=_cached_prompt_tokens(usage),
+            )
+
+    with _response_cache_lock:
+        for entry in entries:
+            _response_cache[entry["custom_id"]] = entry["content"]
+
+    if cache_path and entries:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        with open(cache_path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return len(entries)
+
+
+# Reload ingested replies from a JSONL cache file
+def load_llm_cache_file(cache_path: str) -> int:
+    """
+    Load replies written by ingest_batch_results(cache_path=...) into the response cache.
+
+    Returns:
+        int: Number of replies loaded.
+    """
+    if not os.path.exists(cache_path):
+        return 0
+    loaded = 0
+    with open(cache_path, encoding="utf-8") as f, _response_cache_lock:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                _response_cache[entry["custom_id"]] = entry["content"]
+                loaded += 1
+    return loaded
+
+
+# Write, submit, wait and ingest in one go
+def run_batch_job(
+    requests: list,
+    job_path: str,
+    poll_interval_s: float = 30.0,
+    timeout_s: Optional[float] = None,
+    cache_path: Optional[str] = None,
+    verbose: bool = True
+) -> dict:
+    """
+    Run `requests` as batch jobs (one per provider) and ingest the results.
+
+    Requests already answered by the response cache are left out.
+
+    Args:
+        requests (list of BatchRequest): e.g. from collect_translation_and_sentiment_requests().
+        job_path (str): JSONL job file; the provider name is appended per job.
+        poll_interval_s (float): Seconds between status checks.
+        timeout_s (float or None): Give up waiting after this many seconds.
+        cache_path (str or None): JSONL cache file for the ingested replies.
+        verbose (bool): Print progress.
+
+    Returns:
+        dict: {provider: {"batch_id", "status", "requests", "ingested"}}
+    """
+    with _response_cache_lock:
+        pending = [r for r in requests if r.custom_id not in _response_cache]
+
+    by_provider = {}
+    for request in pending:
+        by_provider.setdefault(request.provider, []).append(request)
+
+    summary = {}
+    for provider, provider_requests in by_provider.items():
+        root, ext = os.path.splitext(job_path)
+        path = f"{root}_{provider}{ext or '.jsonl'}"
+        n_requests = write_batch_job_file(provider_requests, path)
+        batch_id = submit_batch_job(path, provider)
+        if verbose:
+            print(f"[📦] Submitted {n_requests} requests to {provider} as batch {batch_id} ({path}).")
+
+        batch = wait_for_batch(batch_id, provider, poll_interval_s, timeout_s, verbose=verbose)
+        ingested = ingest_batch_results(batch, provider, cache_path) if batch.status == "completed" else 0
+        if verbose:
+            print(f"[✅] Batch {batch_id} {batch.status}: ingested {ingested} of {n_requests} replies.")
+        summary[provider] = {
+            "batch_id": batch_id,
+            "status": batch.status,
+            "requests": n_requests,
+            "ingested": ingested,
+        }
+    return summary
@@ -0,0 +1,306 @@
+"""
+Load Statistics
+-------------------
+Column statistics kept per data load (e.g. one month of visits), so that
+dataset-level metadata stays current without profiling the data loaded before.
+
+`record_load_stats` computes the mergeable statistics of one load
+(utils/profiling_utils.py:ColumnStats: non-null count, value frequencies up to
+max_values, a HyperLogLog distinct sketch beyond, min / max, text lengths and
+options) and stores them in DuckDB along with a running total per column of the
+dataset:
+
+    load_column_stats(dataset, load_id, column_name, n_rows, stats_json, saved_at)
+    dataset_column_stats(dataset, column_name, n_loads, n_rows, stats_json, saved_at)
+
+A new load is merged into the totals, so recording it costs a profile of that
+load and one merge per column, however many loads came before. Recording a
+load_id again replaces it and rebuilds the totals from every load (a sketch
+cannot subtract the old version).
+
+`dataset_profile` returns the totals as a profile (the dict of profile_columns)
+and `refresh_metadata_from_stats` refills count, is_categorical and
+category_values from it:
+
+    profile = record_load_stats(month_df, load_id="2024-05")
+    store = refresh_metadata_from_stats(store, profile)
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from utils.metadata_store import as_metadata_store, metadata_like
+from utils.metadata_utils import (
+    fill_count_metadata,
+    fill_is_categorical_metadata,
+    fill_category_values_metadata
+)
+from utils.profiling_utils import ColumnStats, collect_column_stats, DEFAULT_MAX_VALUES, DEFAULT_TOP_K
+from utils.sketches import DEFAULT_CHUNK_SIZE
+
+# Default DuckDB file for load statistics (override with COLUMN_STATS_DB)
+DEFAULT_STATS_DB = "data/interim/column_stats.duckdb"
+LOAD_STATS_TABLE = "load_column_stats"
+DATASET_STATS_TABLE = "dataset_column_stats"
+LOAD_COLUMNS = ["dataset", "load_id", "column_name", "n_rows", "stats_json", "saved_at"]
+DATASET_COLUMNS = ["dataset", "column_name", "n_loads", "n_rows", "stats_json", "saved_at"]
+# Metadata fields refilled by refresh_metadata_from_stats
+REFRESHED_FIELDS = ("count", "is_categorical", "category_values")
+
+
+def _encode(value):
+    # JSON encoding of values JSON has no type for (tagged so _decode restores them)
+    if isinstance(value, pd.Timestamp):
+        return {"$ts": value.isoformat()}
+    if isinstance(value, pd.Timedelta):
+        return {"$td": value.value}
+    if isinstance(value, bytes):
+        return {"$b64": base64.b64encode(value).decode("ascii")}
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _decode(obj: dict):
+    if "$ts" in obj:
+        return pd.Timestamp(obj["$ts"])
+    if "$td" in obj:
+        return pd.Timedelta(obj["$td"])
+    if "$b64" in obj:
+        return base64.b64decode(obj["$b64"])
+    return obj
+
+
+def _dumps(stats: ColumnStats) -> str:
+    return json.dumps(stats.to_dict(), ensure_ascii=False, default=_encode)
+
+
+def _loads(stats_json: str) -> ColumnStats:
+    return ColumnStats.from_dict(json.loads(stats_json, object_hook=_decode))
+
+
+def _connect(db_path: Optional[str] = None):
+    import duckdb
+
+    db_path = db_path or os.getenv("COLUMN_STATS_DB", DEFAULT_STATS_DB)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    con = duckdb.connect(db_path)
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {LOAD_STATS_TABLE} (
+            dataset VARCHAR,
+            load_id VARCHAR,
+            column_name VARCHAR,
+            n_rows BIGINT,
+            stats_json VARCHAR,
+            saved_at TIMESTAMP,
+            PRIMARY KEY (dataset, load_id, column_name)
+        )
+    """)
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DATASET_STATS_TABLE} (
+            dataset VARCHAR,
+            column_name VARCHAR,
+            n_loads INTEGER,
+            n_rows BIGINT,
+            stats_json VARCHAR,
+            saved_at TIMESTAMP,
+            PRIMARY KEY (dataset, column_name)
+        )
+    """)
+    return con
+
+
+def _insert_rows(con, table: str, rows: list, columns: list, replace: bool = False):
+    # Bulk insert through a registered DataFrame (much faster than executemany)
+    rows_df = pd.DataFrame(rows, columns=columns)
+    con.register("stats_rows_df", rows_df)
+    try:
+        con.execute(f"INSERT {'OR REPLACE ' if replace else ''}INTO {table} BY NAME SELECT * FROM stats_rows_df")
+    finally:
+        con.unregister("stats_rows_df")
+
+
+def _rebuild_totals(con, dataset: str) -> dict:
+    # {column_name: [ColumnStats, n_loads, n_rows]} merged from every load of the dataset (stored totals are cleared)
+    totals = {}
+    rows = con.execute(
+        f"SELECT column_name, n_rows, stats_json FROM {LOAD_STATS_TABLE} "
+        f"WHERE dataset = ? ORDER BY saved_at, load_id",
+        [dataset]
+    ).fetchall()
+    for col, n_rows, stats_json in rows:
+        stats = _loads(stats_json)
+        if col in totals:
+            total = totals[col]
+            total[0].merge(stats)
+            total[1] += 1
+            total[2] += n_rows
+        else:
+            totals[col] = [stats, 1, n_rows]
+    con.execute(f"DELETE FROM {DATASET_STATS_TABLE} WHERE dataset = ?", [dataset])
+    return totals
+
+
+# Profile a data load and merge it into the dataset statistics
+def record_load_stats(
+    data_df: pd.DataFrame,
+    load_id: str,
+    dataset: str = "ss_data",
+    db_path: Optional[str] = None,
+    columns=None,
+    max_values: int = DEFAULT_MAX_VALUES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = 1,
+    top_k: int = DEFAULT_TOP_K,
+    verbose: bool = False
+) -> dict:
+    """
+    Store the column statistics of one load and update the dataset totals.
+
+    Args:
+        data_df (pd.DataFrame): Rows of this load only (cleaned, typed).
+        load_id (str): Load identifier (e.g. '2024-05'); recording it again replaces it.
+        dataset (str): Dataset the load belongs to.
+        db_path (str or None): DuckDB file (default COLUMN_STATS_DB or data/interim/column_stats.duckdb).
+        columns (list or None): Columns to profile (default: all).
+        max_values, chunk_size, max_workers: As in profile_columns. Keep max_values
+            the same for every load of a dataset.
+        top_k (int): Most frequent values kept in the returned profile.
+        verbose (bool): Print what was recorded.
+
+    Returns:
+        dict: Dataset-level profile (see dataset_profile) of every recorded column.
+    """
+    stats = collect_column_stats(data_df, columns, max_values, chunk_size, max_workers)
+    now = datetime.now()
+    load_rows = [(dataset, load_id, col, len(data_df), _dumps(s), now) for col, s in stats.items()]
+
+    con = _connect(db_path)
+    try:
+        replaced = con.execute(
+            f"SELECT count(*) FROM {LOAD_STATS_TABLE} WHERE dataset = ? AND load_id = ?", [dataset, load_id]
+        ).fetchone()[0] > 0
+        con.execute("BEGIN TRANSACTION")
+        try:
+            if replaced:
+                con.execute(f"DELETE FROM {LOAD_STATS_TABLE} WHERE dataset = ? AND load_id = ?", [dataset, load_id])
+            _insert_rows(con, LOAD_STATS_TABLE, load_rows, LOAD_COLUMNS)
+
+            if replaced:
+                totals = _rebuild_totals(con, dataset)
+            else:
+                # Only the totals of this load's columns change
+                totals = {}
+                for col, n_loads, n_rows, stats_json in con.execute(
+                    f"SELECT column_name, n_loads, n_rows, stats_json FROM {DATASET_STATS_TABLE} WHERE dataset = ?",
+                    [dataset]
+                ).fetchall():
+                    if col in stats:
+                        totals[col] = [_loads(stats_json), n_loads, n_rows]
+                for col, column_stats in stats.items():
+                    if col in totals:
+                        total = totals[col]
+                        total[0].merge(column_stats)
+                        total[1] += 1
+                        total[2] += len(data_df)
+                    else:
+                        totals[col] = [column_stats, 1, len(data_df)]
+
+            _insert_rows(
+                con, DATASET_STATS_TABLE,
+                [(dataset, col, n_loads, n_rows, _dumps(s), now) for col, (s, n_loads, n_rows) in totals.items()],
+                DATASET_COLUMNS, replace=True
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+    finally:
+        con.close()
+
+    if verbose:
+        action = "Replaced" if replaced else "Recorded"
+        print(f"[📊] {action} load '{load_id}' of '{dataset}': {len(stats)} columns, {len(data_df)} rows.")
+    return dataset_profile(dataset, db_path, top_k=top_k)
+
+
+# Dataset-level profile from the stored totals
+def dataset_profile(
+    dataset: str = "ss_data",
+    db_path: Optional[str] = None,
+    columns=None,
+    top_k: int = DEFAULT_TOP_K
+) -> dict:
+    """
+    Profile of every load of `dataset` merged, in the format of profile_columns
+    (pass it as `profile=` to the fill_* functions). Counts, min / max and value
+    lists are those of the concatenated loads; distinct estimates past max_values
+    are those of a single pass, while their top_values are approximate.
+
+    Returns:
+        dict: {column_name: profile dict}, by column name.
+    """
+    con = _connect(db_path)
+    try:
+        rows = con.execute(
+            f"SELECT column_name, stats_json FROM {DATASET_STATS_TABLE} WHERE dataset = ? ORDER BY column_name",
+            [dataset]
+        ).fetchall()
+    finally:
+        con.close()
+    return {
+        col: _loads(stats_json).profile(top_k)
+        for col, stats_json in rows
+        if columns is None or col in columns
+    }
+
+
+# Refill count and category metadata from a profile
+def refresh_metadata_from_stats(
+    metadata_df,
+    profile: dict,
+    columns=None,
+    unique_threshold: int = 50,
+    data_df: Optional[pd.DataFrame] = None,
+    verbose: bool = False
+):
+    """
+    Overwrite count, is_categorical and category_values of the profiled columns
+    with the values of `profile` (e.g. dataset_profile after a new load). Other
+    metadata is left as it is.
+
+    Args:
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
+        profile (dict): Dataset-level profile.
+        columns (list or None): Columns to refresh (default: every profiled column).
+        unique_threshold (int): As in fill_is_categorical_metadata.
+        data_df (pd.DataFrame or None): Full data, only read for columns the profile
+            cannot settle (a unique_threshold above the stats' max_values, near an
+            estimated count); without it they raise ValueError.
+        verbose (bool): Print the number of refreshed columns.
+
+    Returns:
+        Updated metadata (same type as metadata_df).
+    """
+    store = as_metadata_store(metadata_df)
+    columns = [col for col in (profile if columns is None else columns) if col in profile and col in store]
+    if not columns:
+        return metadata_like(store, metadata_df)
+
+    for col in columns:
+        for field in REFRESHED_FIELDS:
+            if field in store.fields:
+                store.set(col, field, None)
+
+    store = fill_count_metadata(data_df, store, columns, profile=profile)
+    store, unique_values_dict = fill_is_categorical_metadata(data_df, store, columns, unique_threshold, profile=profile)
+    store = fill_category_values_metadata(data_df, store, unique_values_dict, columns)
+
+    if verbose:
+        print(f"[🔄] Refreshed {', '.join(REFRESHED_FIELDS)} of {len(columns)} columns from load statistics.")
+    return metadata_like(store, metadata_df)
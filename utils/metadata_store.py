@@ -0,0 +1,188 @@
+"""
+Metadata Store
+-------------------
+Metadata table indexed by column_name.
+
+Pipelines used to find a column's metadata with
+`metadata_df.loc[metadata_df["column_name"] == col, field]`, a full scan per
+lookup, which makes filling metadata O(columns²) on wide schemas. MetadataStore
+keeps one record per column in a dict, so get/set are O(1); `to_frame` and
+`to_duckdb` export it back in bulk.
+
+The fill_* functions in utils/metadata_utils.py and the enrichment functions
+accept either a metadata DataFrame or a MetadataStore and return the same type
+(`as_metadata_store` / `metadata_like`). Pipelines convert once, pass the store
+through every step and export at the end.
+"""
+
+import pandas as pd
+
+
+def _is_blank(value) -> bool:
+    if value is None:
+        return True
+    try:
+        if pd.isna(value):
+            return True
+    except (TypeError, ValueError):
+        return False
+    return str(value).strip().lower() in ("", "nan")
+
+
+class MetadataStore:
+    """
+    Column metadata keyed by column_name: one dict record per column, in table order.
+    """
+
+    __slots__ = ("_rows", "_fields")
+
+    def __init__(self, rows=None, fields=None):
+        self._rows = {}
+        self._fields = list(fields or ["column_name"])
+        for row in rows or []:
+            self.add_row(row)
+
+    @classmethod
+    def from_frame(cls, metadata_df: pd.DataFrame) -> "MetadataStore":
+        """
+        Build a store from a metadata DataFrame.
+
+        Raises:
+            ValueError: If a column_name appears more than once (which row is
+                meant cannot be guessed, and dropping one would lose metadata).
+        """
+        names = metadata_df["column_name"]
+        duplicated = names[names.duplicated()]
+        if len(duplicated):
+            raise ValueError(f"Duplicate column_name in metadata: {sorted(set(map(str, duplicated)))}")
+        return cls(metadata_df.to_dict("records"), fields=metadata_df.columns.tolist())
+
+    @classmethod
+    def from_duckdb(cls, con, table: str) -> "MetadataStore":
+        """
+        Build a store from a DuckDB metadata table.
+        """
+        return cls.from_frame(con.execute(f'SELECT * FROM "{table}"').fetchdf())
+
+    def __contains__(self, col) -> bool:
+        return col in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(list(self._rows))
+
+    @property
+    def column_names(self) -> list:
+        return list(self._rows)
+
+    @property
+    def fields(self) -> list:
+        return list(self._fields)
+
+    def get(self, col: str, field: str, default=None):
+        """
+        Value of `field` for column `col` (KeyError if the column is unknown).
+        """
+        return self._rows[col].get(field, default)
+
+    def set(self, col: str, field: str, value):
+        """
+        Set `field` of column `col`; a new field is added to every record.
+        """
+        row = self._rows[col]
+        if field not in self._fields:
+            self.add_field(field)
+        row[field] = value
+
+    def is_blank(self, col: str, field: str) -> bool:
+        """
+        True if the value is missing, NaN, "" or "nan" (the repo's "not filled yet").
+        """
+        return _is_blank(self._rows[col].get(field))
+
+    def is_true(self, col: str, field: str) -> bool:
+        """
+        True if the value reads as "true" (flags are stored as "True"/"False" strings).
+        """
+        return str(self._rows[col].get(field)).strip().lower() == "true"
+
+    def where_true(self, field: str) -> list:
+        """
+        Column names whose `field` flag is true.
+        """
+        return [col for col in self._rows if self.is_true(col, field)]
+
+    def row(self, col: str) -> dict:
+        """
+        Copy of the record of column `col`.
+        """
+        return dict(self._rows[col])
+
+    def add_field(self, field: str, default=float("nan")):
+        """
+        Add a field to every record (no-op if it exists).
+        """
+        if field in self._fields:
+            return
+        self._fields.append(field)
+        for row in self._rows.values():
+            row.setdefault(field, default)
+
+    def add_row(self, values: dict):
+        """
+        Add (or replace) the record of values["column_name"].
+        """
+        for field in values:
+            if field not in self._fields:
+                self.add_field(field)
+        row = {field: float("nan") for field in self._fields}
+        row.update(values)
+        self._rows[values["column_name"]] = row
+
+    def copy_row(self, col: str, new_col: str, **overrides):
+        """
+        Add a record for `new_col` copied from `col`, with `overrides` applied
+        (e.g. the metadata of a derived sentiment column).
+        """
+        self.add_row({**self._rows[col], **overrides, "column_name": new_col})
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Export to a metadata DataFrame (one row per column, in table order).
+        """
+        return pd.DataFrame.from_records(list(self._rows.values()), columns=self._fields)
+
+    def to_duckdb(self, con, table: str) -> int:
+        """
+        Write the store to a DuckDB table, replacing it.
+
+        Returns:
+            int: Number of rows written.
+        """
+        metadata_df = self.to_frame()
+        con.register("metadata_store_df", metadata_df)
+        try:
+            con.execute(f'CREATE OR REPLACE TABLE "{table}" AS SELECT * FROM metadata_store_df')
+        finally:
+            con.unregister("metadata_store_df")
+        return len(metadata_df)
+
+
+# Accept a metadata DataFrame or a MetadataStore
+def as_metadata_store(metadata) -> MetadataStore:
+    """
+    Return `metadata` itself if it is a MetadataStore, else a store built from the DataFrame.
+    """
+    if isinstance(metadata, MetadataStore):
+        return metadata
+    return MetadataStore.from_frame(metadata)
+
+
+# Return metadata in the type the caller passed in
+def metadata_like(store: MetadataStore, original):
+    """
+    Return `store` if the caller passed a MetadataStore, else store.to_frame().
+    """
+    return store if isinstance(original, MetadataStore) else store.to_frame()
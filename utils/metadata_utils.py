@@ -2,10 +2,25 @@
 Metadata Utilities
 -------------------
 Functions to fill and update metadata columns in the metadata DataFrame.
+
+Every fill_* function accepts the metadata as a DataFrame or as a MetadataStore
+(utils/metadata_store.py) and returns the same type; pass a store through a
+sequence of fill_* calls to avoid re-indexing the table in each of them.
+
+The functions that read the data (data_type, count, is_identifier,
+is_multi_select, is_categorical, is_free_text, polarity) also accept `profile`, the output
+of profile_columns (utils/profiling_utils.py): profiled columns are filled from
+their statistics instead of being scanned again. Distinct counts that the profile
+only estimated (high-cardinality columns) are used when they are clearly on one
+side of the threshold at stake; otherwise the column is counted exactly.
 """
 
 import pandas as pd
 from typing import Optional, List, Dict, Union
+from utils.metadata_store import as_metadata_store, metadata_like
+from utils.multi_select import MULTI_SELECT_SEPARATOR, split_multi_select
+from utils.sentiment_rules import is_yes_no_answers, question_polarity
+from utils.sketches import count_distinct
 
 # _original_column_name_method helper function - to be designed for other usecases
 def _original_column_name_method(column_name: str) -> str:
@@ -25,20 +40,17 @@ def fill_original_column_name_metadata(
     If already filled, skip.
     If empty, use _original_column_name_method.
     """
-    cols_to_process = columns or metadata_df["column_name"].tolist()
+    store = as_metadata_store(metadata_df)
+    cols_to_process = columns or store.column_names
 
     for col in cols_to_process:
-        current_val = metadata_df.loc[
-            metadata_df["column_name"] == col, "original_column_name"
-        ].values[0]
+        current_val = store.get(col, "original_column_name")
 
         if pd.isna(current_val) or current_val == "":
             orig_name = _original_column_name_method(col)
-            metadata_df.loc[
-                metadata_df["column_name"] == col, "original_column_name"
-            ] = orig_name
+            store.set(col, "original_column_name", orig_name)
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
 # _desc_en_filler helper function - to be designed for other usecases
 def _desc_en_method(column_name: str) -> str:
@@ -48,6 +60,17 @@ def _desc_en_method(column_name: str) -> str:
     """
     return "Description to be added later"
 
+
+def _column_profile(profile, col):
+    # Profile of `col`, or None to compute from the data
+    return profile.get(col) if profile else None
+
+
+def _estimate_range(value, error):
+    # (low, high) bounds of a profiled count: three standard errors around an estimate
+    margin = 3 * error * value
+    return value - margin, value + margin
+
 # Fill desc_en metadata
 def fill_desc_en_metadata(
     metadata_df: pd.DataFrame,
@@ -58,30 +81,28 @@ def fill_desc_en_metadata(
     If already filled, skip.
     If empty, use _desc_en_method.
     """
-    cols_to_process = columns or metadata_df["column_name"].tolist()
+    store = as_metadata_store(metadata_df)
+    cols_to_process = columns or store.column_names
 
     for col in cols_to_process:
-        current_val = metadata_df.loc[
-            metadata_df["column_name"] == col, "desc_en"
-        ].values[0]
+        current_val = store.get(col, "desc_en")
 
         if pd.isna(current_val) or current_val == "":
             description = _desc_en_method(col)
-            metadata_df.loc[
-                metadata_df["column_name"] == col, "desc_en"
-            ] = description
+            store.set(col, "desc_en", description)
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
 # Fill data_type metadata
 def fill_data_type_metadata(
     data_df: pd.DataFrame,
     metadata_df: pd.DataFrame,
-    columns: Optional[Union[str, List[str]]] = None
+    columns: Optional[Union[str, List[str]]] = None,
+    profile: Optional[Dict[str, dict]] = None
 ) -> pd.DataFrame:
     """
-    Fill 'data_type' column in metadata_df by inferring from data_df dtypes.
-    Only fills empty cells.
+    Fill 'data_type' column in metadata_df by inferring from data_df dtypes
+    (or the profiled dtypes). Only fills empty cells.
     """
     if columns is None or (isinstance(columns, list) and len(columns) == 0):
         target_cols = data_df.columns.tolist()
@@ -90,16 +111,17 @@ def fill_data_type_metadata(
     else:
         target_cols = columns
 
+    store = as_metadata_store(metadata_df)
     for col in target_cols:
-        if 'data_type' not in metadata_df.columns:
+        if 'data_type' not in store.fields:
             raise ValueError("'data_type' column does not exist in metadata_df.")
 
         # Skip if already filled
-        if pd.notna(metadata_df.loc[metadata_df["column_name"] == col, "data_type"]).any():
+        if col not in store or pd.notna(store.get(col, "data_type")):
             continue
 
-        dtype = data_df[col].dtype
-        dtype_str = str(dtype)
+        col_profile = _column_profile(profile, col)
+        dtype_str = col_profile["dtype"] if col_profile else str(data_df[col].dtype)
 
         # Convert pandas dtype to friendly string
         if "int" in dtype_str:
@@ -111,18 +133,19 @@ def fill_data_type_metadata(
         else:
             dtype_str = "string"
 
-        metadata_df.loc[metadata_df["column_name"] == col, "data_type"] = dtype_str
+        store.set(col, "data_type", dtype_str)
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
 # Fill COUNT metadata
 def fill_count_metadata(
     data_df: pd.DataFrame,
     metadata_df: pd.DataFrame,
-    columns: Optional[Union[str, List[str]]] = None
+    columns: Optional[Union[str, List[str]]] = None,
+    profile: Optional[Dict[str, dict]] = None
 ) -> pd.DataFrame:
     """
-    Fill 'count' column in metadata_df with non-null counts.
+    Fill 'count' column in metadata_df with non-null counts (from `profile` where given).
     Only fills empty cells.
     """
     if columns is None or (isinstance(columns, list) and len(columns) == 0):
@@ -132,18 +155,20 @@ def fill_count_metadata(
     else:
         target_cols = columns
 
+    store = as_metadata_store(metadata_df)
     for col in target_cols:
-        if 'count' not in metadata_df.columns:
+        if 'count' not in store.fields:
             raise ValueError("'count' column does not exist in metadata_df.")
 
         # Skip if already filled
-        if pd.notna(metadata_df.loc[metadata_df["column_name"] == col, "count"]).any():
+        if col not in store or pd.notna(store.get(col, "count")):
             continue
 
-        count = data_df[col].count()
-        metadata_df.loc[metadata_df["column_name"] == col, "count"] = count
+        col_profile = _column_profile(profile, col)
+        count = col_profile["count"] if col_profile else data_df[col].count()
+        store.set(col, "count", count)
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
 # Fill ORIGINAL_COL_SEQ metadata
 def fill_original_col_seq_metadata(data_df, metadata_df, verbose=False):
@@ -154,70 +179,171 @@ def fill_original_col_seq_metadata(data_df, metadata_df, verbose=False):
     - count = number of non-null entries in the column
 
     Args:
-        metadata_df (pd.DataFrame): Metadata dataframe to update.
+        metadata_df (pd.DataFrame or MetadataStore): Metadata dataframe to update.
         data_df (pd.DataFrame): Cleaned, typed data.
         verbose (bool): Print details if True.
 
     Returns:
         pd.DataFrame: Updated metadata dataframe.
     """
+    store = as_metadata_store(metadata_df)
     for idx, col in enumerate(data_df.columns, start=1):
-        # Find metadata row matching this column
-        row_mask = metadata_df["column_name"] == col
-        
+        # Skip columns without a metadata row
+        if col not in store:
+            continue
+
         # original_col_seq
-        if "original_col_seq" in metadata_df.columns:
-            existing_seq = metadata_df.loc[row_mask, "original_col_seq"].values
-            if len(existing_seq) == 0 or pd.isna(existing_seq[0]):
-                metadata_df.loc[row_mask, "original_col_seq"] = idx
+        if "original_col_seq" in store.fields:
+            if pd.isna(store.get(col, "original_col_seq")):
+                store.set(col, "original_col_seq", idx)
                 if verbose:
                     print(f"[{col}] original_col_seq set to {idx}.")
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
 # Fill IS_IDENTIFIER metadata
-def fill_is_identifier_metadata(data_df, metadata_df, columns=None, verbose=False):
+def fill_is_identifier_metadata(data_df, metadata_df, columns=None, profile=None, verbose=False):
     """
-    For each column, fill is_identifier=True if all non-null values are unique.
+    For each column, fill is_identifier=True if all non-null values are unique
+    (counts from `profile` where given).
     """
     if columns is None:
         columns = data_df.columns.tolist()
     
+    store = as_metadata_store(metadata_df)
     for col in columns:
         # Skip if already filled
-        if col not in metadata_df["column_name"].values:
+        if col not in store:
             print("🚨 Column not found in metadata_df:", repr(col))
             raise ValueError(f"Column '{col}' not present in metadata dataframe.")
-        current_value = metadata_df.loc[metadata_df["column_name"] == col, "is_identifier"]
-        val = current_value.iloc[0]
-        val_str = str(val).strip().lower()
-        if val_str not in ("", "nan"):
+        if not store.is_blank(col, "is_identifier"):
             if verbose:
-                print(f"[{col}] is_identifier already populated: {val}")
+                print(f"[{col}] is_identifier already populated: {store.get(col, 'is_identifier')}")
             continue
         
-        n_unique = data_df[col].nunique(dropna=True)
-        n_notnull = data_df[col].notnull().sum()
+        col_profile = _column_profile(profile, col)
+        if col_profile and col_profile["n_unique_error"]:
+            _, high = _estimate_range(col_profile["n_unique"], col_profile["n_unique_error"])
+            if high >= col_profile["count"]:
+                col_profile = None  # an estimate cannot tell all-distinct values apart: count exactly
+        if col_profile:
+            n_unique, n_notnull = col_profile["n_unique"], col_profile["count"]
+        else:
+            n_unique = data_df[col].nunique(dropna=True)
+            n_notnull = data_df[col].notnull().sum()
         
         is_identifier = n_unique == n_notnull and n_unique > 0
         
-        metadata_df.loc[metadata_df["column_name"] == col, "is_identifier"] = str(is_identifier)
+        store.set(col, "is_identifier", str(is_identifier))
         
         if verbose:
             print(f"[{col}] Filled is_identifier = {is_identifier}")
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
+
+# Fill IS_MULTI_SELECT metadata
+def fill_is_multi_select_metadata(
+    data_df,
+    metadata_df,
+    columns=None,
+    min_joined_share=0.1,
+    max_options=50,
+    profile=None,
+    verbose=False
+):
+    """
+    Fill 'is_multi_select' metadata: True for text columns holding comma-joined
+    answers to a multiple-choice question.
+
+    A column is multi-select when at least `min_joined_share` of its non-null values
+    contain the separator and the values split into fewer atomic options (at most
+    `max_options`) than there are distinct combinations. Free text with commas
+    splits into mostly unique fragments and is not flagged.
+
+    Run before fill_is_categorical_metadata, which then counts atomic options.
+
+    Args:
+        data_df (pd.DataFrame): The main data table.
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
+        columns (list or None): Which columns to fill. If None, fill for all columns.
+        min_joined_share (float): Minimum share of values containing the separator.
+        max_options (int): Maximum number of atomic options.
+        profile (dict or None): Output of profile_columns; profiled columns are not scanned.
+        verbose (bool): Print filled values.
+
+    Returns:
+        metadata_df (pd.DataFrame): Updated metadata.
+    """
+    if columns is None:
+        columns = data_df.columns.tolist()
+    store = as_metadata_store(metadata_df)
+    store.add_field("is_multi_select", "nan")
+
+    for col in columns:
+        if not store.is_blank(col, "is_multi_select"):
+            continue
+
+        col_profile = _column_profile(profile, col)
+        if col_profile and col_profile["is_text"] and col_profile["n_options_error"]:
+            low, _ = _estimate_range(col_profile["n_options"], col_profile["n_options_error"])
+            if low <= max_options:
+                col_profile = None  # estimated options not clearly above max_options: count exactly
+        if col_profile:
+            is_text = col_profile["is_text"]
+        else:
+            values = data_df[col].dropna()
+            is_text = values.map(lambda v: isinstance(v, str)).all() if len(values) else False
+        is_multi = False
+        if is_text:
+            if col_profile:
+                joined_share = col_profile["joined_share"]
+                n_options, n_unique = col_profile["n_options"], col_profile["n_unique"]
+            else:
+                joined_share = values.str.contains(MULTI_SELECT_SEPARATOR, regex=False).mean()
+                n_options, n_unique = split_multi_select(values).nunique(), values.nunique()
+            is_multi = bool(
+                joined_share >= min_joined_share
+                and n_options <= max_options
+                and n_options < n_unique
+            )
+
+        store.set(col, "is_multi_select", str(is_multi))
+        if verbose:
+            print(f"[{col}] Filled is_multi_select = {is_multi}")
+
+    return metadata_like(store, metadata_df)
+
+
+# Values counted as categories: non-null values, or atomic options of multi-select columns
+def _column_data(data_df, col):
+    # Data of a column its profile could not settle
+    if data_df is None:
+        raise ValueError(f"Column '{col}' cannot be settled from its profile and no data was given.")
+    return data_df[col]
+
+
+def _category_source(series, multi_select=False):
+    values = series.dropna()
+    return split_multi_select(values) if multi_select else values
+
 
 # Fill IS_CATEGORICAL metadata and also return unique values as a dictionary: the list of unique values for each column
-def fill_is_categorical_metadata(data_df, metadata_df, columns=None, unique_threshold=50):
+def fill_is_categorical_metadata(data_df, metadata_df, columns=None, unique_threshold=50, profile=None):
     """
     Fill 'is_categorical' metadata for columns in metadata_df.
 
     Args:
         data_df (pd.DataFrame): The main data table.
-        metadata_df (pd.DataFrame): The metadata table.
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
         columns (list or None): Which columns to fill. If None, fill for all columns.
         unique_threshold (int): Max number of unique values to consider categorical.
+            Multi-select columns (is_multi_select == True) count their atomic options.
+        profile (dict or None): Output of profile_columns; distinct counts and values
+            are taken from it where it settles the threshold.
+
+    Columns are counted in chunks with exact counts up to unique_threshold
+    (utils/sketches.py:count_distinct), stopping at the first chunk that exceeds
+    it, so sorted unique values are only built for categorical columns.
 
     Returns:
         metadata_df (pd.DataFrame): Updated metadata.
@@ -227,31 +353,191 @@ def fill_is_categorical_metadata(data_df, metadata_df, columns=None, unique_thre
         columns = data_df.columns.tolist()
 
     unique_values_dict = {}
+    store = as_metadata_store(metadata_df)
 
     for col in columns:
         # Only fill if empty
-        # current_value = metadata_df.loc[metadata_df["column_name"] == col, "is_categorical"]
-        # print("Current_value: ", current_value)
-        # print("Type of value:", type(current_value.iloc[0]))
-        # print("Condition: ", not current_value.isna().all() and current_value.iloc[0] != "")
-        # if not current_value.isna().all() and current_value.iloc[0] != "":
-        #     # Already filled
-        #     continue
-        current_value = metadata_df.loc[metadata_df["column_name"] == col, "is_categorical"]
-        val = current_value.iloc[0]
-        val_str = str(val).strip().lower()
-        if val_str not in ("", "nan"):
+        if not store.is_blank(col, "is_categorical"):
             continue
         
-        n_unique = data_df[col].nunique(dropna=True)
-        if n_unique <= unique_threshold:
-            metadata_df.loc[metadata_df["column_name"] == col, "is_categorical"] = str(True)
-            unique_values = sorted(data_df[col].dropna().unique().tolist())
+        multi_select = store.is_true(col, "is_multi_select")
+        key = "n_options" if multi_select else "n_unique"
+        col_profile = _column_profile(profile, col)
+        if col_profile and col_profile[key] is None:
+            col_profile = None  # multi-select flag on a column profiled as non-text
+        elif col_profile and col_profile[f"{key}_error"] and col_profile["max_values"] < unique_threshold:
+            # Estimated counts are above max_values, so only a threshold above it needs checking
+            low, high = _estimate_range(col_profile[key], col_profile[f"{key}_error"])
+            if low <= unique_threshold < high:
+                col_profile = None  # estimate close to the threshold: count exactly
+
+        if col_profile:
+            is_categorical = col_profile[key] <= unique_threshold
+            unique_values = col_profile["options" if multi_select else "values"]
+        else:
+            distinct = count_distinct(
+                _category_source(_column_data(data_df, col), multi_select), unique_threshold, stop_when_exceeded=True
+            )
+            is_categorical = distinct.exact
+            unique_values = sorted(distinct.counts.index.tolist()) if is_categorical else None
+
+        if is_categorical:
+            store.set(col, "is_categorical", str(True))
+            if unique_values is None:
+                # Values the profile could not sort (mixed types)
+                unique_values = sorted(_category_source(_column_data(data_df, col), multi_select).unique().tolist())
             unique_values_dict[col] = unique_values
         else:
-            metadata_df.loc[metadata_df["column_name"] == col, "is_categorical"] = str(False)
+            store.set(col, "is_categorical", str(False))
+
+    return metadata_like(store, metadata_df), unique_values_dict
+
+
+# Fill IS_FREE_TEXT metadata
+def fill_is_free_text_metadata(data_df, metadata_df, columns=None, min_avg_length=20, profile=None, verbose=False):
+    """
+    Fill 'is_free_text' metadata: True for non-categorical text columns whose
+    values average at least `min_avg_length` characters (remarks, comments).
+    Columns flagged is_proper_noun or is_identifier (names, IDs) are never free
+    text, so fill those flags first.
+
+    Free-text columns are enriched row by row by utils/freetext_enrichment.py
+    instead of process_translation_and_sentiment.
+
+    Args:
+        data_df (pd.DataFrame): The main data table.
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
+        columns (list or None): Which columns to fill. If None, fill for all columns.
+        min_avg_length (int): Minimum average value length (characters) of free text.
+        profile (dict or None): Output of profile_columns; profiled columns are not scanned.
+        verbose (bool): Print filled values.
+
+    Returns:
+        metadata_df (pd.DataFrame): Updated metadata.
+    """
+    if columns is None:
+        columns = data_df.columns.tolist()
+    store = as_metadata_store(metadata_df)
+    store.add_field("is_free_text", "nan")
+
+    for col in columns:
+        if not store.is_blank(col, "is_free_text"):
+            continue
+
+        if store.is_true(col, "is_proper_noun") or store.is_true(col, "is_identifier"):
+            store.set(col, "is_free_text", "False")
+            if verbose:
+                print(f"[{col}] Filled is_free_text = False (name or identifier)")
+            continue
+
+        is_categorical = store.is_true(col, "is_categorical")
+        col_profile = _column_profile(profile, col)
+        if col_profile:
+            is_text, avg_length = col_profile["is_text"], col_profile["avg_length"]
+        else:
+            values = data_df[col].dropna()
+            is_text = values.map(lambda v: isinstance(v, str)).all() if len(values) else False
+            avg_length = values.str.len().mean() if is_text else None
+        is_free_text = bool(
+            not is_categorical and is_text and avg_length >= min_avg_length
+        )
+
+        store.set(col, "is_free_text", str(is_free_text))
+        if verbose:
+            print(f"[{col}] Filled is_free_text = {is_free_text}")
+
+    return metadata_like(store, metadata_df)
+
+
+# Fill POLARITY metadata
+def fill_polarity_metadata(data_df, metadata_df, columns=None, profile=None, verbose=False):
+    """
+    Fill 'polarity' metadata of yes/no columns (every value a हाँ/नहीं/partial/blank
+    answer, see utils/sentiment_rules.py): 'negative' if the question, read from
+    desc_en and original_column_name, asks about a problem or is negated, else
+    'positive'. Other columns are left blank (no sentiment rules).
+
+    The rules fast path of process_translation_and_sentiment resolves sentiment of
+    yes/no answers from this flag; filled cells are kept, so a wrong guess can be
+    corrected by hand.
 
-    return metadata_df, unique_values_dict
+    Args:
+        data_df (pd.DataFrame): The main data table.
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
+        columns (list or None): Which columns to fill. If None, fill for all columns.
+        profile (dict or None): Output of profile_columns; profiled columns are not scanned.
+        verbose (bool): Print filled values.
+
+    Returns:
+        Updated metadata (same type as metadata_df).
+    """
+    if columns is None:
+        columns = data_df.columns.tolist()
+    store = as_metadata_store(metadata_df)
+    store.add_field("polarity", "nan")
+
+    for col in columns:
+        if not store.is_blank(col, "polarity"):
+            continue
+
+        col_profile = _column_profile(profile, col)
+        if col_profile:
+            values = col_profile["values"] if col_profile["is_text"] else None
+        else:
+            values = data_df[col].dropna().unique().tolist()
+            if not all(isinstance(v, str) for v in values):
+                values = None
+        if not values or not is_yes_no_answers(values):
+            continue
+
+        polarity = question_polarity(store.get(col, "desc_en"), store.get(col, "original_column_name"))
+        store.set(col, "polarity", polarity)
+        if verbose:
+            print(f"[{col}] Filled polarity = {polarity}")
+
+    return metadata_like(store, metadata_df)
+
+
+# Column-name words of proper-noun columns (school/mentor names, places)
+PROPER_NOUN_NAME_WORDS = {"name", "block", "town", "village", "district", "tehsil", "city", "cluster"}
+
+
+# Fill IS_PROPER_NOUN metadata
+def fill_is_proper_noun_metadata(data_df, metadata_df, columns=None, verbose=False):
+    """
+    Fill 'is_proper_noun' metadata: True for columns whose name contains a word
+    of PROPER_NOUN_NAME_WORDS (e.g. school_name, mentor_name, block_town).
+
+    Hindi proper-noun columns are transliterated locally (utils/transliteration.py)
+    by process_translation_and_sentiment instead of being translated by the LLM.
+    Set the flag by hand where the name-based guess is wrong; filled cells are kept.
+
+    Args:
+        data_df (pd.DataFrame): Main data table. (Not used but kept for consistent signature)
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
+        columns (list or None): Which columns to fill. If None, fill for all columns in metadata.
+        verbose (bool): Print filled values.
+
+    Returns:
+        metadata_df (pd.DataFrame): Updated metadata.
+    """
+    store = as_metadata_store(metadata_df)
+    if columns is None:
+        columns = store.column_names
+    store.add_field("is_proper_noun", "nan")
+
+    for col in columns:
+        if not store.is_blank(col, "is_proper_noun"):
+            continue
+
+        words = set(str(col).lower().replace("-", "_").replace(" ", "_").split("_"))
+        is_proper_noun = bool(words & PROPER_NOUN_NAME_WORDS)
+
+        store.set(col, "is_proper_noun", str(is_proper_noun))
+        if verbose:
+            print(f"[{col}] Filled is_proper_noun = {is_proper_noun}")
+
+    return metadata_like(store, metadata_df)
 
 
 # Fill category_values metadata using the unique values dictionary received from fill_is_categorical_metadata function
@@ -261,7 +547,7 @@ def fill_category_values_metadata(data_df, metadata_df, unique_values_dict, colu
 
     Args:
         data_df (pd.DataFrame): Main data table. (Not used but kept for consistent signature)
-        metadata_df (pd.DataFrame): The metadata table.
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
         unique_values_dict (dict): {col_name: list of unique values}
         columns (list or None): Which columns to fill. If None, fill for all columns in the dict.
         verbose (bool): If True, print progress.
@@ -275,23 +561,19 @@ def fill_category_values_metadata(data_df, metadata_df, unique_values_dict, colu
         # Only include columns that actually have unique values calculated
         cols_to_fill = [col for col in columns if col in unique_values_dict]
 
+    store = as_metadata_store(metadata_df)
     for col in cols_to_fill:
-        current_value = metadata_df.loc[metadata_df["column_name"] == col, "category_values"]
-        val = current_value.iloc[0]
-        val_str = str(val).strip().lower()
-        if val_str not in ("", "nan"):
+        if not store.is_blank(col, "category_values"):
             if verbose:
                 print(f"[{col}] category_values already populated.")
             continue
 
-        metadata_df.loc[
-            metadata_df["column_name"] == col, "category_values"
-        ] = str(unique_values_dict[col])
+        store.set(col, "category_values", str(unique_values_dict[col]))
 
         if verbose:
             print(f"[{col}] category_values filled with {len(unique_values_dict[col])} unique values.")
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
 # Fill _default_analysis_category_method helper function - to be designed for other usecases
 def _default_analysis_category_method(col_name, data_df, metadata_df):
@@ -314,31 +596,32 @@ def fill_analysis_category_metadata(
     
     Args:
         data_df (pd.DataFrame): The main dataset.
-        metadata_df (pd.DataFrame): The metadata table.
+        metadata_df (pd.DataFrame or MetadataStore): The metadata table.
         columns (list of str or None): Which columns to fill; if None, fills all.
     
     Returns:
         pd.DataFrame: Updated metadata.
     """
+    store = as_metadata_store(metadata_df)
     if columns is None:
-        cols_to_fill = metadata_df["column_name"].tolist()
+        cols_to_fill = store.column_names
     else:
         cols_to_fill = columns
 
     for col in cols_to_fill:
         # Retrieve current value
-        existing = metadata_df.loc[metadata_df["column_name"] == col, "analysis_category"]
+        existing = store.get(col, "analysis_category")
 
-        if pd.notnull(existing).any() and existing.iloc[0] != "":
+        if pd.notnull(existing) and existing != "":
             # Already populated
             continue
 
         # Otherwise, fill using fallback method
-        value = _default_analysis_category_method(col, data_df, metadata_df)
+        value = _default_analysis_category_method(col, data_df, store)
 
-        metadata_df.loc[metadata_df["column_name"] == col, "analysis_category"] = value
+        store.set(col, "analysis_category", value)
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
 # _pre_enrichment_seq_method helper function - to be designed for other usecases
 def _pre_enrichment_seq_method(column_name: str) -> int:
@@ -369,7 +652,7 @@ def fill_pre_enrichment_col_seq_metadata(
 
     Args:
         data_df (pd.DataFrame): The cleaned raw data.
-        metadata_df (pd.DataFrame): The metadata DataFrame.
+        metadata_df (pd.DataFrame or MetadataStore): The metadata DataFrame.
         columns (Optional[List[str]]): List of column names to process. If None, all columns.
 
     Returns:
@@ -380,9 +663,11 @@ def fill_pre_enrichment_col_seq_metadata(
         columns = data_df.columns.tolist()
 
     # For each column, check & fill
+    store = as_metadata_store(metadata_df)
     for col in columns:
-        existing_value = metadata_df.loc[metadata_df["column_name"] == col, "pre_enrichment_col_seq"].values
-        if existing_value.size > 0 and pd.notnull(existing_value[0]):
+        if col not in store:
+            continue
+        if pd.notnull(store.get(col, "pre_enrichment_col_seq")):
             # Already filled, skip
             continue
 
@@ -390,7 +675,7 @@ def fill_pre_enrichment_col_seq_metadata(
         seq = _pre_enrichment_seq_method(col)
 
         # Fill in metadata
-        metadata_df.loc[metadata_df["column_name"] == col, "pre_enrichment_col_seq"] = seq
+        store.set(col, "pre_enrichment_col_seq", seq)
 
-    return metadata_df
+    return metadata_like(store, metadata_df)
 
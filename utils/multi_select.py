@@ -0,0 +1,71 @@
+"""
+Multi-Select Columns
+-------------------
+Helpers for form questions that allow several answers, stored as one
+comma-joined string per row (e.g. "पुस्तक, खेल सामग्री").
+
+Each combination of options would otherwise be a distinct value. Columns
+flagged `is_multi_select` in metadata are split into atomic options, each option
+is translated/scored once, and the results are recombined per row with groupby.
+"""
+
+import pandas as pd
+
+MULTI_SELECT_SEPARATOR = ","
+RECOMBINE_SEPARATOR = ", "
+
+
+# One row per selected option
+def split_multi_select(series: pd.Series, sep: str = MULTI_SELECT_SEPARATOR) -> pd.Series:
+    """
+    Split joined answers into atomic options.
+
+    Returns:
+        pd.Series: Stripped, non-empty options indexed by the position (0..n-1)
+        of the row they came from; null rows are dropped.
+    """
+    values = pd.Series(series.to_numpy(), dtype=object).dropna()
+    options = values.astype(str).str.split(sep).explode().str.strip()
+    return options[options != ""]
+
+
+# Distinct options of a column
+def unique_options(series: pd.Series, sep: str = MULTI_SELECT_SEPARATOR) -> list:
+    """
+    Sorted list of the atomic options used in a multi-select column.
+    """
+    return sorted(split_multi_select(series, sep).unique().tolist())
+
+
+# Join mapped options back into one value per row
+def recombine_options(mapped: pd.Series, n_rows: int, sep: str = RECOMBINE_SEPARATOR) -> pd.Series:
+    """
+    Join per-option results (output of split_multi_select().map(...)) back into
+    one string per row, in the original option order. Rows without options are NaN.
+    """
+    joined = mapped.astype(str).groupby(level=0, sort=False).agg(sep.join)
+    return joined.reindex(range(n_rows))
+
+
+# Row sentiment from the sentiments of its options
+def majority_sentiment(mapped: pd.Series, n_rows: int) -> pd.Series:
+    """
+    Majority vote over the option sentiments of each row. 'unknown' options do
+    not vote; a tie between labels gives 'neutral'; rows whose options are all
+    unknown give 'unknown'. Rows without options are NaN.
+    """
+    votes = pd.DataFrame({"row": mapped.index, "label": mapped.to_numpy()})
+    counts = (
+        votes[votes["label"] != "unknown"]
+        .groupby(["row", "label"], sort=False)
+        .size()
+        .rename("n")
+        .reset_index()
+    )
+    winners = counts[counts["n"] == counts.groupby("row")["n"].transform("max")].copy()
+    winners.loc[winners.groupby("row")["label"].transform("size") > 1, "label"] = "neutral"
+    result = winners.drop_duplicates("row").set_index("row")["label"]
+
+    rows_with_options = pd.Index(mapped.index.unique())
+    result = result.reindex(rows_with_options).fillna("unknown")
+    return result.reindex(range(n_rows))
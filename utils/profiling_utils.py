@@ -0,0 +1,370 @@
+"""
+Profiling Utilities
+-------------------
+Column statistics computed once and shared by the fill_* functions.
+
+The metadata pipelines used to scan every column once per fill step:
+fill_count_metadata counted non-nulls, fill_is_identifier_metadata and
+fill_is_categorical_metadata each ran nunique, fill_is_multi_select_metadata and
+fill_is_free_text_metadata each walked every value as a string. `profile_columns`
+makes a single pass per column and derives everything else from the distinct
+values of each chunk and their counts:
+
+    dtype, count, n_unique, n_unique_error, max_values, top_values, min, max,
+    values, is_text, avg_length, joined_share, n_options, n_options_error, options
+
+Distinct values and options are counted with utils/sketches.py:BoundedDistinct,
+exactly up to `max_values` and with a HyperLogLog beyond, so profiling a column
+takes bounded memory whatever its cardinality: high-cardinality columns (IDs,
+free text) get an estimated n_unique (n_unique_error > 0), approximate
+top_values and no values list. The statistics behind a profile (`ColumnStats`)
+merge, so a profile of data loaded in parts can be kept up to date from the
+statistics of each part (utils/load_stats.py).
+
+With max_workers > 1, columns are profiled in worker processes and no worker
+receives a pickled copy of the data:
+- where processes can be forked (Linux and other POSIX systems, not macOS) and
+  this process runs no other thread, the workers read data_df from the pages
+  they share with this process (copy-on-write), so nothing is copied at all;
+- elsewhere, including a process with other threads running (LLM request
+  pools, a web server), where a fork could copy a lock held by another thread
+  into the workers and hang them, the workers are started with forkserver (or
+  spawn) and the columns are copied once into a shared-memory block
+  (utils/shared_columns.py). Numeric columns are a plain copy, but text columns
+  of Python strings are encoded value by value, which costs about as much as
+  profiling them: expect little speedup on text-heavy data there.
+Text columns (the slow ones) are handed out first and the profiles are merged in
+column order, so the result is the same as a serial run.
+
+Pass the result as `profile=` to the fill_* functions in utils/metadata_utils.py;
+columns missing from the profile are computed from the data as before.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.multi_select import MULTI_SELECT_SEPARATOR, split_multi_select
+from utils.shared_columns import SharedColumns, attach_column
+from utils.sketches import BoundedDistinct, DEFAULT_CHUNK_SIZE
+
+DEFAULT_TOP_K = 10
+# Distinct values (or options) counted exactly: fill_is_categorical_metadata's default threshold
+DEFAULT_MAX_VALUES = 50
+# ColumnStats attributes saved by to_dict besides the distinct counts
+_STATE_KEYS = (
+    "dtype", "max_values", "sep", "count", "min", "max", "ordered", "is_text", "length_sum", "joined_count"
+)
+
+
+def _native(value):
+    # NumPy / pandas scalars -> Python scalars
+    return value.item() if hasattr(value, "item") else value
+
+
+def _common_dtype(a: str, b: str) -> str:
+    # dtype of a column whose loads were typed a and b (int8 + int16 -> int16, else object)
+    if a == b:
+        return a
+    try:
+        dtypes = np.dtype(a), np.dtype(b)
+    except TypeError:
+        return "object"
+    if all(dtype.kind in "biuf" for dtype in dtypes):
+        return str(np.result_type(*dtypes))
+    return "object"
+
+
+class ColumnStats:
+    """
+    Mergeable statistics of one column: non-null count, distinct values and
+    options (utils/sketches.py:BoundedDistinct), min / max and text length sums.
+    Statistics of separate parts of a column (chunks, data loads) merge into the
+    statistics of the whole; `profile` turns them into a profile dict.
+    """
+
+    def __init__(self, dtype: str, max_values: int = DEFAULT_MAX_VALUES, sep: str = MULTI_SELECT_SEPARATOR):
+        self.dtype = dtype
+        self.max_values = max_values
+        self.sep = sep
+        self.count = 0
+        self.distinct = BoundedDistinct(max_values)
+        self.options = BoundedDistinct(max_values)
+        self.min = self.max = None
+        self.ordered = True
+        self.is_text = True
+        self.length_sum = self.joined_count = 0
+
+    @classmethod
+    def from_series(
+        cls,
+        series: pd.Series,
+        max_values: int = DEFAULT_MAX_VALUES,
+        sep: str = MULTI_SELECT_SEPARATOR,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> "ColumnStats":
+        """
+        Statistics of a column, read in chunks of chunk_size rows.
+        """
+        stats = cls(str(series.dtype), max_values, sep)
+        for start in range(0, len(series), chunk_size):
+            stats.update(series.iloc[start:start + chunk_size])
+        return stats
+
+    def _add_range(self, low, high):
+        if not self.ordered or low is None:
+            return
+        try:
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+        except TypeError:
+            # Mixed types: no order
+            self.ordered = False
+            self.min = self.max = None
+
+    def update(self, values):
+        """
+        Add a chunk of values.
+        """
+        chunk_counts = self.distinct.update(values)
+        if not len(chunk_counts):
+            return
+        chunk = chunk_counts.index
+        weights = chunk_counts.to_numpy()
+        self.count += int(weights.sum())
+
+        if self.ordered:
+            try:
+                self._add_range(_native(chunk.min()), _native(chunk.max()))
+            except TypeError:
+                self.ordered = False
+                self.min = self.max = None
+
+        # Text statistics over the chunk's distinct values, weighted by their counts
+        self.is_text = self.is_text and pd.api.types.infer_dtype(chunk, skipna=True) == "string"
+        if self.is_text:
+            text = pd.Series(chunk, dtype=object)
+            joined = text.str.contains(self.sep, regex=False).to_numpy(dtype=bool)
+            self.length_sum += int((text.str.len().to_numpy() * weights).sum())
+            self.joined_count += int(weights[joined].sum())
+            # Only joined values need splitting; the others are one option each
+            single = text[~joined].str.strip()
+            self.options.update(pd.concat([single[single != ""], split_multi_select(text[joined], self.sep)]).unique())
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        """
+        Add the statistics of another part of the column (same max_values).
+        """
+        self.dtype = _common_dtype(self.dtype, other.dtype)
+        self.distinct.merge(other.distinct)
+        if not other.count:
+            return self
+        self.count += other.count
+        if other.ordered:
+            self._add_range(other.min, other.max)
+        else:
+            self.ordered = False
+            self.min = self.max = None
+        self.is_text = self.is_text and other.is_text
+        if self.is_text:
+            self.length_sum += other.length_sum
+            self.joined_count += other.joined_count
+            self.options.merge(other.options)
+        return self
+
+    def profile(self, top_k: int = DEFAULT_TOP_K) -> dict:
+        """
+        Profile dict of the statistics (see profile_column).
+        """
+        n = self.count
+        is_text = self.is_text and n > 0
+        return {
+            "dtype": self.dtype,
+            "count": n,
+            "n_unique": self.distinct.n_distinct(),
+            "n_unique_error": self.distinct.relative_error(),
+            "max_values": self.max_values,
+            "top_values": self.distinct.top_values(top_k),
+            "min": self.min,
+            "max": self.max,
+            "values": self.distinct.values(),
+            "is_text": is_text,
+            "avg_length": self.length_sum / n if is_text else None,
+            "joined_share": self.joined_count / n if is_text else None,
+            "n_options": self.options.n_distinct() if is_text else None,
+            "n_options_error": self.options.relative_error() if is_text else None,
+            "options": self.options.values() if is_text else None,
+        }
+
+    def to_dict(self) -> dict:
+        """
+        Plain-Python state (see BoundedDistinct.to_dict); see from_dict.
+        """
+        state = {key: getattr(self, key) for key in _STATE_KEYS}
+        state["distinct"] = self.distinct.to_dict()
+        state["options"] = self.options.to_dict()
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "ColumnStats":
+        """
+        Rebuild ColumnStats from to_dict() output.
+        """
+        stats = cls(state["dtype"], state["max_values"], state["sep"])
+        for key in _STATE_KEYS:
+            setattr(stats, key, state[key])
+        stats.distinct = BoundedDistinct.from_dict(state["distinct"])
+        stats.options = BoundedDistinct.from_dict(state["options"])
+        return stats
+
+
+# Statistics of one column
+def profile_column(
+    series: pd.Series,
+    top_k: int = DEFAULT_TOP_K,
+    max_values: int = DEFAULT_MAX_VALUES,
+    sep: str = MULTI_SELECT_SEPARATOR,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict:
+    """
+    Profile one column in one pass over chunks of chunk_size rows.
+
+    Returns:
+        dict: Keys
+            dtype (str), count (non-null values), n_unique (distinct non-null values),
+            n_unique_error (0.0 if n_unique is exact, else the relative error of the
+            estimate), max_values (n_unique and n_options are exact up to this many),
+            top_values (list of (value, count), most frequent first; approximate counts
+            past max_values), min / max (None if the values do not compare), values
+            (sorted distinct values, None past max_values), is_text (every value is a
+            string) and, for text columns (else None): avg_length (mean characters per
+            value), joined_share (share of values containing `sep`), n_options /
+            n_options_error (distinct atomic options as split by split_multi_select)
+            and options (sorted, None past max_values).
+    """
+    return ColumnStats.from_series(series, max_values, sep, chunk_size).profile(top_k)
+
+
+# Data seen by forked workers (set only while a parallel profile runs)
+_FORKED = {}
+
+
+def _fork_context():
+    # Fork start method where it is available and safe, else None. Only a
+    # single-threaded process is forked: a lock held by another thread would be
+    # copied locked into the workers
+    if sys.platform == "darwin" or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    if threading.active_count() > 1:
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def _shared_memory_context():
+    # Start method of the shared-memory workers: never fork (the default on Linux before Python 3.14)
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _forked_column_stats(col, options: dict):
+    # Worker (forked): statistics of a column of the inherited frame
+    return col, ColumnStats.from_series(_FORKED["data_df"][col], **options)
+
+
+def _shared_column_stats(name: str, col, spec: dict, options: dict):
+    # Worker (forkserver / spawn): rebuild one column from shared memory and compute its statistics
+    return col, ColumnStats.from_series(attach_column(name, spec, col), **options)
+
+
+def _is_numeric_like(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype)
+
+
+# Statistics of every column, in worker processes
+def _column_stats_parallel(data_df: pd.DataFrame, columns: list, max_workers: int, options: dict) -> dict:
+    # Text columns first, so no worker is left with a slow one at the end
+    order = sorted(columns, key=lambda c: _is_numeric_like(data_df[c]))
+    max_workers = min(max_workers, len(columns))
+    context = _fork_context()
+    if context is not None:
+        _FORKED["data_df"] = data_df
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+                futures = [executor.submit(_forked_column_stats, col, options) for col in order]
+                results = [future.result() for future in futures]
+        finally:
+            _FORKED.clear()
+    else:
+        with SharedColumns(data_df, columns) as shared:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=_shared_memory_context()) as executor:
+                futures = [
+                    executor.submit(_shared_column_stats, shared.name, col, shared.specs[col], options)
+                    for col in order
+                ]
+                results = [future.result() for future in futures]
+    stats = dict(results)
+    return {col: stats[col] for col in columns}
+
+
+# Mergeable statistics of every column
+def collect_column_stats(
+    data_df: pd.DataFrame,
+    columns=None,
+    max_values: int = DEFAULT_MAX_VALUES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = 1
+) -> dict:
+    """
+    ColumnStats of the columns of data_df (see profile_columns for the arguments).
+
+    Returns:
+        dict: {column_name: ColumnStats}, in column order.
+    """
+    if columns is None:
+        columns = data_df.columns.tolist()
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    options = {"max_values": max_values, "chunk_size": chunk_size}
+    if max_workers > 1 and len(columns) > 1:
+        return _column_stats_parallel(data_df, list(columns), max_workers, options)
+    return {col: ColumnStats.from_series(data_df[col], **options) for col in columns}
+
+
+# Statistics of every column
+def profile_columns(
+    data_df: pd.DataFrame,
+    columns=None,
+    top_k: int = DEFAULT_TOP_K,
+    max_values: int = DEFAULT_MAX_VALUES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = 1,
+    verbose: bool = False
+) -> dict:
+    """
+    Profile the columns of data_df (see profile_column) in one pass over each column.
+
+    Args:
+        data_df (pd.DataFrame): Cleaned, typed data.
+        columns (list or None): Columns to profile (default: all).
+        top_k (int): Most frequent values kept per column.
+        max_values (int): Distinct values (and options) are counted exactly, and listed,
+            only up to this many; beyond, they are estimated.
+        chunk_size (int): Rows read at a time.
+        max_workers (int): Worker processes; 1 profiles in this process. None uses
+            every CPU. Results do not depend on it.
+        verbose (bool): Print the number of profiled columns.
+
+    Returns:
+        dict: {column_name: profile dict}, in column order.
+    """
+    stats = collect_column_stats(data_df, columns, max_values, chunk_size, max_workers)
+    profile = {col: column_stats.profile(top_k) for col, column_stats in stats.items()}
+    if verbose:
+        workers = min(max_workers or os.cpu_count() or 1, max(len(stats), 1))
+        print(f"[📊] Profiled {len(profile)} columns ({len(data_df)} rows, {workers} workers).")
+    return profile
@@ -0,0 +1,192 @@
+"""
+Sentiment Classifier
+-------------------
+Small local sentiment model distilled from the labels produced by
+`infer_sentiment_with_llm` / `translate_list_and_infer_sentiment_with_llm`.
+
+Labels are stored per column description in a DuckDB table (`sentiment_labels`).
+The model (character n-grams of the value + words of the column description,
+logistic regression) classifies new values in batch; only values below a
+confidence threshold need to go to the LLM.
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Default DuckDB file for sentiment labels (override with SENTIMENT_LABELS_DB)
+DEFAULT_LABELS_DB = "data/interim/sentiment_labels.duckdb"
+LABELS_TABLE = "sentiment_labels"
+LABEL_COLUMNS = ["col_desc", "value", "sentiment", "source", "created_at"]
+
+_labels = []
+_labels_lock = threading.Lock()
+
+
+# Buffer labels produced by the LLM
+def record_sentiment_labels(col_desc: str, values, sentiments, source: str = "llm"):
+    """
+    Buffer (col_desc, value, sentiment) labels for later training.
+    """
+    now = datetime.now()
+    with _labels_lock:
+        _labels.extend(
+            (col_desc, str(value), sentiment, source, now)
+            for value, sentiment in zip(values, sentiments)
+        )
+
+
+# Write buffered labels to DuckDB
+def flush_sentiment_labels(db_path: Optional[str] = None, verbose: bool = False) -> int:
+    """
+    Append buffered labels to the `sentiment_labels` table and clear the buffer.
+
+    Args:
+        db_path (str or None): DuckDB file (default: SENTIMENT_LABELS_DB or data/interim/sentiment_labels.duckdb).
+        verbose (bool): Print how many labels were written.
+
+    Returns:
+        int: Number of labels written.
+    """
+    import duckdb
+
+    with _labels_lock:
+        labels_df = pd.DataFrame(_labels, columns=LABEL_COLUMNS)
+        _labels.clear()
+    if labels_df.empty:
+        return 0
+
+    db_path = db_path or os.getenv("SENTIMENT_LABELS_DB", DEFAULT_LABELS_DB)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    con = duckdb.connect(db_path)
+    try:
+        con.register("labels_df", labels_df)
+        con.execute(f"CREATE TABLE IF NOT EXISTS {LABELS_TABLE} AS SELECT * FROM labels_df LIMIT 0")
+        con.execute(f"INSERT INTO {LABELS_TABLE} BY NAME SELECT * FROM labels_df")
+    finally:
+        con.close()
+
+    if verbose:
+        print(f"[🏷️] Wrote {len(labels_df)} sentiment labels to {db_path}:{LABELS_TABLE}")
+    return len(labels_df)
+
+
+# Read stored labels (latest label per description/value)
+def load_sentiment_labels(db_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load stored labels, keeping the most recent label per (col_desc, value).
+
+    Returns:
+        pd.DataFrame: Columns col_desc, value, sentiment.
+    """
+    import duckdb
+
+    db_path = db_path or os.getenv("SENTIMENT_LABELS_DB", DEFAULT_LABELS_DB)
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=["col_desc", "value", "sentiment"])
+
+    con = duckdb.connect(db_path, read_only=True)
+    try:
+        return con.execute(f"""
+            SELECT col_desc, value, arg_max(sentiment, created_at) AS sentiment
+            FROM {LABELS_TABLE}
+            GROUP BY col_desc, value
+        """).fetchdf()
+    finally:
+        con.close()
+
+
+class SentimentClassifier:
+    """
+    Char n-gram + description-word logistic regression distilled from LLM labels.
+    """
+
+    def __init__(self, ngram_range: tuple = (1, 4), C: float = 4.0):
+        from sklearn.compose import ColumnTransformer
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+
+        self.pipeline = Pipeline([
+            ("features", ColumnTransformer([
+                ("value", TfidfVectorizer(analyzer="char_wb", ngram_range=ngram_range, sublinear_tf=True), "value"),
+                ("desc", TfidfVectorizer(analyzer="word"), "col_desc"),
+            ])),
+            ("model", LogisticRegression(C=C, max_iter=1000)),
+        ])
+
+    def fit(self, labels_df: pd.DataFrame) -> "SentimentClassifier":
+        """
+        Train on a DataFrame with col_desc, value and sentiment columns.
+        """
+        if labels_df["sentiment"].nunique() < 2:
+            raise ValueError("Need labels of at least two sentiment classes to train.")
+        features = labels_df[["value", "col_desc"]].astype(str)
+        self.pipeline.fit(features, labels_df["sentiment"].astype(str))
+        return self
+
+    def predict(self, values, col_desc: str) -> tuple[list, np.ndarray]:
+        """
+        Classify values of one column in batch.
+
+        Returns:
+            tuple: (list of sentiments, array of confidences in [0, 1])
+        """
+        if len(values) == 0:
+            return [], np.array([])
+        features = pd.DataFrame({"value": [str(v) for v in values], "col_desc": str(col_desc)})
+        proba = self.pipeline.predict_proba(features)
+        classes = self.pipeline.classes_
+        return classes[proba.argmax(axis=1)].tolist(), proba.max(axis=1)
+
+    def save(self, path: str):
+        """
+        Save the trained model with joblib.
+        """
+        import joblib
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "SentimentClassifier":
+        """
+        Load a model saved with save().
+        """
+        import joblib
+
+        return joblib.load(path)
+
+
+# Train from the label store
+def train_sentiment_classifier(
+    db_path: Optional[str] = None,
+    model_path: Optional[str] = None,
+    verbose: bool = False
+) -> SentimentClassifier:
+    """
+    Train a SentimentClassifier on every stored LLM label.
+
+    Args:
+        db_path (str or None): Label store (default: SENTIMENT_LABELS_DB).
+        model_path (str or None): If given, save the trained model there.
+        verbose (bool): Print training summary.
+
+    Returns:
+        SentimentClassifier: Trained model.
+    """
+    labels_df = load_sentiment_labels(db_path)
+    classifier = SentimentClassifier().fit(labels_df)
+    if model_path:
+        classifier.save(model_path)
+    if verbose:
+        print(
+            f"[🧠] Trained sentiment classifier on {len(labels_df)} labels "
+            f"from {labels_df['col_desc'].nunique()} column descriptions."
+        )
+    return classifier
@@ -0,0 +1,156 @@
+"""
+Sentiment Rules
+-------------------
+Deterministic lexicon and rules for values whose translation and sentiment are
+fully determined by the value itself (हाँ/नहीं/blank style answers).
+
+Sentiment of a yes/no answer depends on the question, so it is driven by the
+column-level `polarity` metadata flag:
+    - "positive": "yes" is a good answer (e.g. "Was the TLM used?")
+    - "negative": "yes" is a bad answer (e.g. "Was there a shortage of books?")
+    - empty/nan : no sentiment rules; only the translation is resolved locally
+
+The metadata pipelines fill it for yes/no columns (fill_polarity_metadata in
+utils/metadata_utils.py) from the question text with `question_polarity`;
+correct it by hand where the guess is wrong.
+"""
+
+import re
+import unicodedata
+
+# Canonical answer -> English translation
+ANSWER_TRANSLATIONS = {
+    "yes": "Yes",
+    "no": "No",
+    "partial": "Partially",
+}
+
+# Normalized value -> canonical answer
+ANSWER_LEXICON = {
+    # yes
+    "हां": "yes", "हा": "yes", "हांजी": "yes", "जी हां": "yes", "हां जी": "yes",
+    "yes": "yes", "y": "yes", "true": "yes", "haan": "yes", "ha": "yes",
+    # no
+    "नहीं": "no", "नही": "no", "ना": "no", "जी नहीं": "no", "नहीं जी": "no",
+    "no": "no", "n": "no", "false": "no", "nahi": "no", "nahin": "no",
+    # partially
+    "आंशिक": "partial", "आंशिक रूप से": "partial", "कुछ हद तक": "partial",
+    "partially": "partial", "partial": "partial", "somewhat": "partial",
+    # blank / null-like
+    "": "blank", "nan": "blank", "none": "blank", "null": "blank", "-": "blank",
+    "na": "blank", "n-a": "blank",
+}
+
+# (canonical answer, polarity) -> sentiment
+ANSWER_SENTIMENTS = {
+    ("yes", "positive"): "positive",
+    ("no", "positive"): "negative",
+    ("yes", "negative"): "negative",
+    ("no", "negative"): "positive",
+    ("partial", "positive"): "neutral",
+    ("partial", "negative"): "neutral",
+}
+
+VALID_POLARITIES = ("positive", "negative")
+
+# Question words that make "yes" a bad answer (a problem is being asked about)
+NEGATIVE_QUESTION_WORDS = {
+    "shortage", "shortages", "lack", "lacks", "lacking", "missing", "absent", "absence",
+    "problem", "problems", "difficulty", "difficulties", "complaint", "complaints",
+    "damaged", "broken", "unavailable", "insufficient", "irregular", "dropout", "dropouts",
+    "unsafe", "dirty", "leaking", "leakage",
+    "कमी", "समस्या", "समस्याएं", "कठिनाई", "शिकायत", "अनुपस्थित", "खराब", "टूटा", "टूटी", "टूटे",
+    "परेशानी", "असुरक्षित", "गंदा", "गंदगी",
+}
+# Negation words of a negated question ("Was the teacher not present?")
+NEGATION_QUESTION_WORDS = {"not", "no", "never", "without", "नहीं", "नही", "न", "मत", "बिना"}
+
+_PUNCTUATION = re.compile(r"[\s\.,!\?।॥'\"]+")
+
+
+# Normalize a raw value for lexicon lookup
+def normalize_answer(value) -> str:
+    """
+    Normalize a value for lexicon lookup: NFC, lowercase, chandrabindu -> anusvara,
+    nukta dropped, punctuation/danda stripped and whitespace collapsed.
+    """
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFC", str(value)).strip().lower()
+    text = text.replace("ँ", "ं").replace("़", "")
+    text = _PUNCTUATION.sub(" ", text).strip()
+    return text
+
+
+# Read a column's polarity flag
+def parse_polarity(value):
+    """
+    Return 'positive' or 'negative' from a metadata polarity cell, else None.
+    """
+    text = str(value).strip().lower()
+    return text if text in VALID_POLARITIES else None
+
+
+# True for the distinct values of a yes/no question
+def is_yes_no_answers(values) -> bool:
+    """
+    True if every value is a yes/no/partial/blank answer of the lexicon and at
+    least one is a yes or a no.
+    """
+    answers = {ANSWER_LEXICON.get(normalize_answer(value)) for value in values}
+    return None not in answers and bool(answers & {"yes", "no"})
+
+
+# Guess a yes/no question's polarity from its text
+def question_polarity(*texts) -> str:
+    """
+    Return 'negative' if the question text (description, header) asks about a
+    problem (NEGATIVE_QUESTION_WORDS) or is negated (NEGATION_QUESTION_WORDS),
+    else 'positive'.
+    """
+    words = set()
+    for text in texts:
+        if text is not None and str(text).strip().lower() != "nan":
+            words.update(normalize_answer(text).split())
+    cues = {normalize_answer(w) for w in NEGATIVE_QUESTION_WORDS | NEGATION_QUESTION_WORDS}
+    return "negative" if words & cues else "positive"
+
+
+# Resolve values locally where the rules determine them fully
+def resolve_with_rules(values, polarity=None, need_translation=True, need_sentiment=True):
+    """
+    Resolve translation and/or sentiment of values from the lexicon.
+
+    A value counts as resolved only if every requested field is determined;
+    sentiment is determined for yes/no/partial answers only when the column has a
+    polarity, and for blank values always ('unknown').
+
+    Args:
+        values (list): Unique values of a column.
+        polarity (str or None): Column polarity ('positive'/'negative').
+        need_translation (bool): Translation is required.
+        need_sentiment (bool): Sentiment is required.
+
+    Returns:
+        tuple: ({value: translation}, {value: sentiment}, [unresolved values])
+    """
+    polarity = parse_polarity(polarity)
+    translations, sentiments, unresolved = {}, {}, []
+
+    for value in values:
+        answer = ANSWER_LEXICON.get(normalize_answer(value))
+        if answer is None:
+            unresolved.append(value)
+            continue
+
+        sentiment = "unknown" if answer == "blank" else ANSWER_SENTIMENTS.get((answer, polarity))
+        if need_sentiment and sentiment is None:
+            unresolved.append(value)
+            continue
+
+        if need_translation:
+            translations[value] = value if answer == "blank" else ANSWER_TRANSLATIONS[answer]
+        if need_sentiment:
+            sentiments[value] = sentiment
+
+    return translations, sentiments, unresolved
@@ -0,0 +1,151 @@
+"""
+Shared Columns
+-------------------
+DataFrame columns laid out in one shared-memory block, so worker processes can
+read them without each receiving a pickled copy of the data.
+
+`SharedColumns(data_df, columns)` copies the columns once into a block created
+with multiprocessing.shared_memory; workers get the block name and a small spec
+per column and rebuild the Series with `attach_column`. Layout (Arrow-like):
+
+    numpy       int / float / bool / datetime64 values as one buffer
+    masked      nullable Int64 / Float64 / boolean: values buffer + null mask
+    text        str columns (and object columns holding only strings): UTF-8
+                bytes of the concatenated values + end offsets (in characters)
+                + null mask
+    pickled     anything else (mixed objects, categoricals, ...): the Series
+                itself travels in the spec
+
+The creating process owns the block: close it (or use SharedColumns as a
+context manager) once the workers are done.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Buffers start on 8-byte boundaries
+_ALIGN = 8
+
+
+def _column_buffers(series: pd.Series):
+    # (kind, {buffer name: np.ndarray}, extra spec keys) of one column
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        return "numpy", {"values": series.to_numpy()}, {}
+    if hasattr(dtype, "numpy_dtype") and dtype.kind in "biuf":
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0 if dtype.kind != "b" else False)
+        return "masked", {"values": values, "mask": mask}, {}
+    if isinstance(dtype, pd.StringDtype) or (
+        dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty")
+    ):
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=object, na_value="")
+        ends = np.cumsum(np.fromiter(map(len, values), dtype=np.int64, count=len(values)))
+        data = np.frombuffer("".join(values).encode("utf-8", "surrogatepass"), dtype=np.uint8)
+        return "text", {"data": data, "ends": ends, "mask": mask}, {}
+    return "pickled", {}, {"series": series}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Older versions register the block again with the resource tracker; worker
+        # processes share the creating process's tracker, so the block is still
+        # unlinked exactly once (by SharedColumns.close)
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedColumns:
+    """
+    Columns of a DataFrame copied into one shared-memory block.
+
+    Attributes:
+        name (str): Shared-memory block name (pass to attach_column).
+        specs (dict): {column_name: spec} (pass one to attach_column).
+    """
+
+    def __init__(self, data_df: pd.DataFrame, columns=None):
+        if columns is None:
+            columns = data_df.columns.tolist()
+        layout, size = {}, 0
+        for col in columns:
+            kind, buffers, extra = _column_buffers(data_df[col])
+            placed = {}
+            for key, array in buffers.items():
+                placed[key] = (size, array)
+                size += -(-array.nbytes // _ALIGN) * _ALIGN
+            layout[col] = (kind, placed, extra, data_df[col].dtype, len(data_df))
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.name = self._shm.name
+        self.specs = {}
+        for col, (kind, placed, extra, dtype, length) in layout.items():
+            buffers = {}
+            for key, (offset, array) in placed.items():
+                target = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf, offset=offset)
+                target[...] = array
+                buffers[key] = (offset, array.dtype.str, len(array))
+                del target
+            self.specs[col] = {"kind": kind, "dtype": dtype, "length": length, "buffers": buffers, **extra}
+
+    def close(self):
+        """
+        Release and delete the block.
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Rebuild a shared column
+def attach_column(name: str, spec: dict, column_name=None) -> pd.Series:
+    """
+    Rebuild a column of a SharedColumns block (in any process).
+
+    Args:
+        name (str): SharedColumns.name.
+        spec (dict): SharedColumns.specs[column].
+        column_name: Name given to the Series.
+
+    Returns:
+        pd.Series: The column, with its original dtype (a copy: the block can be
+        closed afterwards). Nulls of object columns come back as None.
+    """
+    kind, dtype = spec["kind"], spec["dtype"]
+    if kind == "pickled":
+        return spec["series"].rename(column_name)
+
+    shm = _attach(name)
+    try:
+        arrays = {
+            key: np.ndarray((count,), dtype=np.dtype(code), buffer=shm.buf, offset=offset).copy()
+            for key, (offset, code, count) in spec["buffers"].items()
+        }
+    finally:
+        shm.close()
+
+    if kind == "numpy":
+        return pd.Series(arrays["values"], dtype=dtype, name=column_name, copy=False)
+    if kind == "masked":
+        values = dtype.construct_array_type()(arrays["values"], arrays["mask"])
+        return pd.Series(values, name=column_name, copy=False)
+
+    # text
+    text = arrays["data"].tobytes().decode("utf-8", "surrogatepass")
+    ends = arrays["ends"].tolist()
+    starts = [0] + ends[:-1]
+    values = np.empty(spec["length"], dtype=object)
+    values[:] = [text[start:end] for start, end in zip(starts, ends)]
+    values[arrays["mask"]] = None
+    return pd.Series(values, dtype=dtype, name=column_name)
@@ -0,0 +1,272 @@
+"""
+Sketches
+-------------------
+Bounded-memory distinct counting for column profiling.
+
+`HyperLogLog` estimates the number of distinct values of a column from 2**precision
+one-byte registers (4 KB at the default precision 12, relative error about 1.6%),
+however many distinct values the column has. `BoundedDistinct` keeps exact value
+counts while a column has at most `limit` distinct values (enough to list the
+categories of a categorical column) and switches to a HyperLogLog, plus
+approximate top values, once it exceeds the limit. Values are fed in chunks, and
+a caller that only needs to know whether a column is small can stop at the first
+chunk that exceeds the limit (`count_distinct(..., stop_when_exceeded=True)`).
+
+Both merge (`merge`) and round-trip through plain Python (`to_dict` /
+`from_dict`), so counts of separate chunks or data loads can be stored and
+combined later (utils/load_stats.py).
+
+Values are hashed with pandas' hash_array: numbers as float64 (1 and 1.0 hash
+alike), anything else as its string.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PRECISION = 12
+DEFAULT_CHUNK_SIZE = 250_000
+# Values kept for approximate top values once exact counting stops
+DEFAULT_TOP_CAPACITY = 100
+
+
+# 64-bit hashes of values
+def hash_values(values) -> np.ndarray:
+    """
+    Return uint64 hashes of the non-null values.
+    """
+    series = pd.Series(values).dropna()
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return pd.util.hash_array(series.to_numpy(dtype="float64"))
+    # categorize=False: callers mostly pass distinct values, which factorizing would not shrink
+    return pd.util.hash_array(series.astype(str).to_numpy(dtype=object), categorize=False)
+
+
+def _bit_length(x):
+    # Bit length of uint64 values (frexp is exact on each 32-bit half)
+    high = (x >> np.uint64(32)).astype(np.float64)
+    low = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch (64-bit hashes, linear counting for small counts).
+    Sketches of the same precision merge by taking the maximum of each register.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}.")
+        self.precision = precision
+        if registers is None:
+            registers = np.zeros(1 << precision, dtype=np.uint8)
+        self.registers = np.asarray(registers, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """
+        Standard error of count() relative to the true count.
+        """
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, values):
+        """
+        Add values (nulls are ignored).
+        """
+        self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes: np.ndarray):
+        """
+        Add uint64 hashes (see hash_values).
+        """
+        if not len(hashes):
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        rank = (width + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self) -> float:
+        """
+        Estimated number of distinct values added.
+        """
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return float(estimate)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        Add the values of `other` (same precision) to this sketch.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+
+class BoundedDistinct:
+    """
+    Distinct values of a column fed in chunks: exact value counts up to `limit`
+    distinct values, then a HyperLogLog estimate and approximate top values
+    (the `top_capacity` largest running counts). Memory is bounded by limit,
+    top_capacity and the chunk size.
+    """
+
+    def __init__(self, limit: int, precision: int = DEFAULT_PRECISION, top_capacity: int = DEFAULT_TOP_CAPACITY):
+        self.limit = limit
+        self.precision = precision
+        self.top_capacity = top_capacity
+        self.counts = pd.Series(dtype="int64")  # exact counts, None once over the limit
+        self.sketch = None
+        self.top = None
+
+    @property
+    def exact(self) -> bool:
+        return self.sketch is None
+
+    def update(self, values) -> pd.Series:
+        """
+        Add a chunk of values (nulls are ignored).
+
+        Returns:
+            pd.Series: Value counts of the chunk.
+        """
+        chunk_counts = pd.Series(values).value_counts(dropna=True)
+        # value_counts is sorted: only the chunk's most frequent values can enter the top
+        self._add_counts(chunk_counts, chunk_counts.head(self.top_capacity))
+        return chunk_counts
+
+    def _add_counts(self, counts: pd.Series, top_candidates: pd.Series):
+        if self.exact:
+            self.counts = self.counts.add(counts, fill_value=0).astype("int64")
+            if len(self.counts) > self.limit:
+                self._to_sketch()
+        else:
+            self.sketch.add(counts.index)
+            self.top = self.top.add(top_candidates, fill_value=0).nlargest(self.top_capacity).astype("int64")
+
+    def _to_sketch(self):
+        # Switch from exact counts to a sketch and top values
+        self.sketch = HyperLogLog(self.precision)
+        self.sketch.add(self.counts.index)
+        self.top = self.counts.nlargest(self.top_capacity)
+        self.counts = None
+
+    def merge(self, other: "BoundedDistinct") -> "BoundedDistinct":
+        """
+        Add the values counted by `other` (same limit and precision) to this one.
+        Exact counts stay exact while the union has at most `limit` values; the
+        distinct estimate of merged sketches is the one of a single pass.
+        """
+        if (other.limit, other.precision) != (self.limit, self.precision):
+            raise ValueError("Cannot merge BoundedDistinct counts of different limit or precision.")
+        if other.exact:
+            self._add_counts(other.counts, other.counts.nlargest(self.top_capacity))
+        else:
+            if self.exact:
+                self._to_sketch()
+            self.sketch.merge(other.sketch)
+            self.top = self.top.add(other.top, fill_value=0).nlargest(self.top_capacity).astype("int64")
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Plain-Python state (values as Python scalars, registers as bytes); see from_dict.
+        """
+        def pairs(counts):
+            return None if counts is None else [[value, int(n)] for value, n in counts.items()]
+
+        return {
+            "limit": self.limit,
+            "precision": self.precision,
+            "top_capacity": self.top_capacity,
+            "counts": pairs(self.counts),
+            "registers": None if self.exact else self.sketch.registers.tobytes(),
+            "top": pairs(self.top),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "BoundedDistinct":
+        """
+        Rebuild a BoundedDistinct from to_dict() output.
+        """
+        def series(pairs):
+            if not pairs:
+                return pd.Series(dtype="int64")
+            values, counts = zip(*pairs)
+            return pd.Series(counts, index=pd.Index(values), dtype="int64")
+
+        distinct = cls(state["limit"], state["precision"], state["top_capacity"])
+        if state["registers"] is None:
+            distinct.counts = series(state["counts"])
+        else:
+            distinct.counts = None
+            distinct.sketch = HyperLogLog(state["precision"], np.frombuffer(state["registers"], dtype=np.uint8).copy())
+            distinct.top = series(state["top"])
+        return distinct
+
+    def n_distinct(self) -> int:
+        """
+        Number of distinct values: exact up to the limit, else the sketch estimate
+        (at least limit + 1).
+        """
+        if self.exact:
+            return len(self.counts)
+        return max(int(round(self.sketch.count())), self.limit + 1)
+
+    def relative_error(self) -> float:
+        """
+        0.0 while counts are exact, else the sketch's relative error.
+        """
+        return 0.0 if self.exact else self.sketch.relative_error
+
+    def top_values(self, k: int) -> list:
+        """
+        The k most frequent values with their counts (approximate once over the limit).
+        """
+        counts = self.counts if self.exact else self.top
+        counts = counts.sort_values(ascending=False, kind="stable").head(k)
+        return list(zip(counts.index.tolist(), counts.tolist()))
+
+    def values(self):
+        """
+        Sorted distinct values, or None once over the limit (or if they do not compare).
+        """
+        if not self.exact:
+            return None
+        try:
+            return sorted(self.counts.index.tolist())
+        except TypeError:
+            return None
+
+
+# Distinct values of a column, chunk by chunk
+def count_distinct(
+    values,
+    limit: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stop_when_exceeded: bool = False,
+    precision: int = DEFAULT_PRECISION
+) -> BoundedDistinct:
+    """
+    Feed `values` to a BoundedDistinct in chunks of chunk_size rows. With
+    stop_when_exceeded=True, stop at the first chunk that takes the column over
+    `limit` (then only `exact == False` is meaningful).
+    """
+    series = pd.Series(values)
+    distinct = BoundedDistinct(limit, precision)
+    for start in range(0, len(series), chunk_size):
+        distinct.update(series.iloc[start:start + chunk_size])
+        if stop_when_exceeded and not distinct.exact:
+            break
+    return distinct
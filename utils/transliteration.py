@@ -0,0 +1,142 @@
+"""
+Transliteration
+-------------------
+Deterministic Devanagari -> Latin transliteration for proper nouns (school,
+mentor, block/town names), which need romanization rather than translation.
+
+Columns flagged `is_proper_noun` in metadata are transliterated locally by
+process_translation_and_sentiment and never reach the LLM. The scheme is a
+readable, ASCII-only romanization (झाँसी नगर -> "Jhansi Nagar") with Hindi
+schwa deletion, not a reversible one such as ISO 15919.
+"""
+
+import re
+import unicodedata
+
+import pandas as pd
+
+CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v", "ळ": "l",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+}
+# Consonant + nukta (precomposed forms are decomposed by NFC)
+NUKTA_CONSONANTS = {
+    "क": "q", "ख": "kh", "ग": "gh", "ज": "z", "ड": "r", "ढ": "rh", "फ": "f", "य": "y",
+}
+VOWELS = {
+    "अ": "a", "आ": "a", "इ": "i", "ई": "i", "उ": "u", "ऊ": "u", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o", "ऍ": "e",
+}
+MATRAS = {
+    "ा": "a", "ि": "i", "ी": "i", "ु": "u", "ू": "u", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o", "ॅ": "e",
+}
+CODAS = {"ं": "n", "ँ": "n", "ः": "h"}
+OTHER = {
+    "।": ".", "॥": ".", "ॐ": "om",
+    **{chr(0x0966 + i): str(i) for i in range(10)},  # Devanagari digits
+}
+CONJUNCTS = {"ज्ञ": "gy"}
+
+VIRAMA = "्"
+NUKTA = "़"
+LABIALS = set("पफबभम")
+
+DEVANAGARI_RUN = re.compile(r"[ऀ-ॿ]+")
+
+
+# Split one Devanagari word into syllables
+def _syllables(word: str) -> list:
+    """
+    Return [consonants, vowel, vowel_kind, coda] per syllable, where vowel_kind
+    is 'inherent' (schwa), 'explicit' (matra or independent vowel) or 'none'
+    (virama, or a character that is not a letter).
+    """
+    syllables = []
+    i = 0
+    while i < len(word):
+        ch = word[i]
+        if word.startswith(tuple(CONJUNCTS), i):
+            conjunct = next(c for c in CONJUNCTS if word.startswith(c, i))
+            syllables.append([CONJUNCTS[conjunct], "a", "inherent", ""])
+            i += len(conjunct)
+        elif ch in CONSONANTS:
+            if i + 1 < len(word) and word[i + 1] == NUKTA:
+                syllables.append([NUKTA_CONSONANTS.get(ch, CONSONANTS[ch]), "a", "inherent", ""])
+                i += 2
+            else:
+                syllables.append([CONSONANTS[ch], "a", "inherent", ""])
+                i += 1
+        elif ch in VOWELS:
+            syllables.append(["", VOWELS[ch], "explicit", ""])
+            i += 1
+        elif ch in MATRAS and syllables:
+            syllables[-1][1:3] = [MATRAS[ch], "explicit"]
+            i += 1
+        elif ch == VIRAMA and syllables:
+            syllables[-1][1:3] = ["", "none"]
+            i += 1
+        elif ch in CODAS and syllables:
+            nasal = CODAS[ch]
+            if nasal == "n" and i + 1 < len(word) and word[i + 1] in LABIALS:
+                nasal = "m"
+            syllables[-1][3] += nasal
+            i += 1
+        else:
+            syllables.append([OTHER.get(ch, ""), "", "none", ""])
+            i += 1
+    return syllables
+
+
+# Romanize one Devanagari word
+def _transliterate_word(word: str) -> str:
+    syllables = _syllables(word)
+    letters = [s for s in syllables if s[0] or s[1]]
+    # Word-final schwa is silent (नगर -> nagar, not nagara)
+    if len(letters) > 1 and syllables[-1][2] == "inherent" and not syllables[-1][3]:
+        syllables[-1][1:3] = ["", "none"]
+    # Medial schwa deletion: a -> 0 / VC_CV (बंगरा -> bangra, चिरगांव -> chirganv)
+    for i in range(1, len(syllables) - 1):
+        current, prev, nxt = syllables[i], syllables[i - 1], syllables[i + 1]
+        if (
+            current[2] == "inherent" and not current[3]
+            and prev[2] != "none"
+            and nxt[0] and nxt[2] != "none"
+        ):
+            current[1:3] = ["", "none"]
+    return "".join(consonants + vowel + coda for consonants, vowel, _, coda in syllables)
+
+
+# Romanize one value
+def transliterate(value) -> str:
+    """
+    Transliterate the Devanagari runs of `value` to Latin script, capitalizing
+    each word; other characters are kept as they are.
+    """
+    text = unicodedata.normalize("NFC", str(value))
+    return DEVANAGARI_RUN.sub(lambda m: _transliterate_word(m.group(0)).capitalize(), text)
+
+
+# Romanize a list of values, each distinct value once
+def transliterate_values(values) -> list:
+    """
+    transliterate() for a list of values; each distinct value is transliterated once.
+    """
+    return transliterate_series(pd.Series(list(values), dtype=object)).tolist()
+
+
+# Romanize a column
+def transliterate_series(series: pd.Series) -> pd.Series:
+    """
+    Vectorized transliterate(): factorize the column, transliterate its distinct
+    values and map back with the codes. Nulls stay null.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    romanized = pd.Series([transliterate(v) for v in uniques], dtype=object)
+    result = romanized.reindex(codes).to_numpy()  # code -1 (null) -> NaN
+    return pd.Series(result, index=series.index, dtype=object)
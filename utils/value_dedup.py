@@ -0,0 +1,152 @@
+"""
+Value Dedup
+-------------------
+Collapse near-duplicate categorical values (punctuation, matra typos, word order)
+so that only one representative per cluster is sent to the LLM.
+
+Stages:
+    1. Exact match on a normalized key (punctuation stripped, short/long matras
+       folded, words sorted).
+    2. Character n-gram TF-IDF cosine similarity between keys, compared only
+       within blocks of keys sharing a word prefix (no all-pairs comparison).
+       Keys with different numbers or negation are never merged.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Long/short vowel signs folded together; nasalization marks and nukta dropped
+_MATRA_FOLDING = str.maketrans({
+    "ी": "ि",
+    "ू": "ु",
+    "ँ": None,
+    "ं": None,
+    "़": None,
+    "ॅ": "े",
+    "ॉ": "ो",
+})
+
+
+# A key with a negation word or a negating prefix (अ-/अन-, e.g. अनुपस्थित) is
+# never merged with one without, so "present" and "absent" stay apart
+NEGATION_WORDS = tuple(
+    w.translate(_MATRA_FOLDING) for w in ("नहीं", "नही", "ना", "न", "मत", "not", "no", "never")
+)
+NEGATION_PREFIXES = ("अन", "अ")
+
+BLOCK_PREFIX_LENGTH = 3
+MAX_BLOCK_SIZE = 500
+
+# "class 1 and 2" and "class 1 and 3" differ only in a digit, but are different answers
+_NUMBER = re.compile(r"\d+")
+
+
+# Normalized comparison key of a value
+def normalize_value_key(value) -> str:
+    """
+    Build the comparison key of a value: NFC, lowercase, punctuation removed,
+    short/long matras folded and words sorted.
+    """
+    text = unicodedata.normalize("NFC", str(value)).lower().translate(_MATRA_FOLDING)
+    # Punctuation and symbols (incl. danda) -> space; matras are marks, not punctuation
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+    return " ".join(sorted(text.split()))
+
+
+# Negation check used to keep opposite answers apart
+def has_negation(key: str) -> bool:
+    """
+    True if a normalized key contains a negation word or a word with a negating prefix.
+    """
+    return any(
+        word in NEGATION_WORDS or (word.startswith(NEGATION_PREFIXES) and len(word) > 3)
+        for word in key.split()
+    )
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+# Cluster near-duplicate values
+def collapse_near_duplicates(
+    values,
+    counts=None,
+    threshold: float = 0.9,
+    ngram_range: tuple = (2, 4)
+) -> dict:
+    """
+    Cluster near-duplicate values and pick one representative per cluster.
+
+    Args:
+        values (list): Unique values of a column.
+        counts (dict or None): {value: frequency}; the most frequent member becomes
+            the representative (ties: shortest, then alphabetical).
+        threshold (float): Minimum cosine similarity of character n-gram TF-IDF
+            vectors for two keys to be merged (1.0 = exact key matches only).
+        ngram_range (tuple): Character n-gram range.
+
+    Returns:
+        dict: {value: representative value} for every input value.
+    """
+    values = list(values)
+    if not values:
+        return {}
+    counts = counts or {}
+
+    # Stage 1: exact match on normalized keys
+    key_members = defaultdict(list)
+    for value in values:
+        key_members[normalize_value_key(value)].append(value)
+    keys = list(key_members)
+    uf = _UnionFind(len(keys))
+
+    # Stage 2: TF-IDF similarity within blocks of keys sharing a word prefix
+    if threshold < 1.0 and len(keys) > 1:
+        vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=ngram_range)
+        matrix = vectorizer.fit_transform(keys)
+        negated = np.array([has_negation(k) for k in keys])
+        numbers = [_NUMBER.findall(k) for k in keys]
+
+        blocks = defaultdict(set)
+        for idx, key in enumerate(keys):
+            for word in key.split():
+                blocks[word[:BLOCK_PREFIX_LENGTH]].add(idx)
+
+        for members in blocks.values():
+            if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+                continue
+            members = sorted(members)
+            sims = (matrix[members] @ matrix[members].T).toarray()
+            rows, cols = np.nonzero(np.triu(sims >= threshold, k=1))
+            for r, c in zip(rows, cols):
+                i, j = members[r], members[c]
+                if negated[i] == negated[j] and numbers[i] == numbers[j]:
+                    uf.union(i, j)
+
+    clusters = defaultdict(list)
+    for idx, key in enumerate(keys):
+        clusters[uf.find(idx)].extend(key_members[key])
+
+    mapping = {}
+    for members in clusters.values():
+        representative = min(members, key=lambda v: (-counts.get(v, 0), len(str(v)), str(v)))
+        for member in members:
+            mapping[member] = representative
+    return mapping